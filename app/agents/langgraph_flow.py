@@ -10,7 +10,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from app.agents.langgraph_workflow import run_cycle
 from app.models.database import SessionLocal, get_db_context
-from app.persistence import PersistentMemoryManager, RecoveryManager, Checkpoint, EpisodicMemory
+from app.persistence import PersistentMemoryManager, RecoveryManager, Checkpoint, EpisodicMemory, Message
 
 logger = logging.getLogger("langgraph_flow")
 logger.setLevel(logging.INFO)
@@ -80,11 +80,11 @@ class AgentController:
                     },
                     decisions_made=result.get('decisions', []),
                     message_history=[
-                        {
-                            "stage": "graph_execution",
-                            "message": f"LangGraph cycle completed: {result.get('status')}",
-                            "timestamp": result.get('completed_at')
-                        }
+                        Message(
+                            stage="graph_execution",
+                            message=f"LangGraph cycle completed: {result.get('status')}",
+                            timestamp=result.get('completed_at')
+                        )
                     ],
                     resources_used={
                         "graph_invocations": 1,
@@ -95,7 +95,9 @@ class AgentController:
                     is_stable=result.get('status') == 'success'
                 )
                 
-                self.persistent_memory.save_checkpoint(db, checkpoint)
+                # Checkpoint and its episode are committed together; the next
+                # cycle supersedes them, so the commit needn't wait for the WAL flush
+                self.persistent_memory.save_checkpoint(db, checkpoint, commit=False, durable=False)
                 
                 # Store episode
                 episode = EpisodicMemory(
@@ -112,7 +114,8 @@ class AgentController:
                     outcome="success" if result.get('status') == 'success' else "partial",
                     learning="Cycle executed using LangGraph with state management and checkpointing"
                 )
-                self.persistent_memory.store_episode(db, episode)
+                self.persistent_memory.store_episode(db, episode, commit=False, durable=False)
+                db.commit()
                 
                 logger.info(f"✅ Checkpoint saved for cycle {self.cycle_count}")
                 
@@ -3,13 +3,15 @@
 
 import logging
 import threading
+from dataclasses import fields
+from functools import partial
 from datetime import datetime
 from uuid import uuid4
-from typing import Generator, Dict, Any
+from typing import Generator, Any
 
 from langgraph.graph import StateGraph, END
 
-from app.agents.state import CycleState
+from app.agents.state import CycleState, CycleGraphState, APPEND_ONLY_FIELDS
 from app.agents.nodes.fetch_data_node import fetch_data_node
 from app.agents.nodes.forecast_node import forecast_node
 from app.agents.nodes.decision_node import DecisionNode
@@ -43,9 +45,46 @@ def ensure_state(state) -> CycleState:
         return CycleState(**state)
     return state
 
+_STATE_FIELDS = tuple(f.name for f in fields(CycleState))
+
 def state_to_dict(state: CycleState) -> dict:
-    """Convert CycleState to dict for LangGraph."""
-    return state.__dict__
+    """Convert CycleState to dict for LangGraph (shallow; CycleState has no __dict__)."""
+    return {name: getattr(state, name) for name in _STATE_FIELDS}
+
+_MISSING = object()
+
+def as_graph_node(wrapper):
+    """
+    Adapt a CycleState wrapper to emit a partial update for CycleGraphState.
+    
+    Append-only lists are copied before the wrapper runs (so in-place appends
+    don't leak into the channel) and only their new entries are returned for
+    the operator.add reducer. Other keys are returned only when the wrapper
+    rebound them; in-place edits already live in the shared channel value.
+    """
+    def node(state: dict) -> dict:
+        state_in = dict(state)
+        seen = {}
+        for name in APPEND_ONLY_FIELDS:
+            entries = state_in.get(name, ())
+            seen[name] = len(entries)
+            state_in[name] = list(entries)
+        
+        result = wrapper(state_in)
+        
+        update = {}
+        for name, value in result.items():
+            if name in APPEND_ONLY_FIELDS:
+                new_entries = value[seen[name]:]
+                if new_entries:
+                    update[name] = new_entries
+            elif value is not state.get(name, _MISSING):
+                update[name] = value
+        return update
+    
+    node.__name__ = wrapper.__name__
+    node.__doc__ = wrapper.__doc__
+    return node
 
 def fetch_node_wrapper(state) -> dict:
     """Wrapper for fetch_data_node."""
@@ -299,29 +338,42 @@ def memory_node_wrapper(state) -> dict:
                 "decision": decision
             })
     
-    # Save to memory
-    _memory_node_impl.append_run_summary(SessionLocal, summary)
+    # Save to memory (runs on the background writer; failures are reported when it finishes)
+    future = _memory_node_impl.append_run_summary(SessionLocal, summary)
+    future.add_done_callback(partial(_report_archive_result, cycle_state.cycle_id))
     
-    job_stream_manager.log_event(cycle_state.cycle_id, "progress", "✅ Cycle archived successfully.", stage="MEMORY")
+    job_stream_manager.log_event(cycle_state.cycle_id, "progress", "📤 Cycle archive queued.", stage="MEMORY")
     return state_to_dict(cycle_state)
 
 
-# Define the graph with Dict type
-workflow = StateGraph(Dict)
+def _report_archive_result(cycle_id: str, future):
+    """Done-callback for the queued run-summary write: surface failures on the job stream."""
+    try:
+        result = future.result()
+    except Exception as e:
+        result = {"error": str(e)}
+    error = result.get("error") if isinstance(result, dict) else None
+    if error:
+        logger.error("[%s] Cycle archive failed: %s", cycle_id, error)
+        job_stream_manager.log_event(cycle_id, "error", f"Cycle archive failed: {error}", stage="MEMORY")
+
+
+# Define the graph over typed channels (append-only lists use reducers)
+workflow = StateGraph(CycleGraphState)
 
-# Add nodes
-workflow.add_node("fetch_data", fetch_node_wrapper)
-workflow.add_node("forecast", forecast_node_wrapper)
+# Add nodes (wrappers keep full-dict returns for direct callers; the graph gets deltas)
+workflow.add_node("fetch_data", as_graph_node(fetch_node_wrapper))
+workflow.add_node("forecast", as_graph_node(forecast_node_wrapper))
 
 # Decision Subgraph Nodes
-workflow.add_node("analyze_trends", analyze_trends_wrapper)
-workflow.add_node("check_constraints", check_constraints_wrapper)
-workflow.add_node("optimize_cost", optimize_cost_wrapper)
+workflow.add_node("analyze_trends", as_graph_node(analyze_trends_wrapper))
+workflow.add_node("check_constraints", as_graph_node(check_constraints_wrapper))
+workflow.add_node("optimize_cost", as_graph_node(optimize_cost_wrapper))
 
-workflow.add_node("finance", finance_node_wrapper)
-workflow.add_node("negotiation", negotiation_node_wrapper)
-workflow.add_node("action", action_node_wrapper)
-workflow.add_node("memory", memory_node_wrapper)
+workflow.add_node("finance", as_graph_node(finance_node_wrapper))
+workflow.add_node("negotiation", as_graph_node(negotiation_node_wrapper))
+workflow.add_node("action", as_graph_node(action_node_wrapper))
+workflow.add_node("memory", as_graph_node(memory_node_wrapper))
 
 # Define edges
 workflow.set_entry_point("fetch_data")
@@ -389,7 +441,14 @@ def run_cycle(cycle_id: str, recent_revenue: float = 0.0):
     }
     
     try:
-        result_state = app.invoke(initial_state)
+        # Node events arrive on the "custom" stream and are forwarded to the
+        # job stream; the last "values" chunk is the final state
+        result_state = {}
+        for mode, chunk in app.stream(initial_state, stream_mode=["custom", "values"]):
+            if mode == "custom":
+                job_stream_manager.log_event(cycle_id, chunk["type"], chunk["message"], chunk.get("details"))
+            else:
+                result_state = chunk
         
         # Result is already a dict
         result_dict = {
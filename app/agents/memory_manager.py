@@ -1,13 +1,33 @@
 # app/agents/memory_manager.py
 from app.models.database import SessionLocal
 from app.models import schemas
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from datetime import datetime
-import json
+import orjson
 import logging
 
 logger = logging.getLogger("memory_manager")
 
+# Payloads may carry NumPy values from the batch forecast/decision paths
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _dumps(obj) -> str:
+    return orjson.dumps(obj, option=_ORJSON_OPTS).decode()
+
+# Built once; SQLAlchemy caches their compiled form across calls
+_PM = schemas.PersistentMemory
+_existing_fact = select(_PM.id).where(
+    _PM.memory_type == "semantic",
+    _PM.key == bindparam("entity"),
+    _PM.description == bindparam("fact")
+).limit(1)
+_entity_facts = select(_PM.description).where(
+    _PM.memory_type == "semantic",
+    _PM.key == bindparam("entity"),
+    _PM.is_active == True
+)
+
 class MemoryManager:
     def __init__(self, session_factory=SessionLocal):
         self.session_factory = session_factory
@@ -16,9 +36,9 @@ class MemoryManager:
         db: Session = self.session_factory()
         try:
             mem = schemas.AgentMemory(
-                context=json.dumps(payload.get("forecast", {}))[:4000],
-                decision=json.dumps(payload.get("decision", {}))[:4000],
-                reasoning=json.dumps(payload.get("action_result", {}))[:4000],
+                context=_dumps(payload.get("forecast", {}))[:4000],
+                decision=_dumps(payload.get("decision", {}))[:4000],
+                reasoning=_dumps(payload.get("action_result", {}))[:4000],
                 created_at=datetime.utcnow()
             )
             db.add(mem)
@@ -36,21 +56,17 @@ class MemoryManager:
         db: Session = self.session_factory()
         try:
             # Check if similar fact exists to avoid duplicates
-            existing = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == "semantic",
-                schemas.PersistentMemory.key == entity,
-                schemas.PersistentMemory.description == fact
-            ).first()
+            existing_id = db.execute(_existing_fact, {"entity": entity, "fact": fact}).scalar()
             
-            if existing:
-                return existing.id
+            if existing_id:
+                return existing_id
                 
             mem = schemas.PersistentMemory(
                 memory_type="semantic",
                 key=entity, # The entity this fact is about (e.g. SKU-123)
                 category=category,
                 description=fact,
-                content=json.dumps({"fact": fact, "created_at": datetime.utcnow().isoformat()}),
+                content={"fact": fact, "created_at": datetime.utcnow().isoformat()},
                 created_at=datetime.utcnow(),
                 is_active=True
             )
@@ -68,12 +84,6 @@ class MemoryManager:
         """Retrieve all active semantic facts for an entity"""
         db: Session = self.session_factory()
         try:
-            memories = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == "semantic",
-                schemas.PersistentMemory.key == entity,
-                schemas.PersistentMemory.is_active == True
-            ).all()
-            
-            return [m.description for m in memories]
+            return db.execute(_entity_facts, {"entity": entity}).scalars().all()
         finally:
             db.close()
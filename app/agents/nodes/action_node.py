@@ -147,10 +147,10 @@ class ActionNode:
                 product.quantity += qty
                 db.add(product)
                 db.commit()
-                logger.info(f"📦 Immediate replenishment: {sku} stock increased by {qty} to {product.quantity}")
+                logger.info("📦 Immediate replenishment: %s stock increased by %s to %s", sku, qty, product.quantity)
 
             logger.info(
-                f"Order created: {order.id} for {sku}, qty {qty}, urgency {urgency}"
+                "Order created: %s for %s, qty %s, urgency %s", order.id, sku, qty, urgency
             )
 
             # Calculate total cost
@@ -170,7 +170,7 @@ class ActionNode:
             }
 
         except Exception as e:
-            logger.error(f"Action execution error: {str(e)}", exc_info=True)
+            logger.error("Action execution error: %s", str(e), exc_info=True)
             return {
                 "executed": False,
                 "error": str(e),
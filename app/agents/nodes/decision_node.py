@@ -47,28 +47,52 @@ class DecisionNode:
         Returns:
             Dict with decision results (backward compatible with old format)
         """
+        return self.decide_batch([sku_item], [forecast], learned_params, [recent_sales])[0]
+
+    def decide_batch(
+        self,
+        sku_items: List[Dict[str, Any]],
+        forecasts: List[Dict[str, Any]],
+        learned_params: Dict[str, Any] = None,
+        recent_sales_list: List[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Make reorder decisions for a cycle's SKUs in one vectorized engine call.
         
-        # Handle both dict and object input
-        if not isinstance(sku_item, dict):
-            sku_item = sku_item.__dict__ if hasattr(sku_item, '__dict__') else {}
+        Rows the engine can't compute numerically (inactive SKUs, bad inputs)
+        go through its scalar decide() internally. learned_params is accepted
+        for API compatibility; the engine doesn't use it yet.
         
+        Returns:
+            One decision dict per SKU, in input order
+        """
         
-        # Default to empty sales list if not provided (fallback to baseline)
-        if recent_sales is None:
-            recent_sales = []
+        # Handle both dict and object input
+        sku_items = [
+            item if isinstance(item, dict) else (item.__dict__ if hasattr(item, '__dict__') else {})
+            for item in sku_items
+        ]
+        
+        # Default to empty sales lists if not provided (fallback to baseline)
+        if recent_sales_list is None:
+            recent_sales_list = [None] * len(sku_items)
+        recent_sales_list = [sales if sales is not None else [] for sales in recent_sales_list]
         
         try:
             # Call intelligent decision engine
-            result = self.engine.decide(
-                sku_item=sku_item,
-                forecast=forecast,
-                recent_sales=recent_sales,
-                pending_orders=sku_item.get("pending_orders", 0),
-                learned_params=learned_params
+            results = self.engine.decide_batch(
+                sku_items,
+                forecasts,
+                recent_sales_list,
+                pending_orders=[item.get("pending_orders", 0) for item in sku_items]
             )
-            
-            # Convert DecisionResult to dict for backward compatibility
-            return {
+        except Exception as e:
+            logger.error("Decision error: %s", str(e))
+            return [self._fallback(item, e) for item in sku_items]
+        
+        # Convert DecisionResult to dict for backward compatibility
+        return [
+            {
                 "reorder_required": result.reorder_required,
                 "order_quantity": result.order_quantity,
                 "urgency_level": result.urgency_level.value,
@@ -77,24 +101,26 @@ class DecisionNode:
                 "cost_analysis": result.cost_analysis,
                 "explanation": result.reason  # For backward compatibility
             }
+            for result in results
+        ]
+
+    @staticmethod
+    def _fallback(sku_item: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Conservative decision when the engine call fails."""
+        current = sku_item.get("quantity", 0)
+        threshold = sku_item.get("threshold", 10)
         
-        except Exception as e:
-            logger.error(f"Decision error: {str(e)}")
-            # Fallback: conservative decision
-            current = sku_item.get("quantity", 0)
-            threshold = sku_item.get("threshold", 10)
-            
-            if current < threshold:
-                order_qty = int(threshold * 1.5 - current)
-            else:
-                order_qty = 0
-            
-            return {
-                "reorder_required": order_qty > 0,
-                "order_quantity": order_qty,
-                "urgency_level": "medium" if order_qty > 0 else "low",
-                "reason": f"Decision failed; using fallback (stock: {current}, threshold: {threshold})",
-                "details": {"error": str(e)},
-                "cost_analysis": {},
-                "explanation": "Fallback decision"
-            }
+        if current < threshold:
+            order_qty = int(threshold * 1.5 - current)
+        else:
+            order_qty = 0
+        
+        return {
+            "reorder_required": order_qty > 0,
+            "order_quantity": order_qty,
+            "urgency_level": "medium" if order_qty > 0 else "low",
+            "reason": f"Decision failed; using fallback (stock: {current}, threshold: {threshold})",
+            "details": {"error": str(error)},
+            "cost_analysis": {},
+            "explanation": "Fallback decision"
+        }
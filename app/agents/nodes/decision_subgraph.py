@@ -1,11 +1,16 @@
 # app/agents/nodes/decision_subgraph.py
 import logging
+from dataclasses import asdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+import numpy as np
+
 from app.agents.state import CycleState
-from app.agents.nodes.intelligent_decision_node import IntelligentDecisionNode, UrgencyLevel, DecisionResult
+from app.agents.nodes.intelligent_decision_node import (
+    IntelligentDecisionNode, UrgencyLevel, DecisionResult, InventoryMetrics
+)
 
 logger = logging.getLogger("decision_subgraph")
 
@@ -15,47 +20,25 @@ _engine = IntelligentDecisionNode()
 def analyze_trends_node(state: CycleState) -> CycleState:
     """
     Step 1: Analyze trends and calculate metrics for all SKUs.
+    
+    Demand statistics, EOQ and reorder point are computed for the whole cycle
+    in one columnar pass; optimize_cost_node reads them back from each item.
     """
-    logger.info(f"[{state.cycle_id}] 📊 Subgraph: Analyzing trends for {len(state.forecast_results)} SKUs...")
-    logger.info(f"[{state.cycle_id}] 📋 Forecast SKUs: {[f['sku'] for f in state.forecast_results]}")
+    logger.info("[%s] 📊 Subgraph: Analyzing trends for %s SKUs...", state.cycle_id, len(state.forecast_results))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[%s] 📋 Forecast SKUs: %s", state.cycle_id, [f['sku'] for f in state.forecast_results])
     
-    analyzed_skus = []
+    forecast_items = state.forecast_results
+    inventory_items = [state.inventory_data.get(f['sku'], {}) for f in forecast_items]
     
-    def process_metrics(forecast_item):
-        sku = forecast_item['sku']
-        try:
-            inventory_item = state.inventory_data.get(sku, {})
-            recent_sales = state.sales_by_sku.get(sku, [])
-            
-            # Extract metrics using the engine
-            metrics = _engine.extract_metrics(
-                sku_item=inventory_item,
-                forecast=forecast_item['forecast'],
-                recent_sales=recent_sales
-            )
-            
-            # Convert to dict for state storage
-            metrics_dict = metrics.__dict__.copy()
-            
-            # Pre-calculate utility here to ensure it's available even if optimization fails later (though it shouldn't)
-            utility_score = _engine.calculate_utility_score(metrics)
-            
-            return {
-                "sku": sku,
-                "product_name": forecast_item['product_name'],
-                "metrics": metrics_dict,
-                "forecast_item": forecast_item,
-                "inventory_item": inventory_item,
-                "utility_score": utility_score
-            }
-        except Exception as e:
-            logger.error(f"Metric extraction failed for {sku}: {e}")
-            return None
-
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(process_metrics, item) for item in state.forecast_results]
-        for future in as_completed(futures):
-            result = future.result()
+    try:
+        analyzed_skus = _analyze_batch(state, forecast_items, inventory_items)
+    except Exception as e:
+        # Malformed rows break the columnar pass; retry SKU by SKU so only they are dropped
+        logger.warning("[%s] Batch metric extraction failed (%s); falling back to per-SKU", state.cycle_id, e)
+        analyzed_skus = []
+        for forecast_item, inventory_item in zip(forecast_items, inventory_items):
+            result = _analyze_one(state, forecast_item, inventory_item)
             if result:
                 analyzed_skus.append(result)
                 
@@ -63,11 +46,79 @@ def analyze_trends_node(state: CycleState) -> CycleState:
     return state
 
 
+def _analyzed_item(forecast_item, inventory_item, metrics: InventoryMetrics, eoq: int, reorder_point: int) -> Dict[str, Any]:
+    """Subgraph record for one SKU (metrics stored as a dict for state storage)"""
+    return {
+        "sku": forecast_item['sku'],
+        "product_name": forecast_item['product_name'],
+        "metrics": asdict(metrics),
+        "forecast_item": forecast_item,
+        "inventory_item": inventory_item,
+        "utility_score": _engine.calculate_utility_score(metrics),
+        "eoq": eoq,
+        "reorder_point": reorder_point
+    }
+
+
+def _analyze_batch(state: CycleState, forecast_items, inventory_items) -> List[Dict[str, Any]]:
+    """Metrics, EOQ and ROP for every SKU via the engine's batch helpers"""
+    n = len(forecast_items)
+    if n == 0:
+        return []
+    
+    batch = _engine.extract_metrics_batch(
+        inventory_items,
+        [f['forecast'] for f in forecast_items],
+        [state.sales_by_sku.get(f['sku'], []) for f in forecast_items],
+        [0] * n
+    )
+    eoq = _engine.calculate_eoq_batch(batch)
+    reorder_point = _engine.calculate_dynamic_reorder_point_batch(batch)
+    
+    # Rows with missing/invalid numeric inputs go through the scalar path (as in decide_batch)
+    numeric = np.column_stack([
+        batch.current_stock, batch.lead_time_days, batch.unit_cost, batch.holding_cost_percent,
+        batch.reorder_cost, batch.safety_stock, batch.min_order_qty, batch.daily_avg_demand
+    ])
+    valid = np.isfinite(numeric).all(axis=1)
+    
+    analyzed_skus = []
+    for i, (forecast_item, inventory_item) in enumerate(zip(forecast_items, inventory_items)):
+        if not valid[i]:
+            result = _analyze_one(state, forecast_item, inventory_item)
+            if result:
+                analyzed_skus.append(result)
+            continue
+        metrics = _engine.metrics_at(batch, i, inventory_item, forecast_item['forecast'])
+        analyzed_skus.append(
+            _analyzed_item(forecast_item, inventory_item, metrics, int(eoq[i]), int(reorder_point[i]))
+        )
+    return analyzed_skus
+
+
+def _analyze_one(state: CycleState, forecast_item, inventory_item) -> Optional[Dict[str, Any]]:
+    """Scalar fallback for analyze_trends_node; None if the SKU can't be analyzed"""
+    sku = forecast_item['sku']
+    try:
+        metrics = _engine.extract_metrics(
+            sku_item=inventory_item,
+            forecast=forecast_item['forecast'],
+            recent_sales=state.sales_by_sku.get(sku, [])
+        )
+        return _analyzed_item(
+            forecast_item, inventory_item, metrics,
+            _engine.calculate_eoq(metrics), _engine.calculate_dynamic_reorder_point(metrics)
+        )
+    except Exception as e:
+        logger.error("Metric extraction failed for %s: %s", sku, e)
+        return None
+
+
 def check_constraints_node(state: CycleState) -> CycleState:
     """
     Step 2: Check constraints (confidence, thresholds, active status).
     """
-    logger.info(f"[{state.cycle_id}] 🚧 Subgraph: Checking constraints for {len(state.analyzed_skus)} SKUs...")
+    logger.info("[%s] 🚧 Subgraph: Checking constraints for %s SKUs...", state.cycle_id, len(state.analyzed_skus))
     
     constrained_skus = []
     
@@ -78,7 +129,7 @@ def check_constraints_node(state: CycleState) -> CycleState:
         
         # Check if active
         if not inventory_item.get("is_active", True):
-            logger.info(f"[{state.cycle_id}] ⏸️ {sku}: Skipped (inactive)")
+            logger.info("[%s] ⏸️ %s: Skipped (inactive)", state.cycle_id, sku)
             continue # Skip inactive
             
         # Check confidence constraint
@@ -87,25 +138,25 @@ def check_constraints_node(state: CycleState) -> CycleState:
             threshold = inventory_item.get("threshold", 10)
             current_stock = metrics['current_stock']
             
-            logger.info(f"[{state.cycle_id}] 🔍 {sku}: Low confidence ({metrics['forecast_confidence']:.2f}). Stock={current_stock}, Threshold={threshold}")
+            logger.info("[%s] 🔍 %s: Low confidence (%.2f). Stock=%s, Threshold=%s", state.cycle_id, sku, metrics['forecast_confidence'], current_stock, threshold)
             
             if current_stock < threshold:
                 #  Fallback trigger
                 fallback_qty = max(metrics['min_order_qty'], int(threshold * 2) - current_stock)
                 item['constraint_decision'] = "fallback"
                 item['fallback_qty'] = fallback_qty
-                logger.info(f"[{state.cycle_id}] ✅ {sku}: Fallback triggered. Qty={fallback_qty}")
+                logger.info("[%s] ✅ %s: Fallback triggered. Qty=%s", state.cycle_id, sku, fallback_qty)
             else:
                 # Hold
-                logger.info(f"[{state.cycle_id}] ⏸️  {sku}: Holding (stock >= threshold despite low confidence)")
+                logger.info("[%s] ⏸️  %s: Holding (stock >= threshold despite low confidence)", state.cycle_id, sku)
                 continue 
         else:
             item['constraint_decision'] = "proceed"
-            logger.info(f"[{state.cycle_id}] ✅ {sku}: Proceeding (good confidence)")
+            logger.info("[%s] ✅ %s: Proceeding (good confidence)", state.cycle_id, sku)
             
         constrained_skus.append(item)
         
-    logger.info(f"[{state.cycle_id}] 🎯 Constraint check complete. {len(constrained_skus)}/{len(state.analyzed_skus)} passed.")
+    logger.info("[%s] 🎯 Constraint check complete. %s/%s passed.", state.cycle_id, len(constrained_skus), len(state.analyzed_skus))
     state.constrained_skus = constrained_skus
     return state
 
@@ -114,7 +165,7 @@ def optimize_cost_node(state: CycleState) -> CycleState:
     """
     Step 3: Optimize cost (EOQ, ROP) and generate final decisions.
     """
-    logger.info(f"[{state.cycle_id}] 💎 Subgraph: Optimizing cost for {len(state.constrained_skus)} SKUs...")
+    logger.info("[%s] 💎 Subgraph: Optimizing cost for %s SKUs...", state.cycle_id, len(state.constrained_skus))
     
     decisions = []
     
@@ -123,7 +174,6 @@ def optimize_cost_node(state: CycleState) -> CycleState:
         metrics_dict = item['metrics']
         
         # Reconstruct metrics object
-        from app.agents.nodes.intelligent_decision_node import InventoryMetrics
         metrics = InventoryMetrics(**metrics_dict)
         
         try:
@@ -136,7 +186,7 @@ def optimize_cost_node(state: CycleState) -> CycleState:
                 target_stock = int(threshold * 2)
                 order_qty = max(metrics_dict.get('min_order_qty', 1), target_stock - current_stock)
                 
-                logger.info(f"[OVERRIDE] {sku}: Stock {current_stock} < Threshold {threshold} → Ordering {order_qty} units")
+                logger.info("[OVERRIDE] %s: Stock %s < Threshold %s → Ordering %s units", sku, current_stock, threshold, order_qty)
                 
                 return {
                     "sku": sku,
@@ -159,7 +209,7 @@ def optimize_cost_node(state: CycleState) -> CycleState:
                 }
             
             if item.get('constraint_decision') == "fallback":
-                logger.info(f"🔍 [Sub-step] {sku}: Processing fallback decision...")
+                logger.info("🔍 [Sub-step] %s: Processing fallback decision...", sku)
                 # Create fallback decision
                 return {
                     "sku": sku,
@@ -180,11 +230,11 @@ def optimize_cost_node(state: CycleState) -> CycleState:
                 }
             
             # Normal optimization
-            logger.info(f"🔍 [Sub-step] {sku}: Analyzing demand trends and constraints...")
+            logger.info("🔍 [Sub-step] %s: Analyzing demand trends and constraints...", sku)
 
-            logger.info(f"📐 [Sub-step] {sku}: Calculating EOQ & Reorder Point...")
-            eoq = _engine.calculate_eoq(metrics)
-            reorder_point = _engine.calculate_dynamic_reorder_point(metrics)
+            # EOQ & Reorder Point were computed for the whole batch in analyze_trends_node
+            eoq = item['eoq']
+            reorder_point = item['reorder_point']
             
             # Effective stock
             effective_stock = metrics.current_stock + metrics.pending_orders
@@ -207,7 +257,7 @@ def optimize_cost_node(state: CycleState) -> CycleState:
             order_qty = 0
             urgency = UrgencyLevel.LOW
             
-            logger.info(f"⚖️ [Sub-step] {sku}: Scoring Urgency & Stockout Risk (Day to Stockout: {days_until_stockout:.1f} days)...")
+            logger.info("⚖️ [Sub-step] %s: Scoring Urgency & Stockout Risk (Day to Stockout: %.1f days)...", sku, days_until_stockout)
             
             if reorder_required:
                 target_stock = reorder_point + eoq
@@ -242,7 +292,7 @@ def optimize_cost_node(state: CycleState) -> CycleState:
             }
             
         except Exception as e:
-            logger.error(f"Optimization failed for {sku}: {e}")
+            logger.error("Optimization failed for %s: %s", sku, e)
             return {"sku": sku, "error": str(e)}
 
     with ThreadPoolExecutor(max_workers=10) as executor:
@@ -22,7 +22,7 @@ def fetch_data_node(state: CycleState) -> CycleState:
     
     db: Session = SessionLocal()
     try:
-        logger.info(f"[{state.cycle_id}] Fetching inventory and sales data...")
+        logger.info("[%s] Fetching inventory and sales data...", state.cycle_id)
         
         # Fetch all inventory
         inventory = db.query(schemas.Inventory).all()
@@ -47,10 +47,11 @@ def fetch_data_node(state: CycleState) -> CycleState:
             facts = _memory_manager.retrieve_relevant_facts(sku)
             if facts:
                 data["semantic_memory"] = facts
-                logger.info(f"[{state.cycle_id}] Loaded {len(facts)} facts for {sku}")
+                logger.info("[%s] Loaded %s facts for %s", state.cycle_id, len(facts), sku)
         
-        logger.info(f"[{state.cycle_id}] Fetched {len(state.inventory_data)} SKUs")
-        logger.info(f"[{state.cycle_id}] Inventory SKUs: {list(state.inventory_data.keys())}")
+        logger.info("[%s] Fetched %s SKUs", state.cycle_id, len(state.inventory_data))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Inventory SKUs: %s", state.cycle_id, list(state.inventory_data.keys()))
         
         # Fetch recent sales (last 7 days)
         seven_days_ago = datetime.utcnow() - timedelta(days=7)
@@ -78,7 +79,7 @@ def fetch_data_node(state: CycleState) -> CycleState:
             total_revenue += sale.sold_quantity * price
             
         state.recent_sales_revenue = total_revenue
-        logger.info(f"[{state.cycle_id}] Fetched {len(state.sales_data)} sales records. Revenue (7d): ${total_revenue:.2f}")
+        logger.info("[%s] Fetched %s sales records. Revenue (7d): $%.2f", state.cycle_id, len(state.sales_data), total_revenue)
         
         # Fetch recent orders
         orders = db.query(schemas.Orders).order_by(schemas.Orders.order_date.desc()).limit(500).all()
@@ -111,7 +112,7 @@ def fetch_data_node(state: CycleState) -> CycleState:
                         "days_overdue": days_overdue,
                         "supplier": sku_data.get("supplier", "Unknown")
                     })
-                    logger.warning(f"⚠️ Order #{order.id} for {order.sku} is overdue by {days_overdue} days!")
+                    logger.warning("⚠️ Order #%s for %s is overdue by %s days!", order.id, order.sku, days_overdue)
         
         # Fetch recent alerts
         alerts = db.query(schemas.Alerts).order_by(schemas.Alerts.created_at.desc()).limit(200).all()
@@ -120,7 +121,7 @@ def fetch_data_node(state: CycleState) -> CycleState:
         return state
         
     except Exception as e:
-        logger.error(f"[{state.cycle_id}] Error fetching data: {str(e)}")
+        logger.error("[%s] Error fetching data: %s", state.cycle_id, str(e))
         state.add_error("DATA_FETCH", str(e))
         return state
     finally:
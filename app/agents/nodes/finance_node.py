@@ -32,7 +32,7 @@ class FinanceNode:
         revenue_factor = settings.REVENUE_REINVESTMENT_RATE
         dynamic_budget = base_budget + (state.recent_sales_revenue * revenue_factor)
         
-        logger.info(f"💰 Finance Agent: Budget set to ${dynamic_budget:.2f}")
+        logger.info("💰 Finance Agent: Budget set to $%.2f", dynamic_budget)
         
         decisions = state.decisions
         reorders = [d for d in decisions if d.get('reorder_required')]
@@ -53,7 +53,7 @@ class FinanceNode:
             state.finance_rejections = []  # Clear old rejections from previous cycle
             logger.info("💰 Finance Agent: Cleared previous negotiation proposals and rejections (Round 0)")
         else:
-            logger.info(f"💰 Finance Agent: Preserving negotiation proposals for Round {state.negotiation_rounds}")
+            logger.info("💰 Finance Agent: Preserving negotiation proposals for Round %s", state.negotiation_rounds)
             
         scored_decisions = []
         
@@ -69,7 +69,7 @@ class FinanceNode:
                     if proposal.get('sku') == decision.get('sku'):
                         negotiated_qty = proposal.get('new_quantity')
                         negotiated_cost = proposal.get('new_cost')
-                        logger.info(f"💬 Using negotiated amount for {decision.get('sku')}: {negotiated_qty} units (was {decision.get('order_quantity')})")
+                        logger.info("💬 Using negotiated amount for %s: %s units (was %s)", decision.get('sku'), negotiated_qty, decision.get('order_quantity'))
                         break
             
             # Use negotiated values if available, otherwise use original
@@ -97,7 +97,7 @@ class FinanceNode:
             
             # DEBUG LOG
             if total_cost > 1000:
-                logger.info(f"💰 FinanceNode: {decision.get('sku', 'UNKNOWN')} qty={qty} unit_cost={unit_cost} total={total_cost}")
+                logger.info("💰 FinanceNode: %s qty=%s unit_cost=%s total=%s", decision.get('sku', 'UNKNOWN'), qty, unit_cost, total_cost)
             
             # Calculate ROI and stockout risk
             daily_demand = float(details.get("daily_avg_demand", 0))
@@ -127,7 +127,7 @@ class FinanceNode:
             scored_decisions.append(decision)
 
         # 3. Optimize Budget Allocation using LP Solver
-        logger.info(f"🧮 Finance Agent: Solving LP for budget ${dynamic_budget:.2f}")
+        logger.info("🧮 Finance Agent: Solving LP for budget $%.2f", dynamic_budget)
         allocation_result = self._solve_budget_allocation(scored_decisions, dynamic_budget, state)
         
         approved_decisions = allocation_result['approved']
@@ -136,7 +136,7 @@ class FinanceNode:
         total_roi = allocation_result['total_roi']
         
         # Log results
-        logger.info(f"✅ LP Solution: Approved {len(approved_decisions)} orders, Cost ${current_spend:.2f}, Total Value ${total_roi:.2f}")
+        logger.info("✅ LP Solution: Approved %s orders, Cost $%.2f, Total Value $%.2f", len(approved_decisions), current_spend, total_roi)
         
         # 4. Process Rejections and Log Dialogue
         for decision in rejected_decisions:
@@ -170,11 +170,11 @@ class FinanceNode:
             
             # CRITICAL: Add to finance_rejections list for negotiation!
             state.finance_rejections.append(decision)
-            logger.debug(f"Finance stored rejection for {sku}. Total rejections: {len(state.finance_rejections)}")
+            logger.debug("Finance stored rejection for %s. Total rejections: %s", sku, len(state.finance_rejections))
             
-            logger.warning(f"❌ Finance: {msg_text}")
+            logger.warning("❌ Finance: %s", msg_text)
         
-        logger.info(f"💰 Finance Agent: {len(approved_decisions)} approved, {len(state.finance_rejections)} rejected for negotiation")
+        logger.info("💰 Finance Agent: %s approved, %s rejected for negotiation", len(approved_decisions), len(state.finance_rejections))
         
         # 5. Handle Negotiation Overrides (Win condition from previous rounds)
         for decision in approved_decisions:
@@ -269,7 +269,7 @@ class FinanceNode:
         total_roi = 0.0
         
         status = pulp.LpStatus[prob.status]
-        logger.info(f"🧮 LP Solver Status: {status}")
+        logger.info("🧮 LP Solver Status: %s", status)
         
         for i in range(len(decisions)):
             if pulp.value(decision_vars[i]) == 1:
@@ -347,7 +347,7 @@ class FinanceNode:
         from app.agents.dialogue_generator import dialogue_generator
         import copy
         
-        logger.info(f"🔄 Finance: Re-optimizing with {len(state.negotiation_proposals)} proposals")
+        logger.info("🔄 Finance: Re-optimizing with %s proposals", len(state.negotiation_proposals))
         
         # 1. Calculate budget (same as initial review)
         base_budget = settings.DEFAULT_BUDGET
@@ -369,7 +369,7 @@ class FinanceNode:
                     break
             
             if not original_decision:
-                logger.warning(f"⚠️ Proposal for {sku} has no matching rejection. Skipping.")
+                logger.warning("⚠️ Proposal for %s has no matching rejection. Skipping.", sku)
                 continue
             
             # Create a new decision with reduced quantity
@@ -390,7 +390,7 @@ class FinanceNode:
                 # Apply heuristic: critical stock items have value = cost * ROI multiplier
                 heuristic_value = proposal['new_cost'] * settings.CRITICAL_STOCK_ROI_MULTIPLIER
                 reduced_decision['finance_metrics']['projected_value'] = heuristic_value
-                logger.info(f"Applied heuristic value for {sku}: ${heuristic_value:.2f} (was ${original_projected_value:.2f})")
+                logger.info("Applied heuristic value for %s: $%.2f (was $%.2f)", sku, heuristic_value, original_projected_value)
             # Else: Keep original projected_value (it's based on daily demand, not quantity)
             
             # Recalculate ROI with new cost
@@ -399,7 +399,7 @@ class FinanceNode:
             reduced_decision['finance_metrics']['roi'] = new_roi
             
             candidates.append(reduced_decision)
-            logger.info(f"✅ Candidate: {sku} qty={proposal['new_quantity']} cost=${proposal['new_cost']:.2f} value=${projected_value:.2f} ROI={new_roi:.2f}x")
+            logger.info("✅ Candidate: %s qty=%s cost=$%.2f value=$%.2f ROI=%.2fx", sku, proposal['new_quantity'], proposal['new_cost'], projected_value, new_roi)
 
         
         if not candidates:
@@ -412,7 +412,7 @@ class FinanceNode:
             }
         
         # 3. RE-RUN LP SOLVER to find optimal allocation
-        logger.info(f"🧮 Re-running LP solver with {len(candidates)} negotiated candidates, budget=${dynamic_budget:.2f}")
+        logger.info("🧮 Re-running LP solver with %s negotiated candidates, budget=$%.2f", len(candidates), dynamic_budget)
         
         # DEBUG: Log all candidates before LP
         logger.info("="*80)
@@ -422,8 +422,8 @@ class FinanceNode:
             cost = cand['finance_metrics']['total_cost']
             value = cand['finance_metrics']['projected_value']
             qty = cand.get('order_quantity')
-            logger.info(f"  [{i}] {sku}: qty={qty}, cost=${cost:.2f}, value=${value:.2f}, ratio={value/cost if cost>0 else 0:.2f}")
-        logger.info(f"BUDGET: ${dynamic_budget:.2f}")
+            logger.info("  [%s] %s: qty=%s, cost=$%.2f, value=$%.2f, ratio=%.2f", i, sku, qty, cost, value, value/cost if cost>0 else 0)
+        logger.info("BUDGET: $%.2f", dynamic_budget)
         logger.info("="*80)
         
         allocation_result = self._solve_budget_allocation(candidates, dynamic_budget, state)
@@ -433,7 +433,7 @@ class FinanceNode:
         current_spend = allocation_result['total_spend']
         total_roi = allocation_result['total_roi']
         
-        logger.info(f"✅ Re-optimization: Approved {len(approved_decisions)}, Spend ${current_spend:.2f}, Value ${total_roi:.2f}")
+        logger.info("✅ Re-optimization: Approved %s, Spend $%.2f, Value $%.2f", len(approved_decisions), current_spend, total_roi)
         
         # 4. Generate dialogue for approvals
         for decision in approved_decisions:
@@ -468,7 +468,7 @@ class FinanceNode:
                 }
             })
             
-            logger.info(f"✅ {acceptance_msg}")
+            logger.info("✅ %s", acceptance_msg)
         
         # 5. Generate dialogue for rejections
         for decision in rejected_decisions:
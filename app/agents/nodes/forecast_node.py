@@ -1,11 +1,18 @@
 # app/agents/nodes/forecast_node.py
 """LangGraph node: Generate 7-day demand forecasts using Hybrid approach (Stats + LLM)."""
 
+import atexit
 import json
 import logging
 import time
-import statistics
-from typing import Dict, Any, List
+import math
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from operator import itemgetter
+from string import Template
+from typing import Dict, Any, List, Optional
+
+import numpy as np
 
 from app.config.llm_config import LLMConfig
 from app.utils.groq_utils import query_groq, try_parse_json_from_text
@@ -15,10 +22,32 @@ from app.utils.prompt_compression import compress_sales_data, compress_inventory
 
 logger = logging.getLogger("forecast_node")
 
+# Stable items with enough history skip the LLM queue entirely
+AUTO_FORECAST_MIN_CONFIDENCE = 0.8
+AUTO_FORECAST_MIN_HISTORY = 14
+
+# Compile the forecast prompt once; substitute() is cheaper than re-parsing
+# the format string for every SKU.
+_FORECAST_TEMPLATE = Template(
+    FORECAST_PROMPT.replace("{sku_summary}", "$sku_summary").replace("{recent_sales}", "$recent_sales")
+)
+
+# Shared by every cycle; workers start on first use. Cycles run on server and
+# agent-pool threads, so workers are spawned rather than forked (a fork can
+# inherit locks held by other threads).
+_STATS_POOL = ProcessPoolExecutor(mp_context=get_context("spawn"))
+atexit.register(_STATS_POOL.shutdown, wait=True)
+
+def _sale_date(sale: Dict[str, Any]):
+    """Sort key for sales rows; rows without a date sort as oldest."""
+    return sale.get("date", "")
+
 def _calculate_statistical_forecast(sales_list: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Calculate forecast using statistical methods (SMA + Trend).
     Returns None if insufficient data, otherwise returns forecast dict.
+    Scalar reference for _vectorized_statistical_forecasts, which the forecast
+    node uses; tests/test_statistical_forecast.py checks the two agree.
     """
     if not sales_list or len(sales_list) < 3:
         return None
@@ -26,7 +55,7 @@ def _calculate_statistical_forecast(sales_list: List[Dict[str, Any]]) -> Dict[st
     # Sort sales by date (newest first) to ensure correct trend calculation
     # Assuming sales_list has 'date' field, otherwise rely on list order
     try:
-        sales_list.sort(key=lambda x: x.get("date", ""), reverse=True)
+        sales_list.sort(key=_sale_date, reverse=True)
     except:
         pass # Fallback to existing order
         
@@ -35,14 +64,24 @@ def _calculate_statistical_forecast(sales_list: List[Dict[str, Any]]) -> Dict[st
     if not quantities:
         return None
         
-    # Simple Moving Average
-    avg = statistics.mean(quantities)
+    # Simple Moving Average + variance in a single Welford pass
+    # (exact integer total for the mean so int() truncation stays stable)
+    n = len(quantities)
+    total = 0
+    mean = 0.0
+    sq_diff = 0.0
+    for i, q in enumerate(quantities, 1):
+        total += q
+        delta = q - mean
+        mean += delta / i
+        sq_diff += delta * (q - mean)
+    avg = total / n
     
     # Simple Trend (last 3 vs prev 3)
     # Note: quantities are newest first, so quantities[:3] is recent
-    if len(quantities) >= 6:
-        recent = statistics.mean(quantities[:3])
-        prev = statistics.mean(quantities[3:6])
+    if n >= 6:
+        recent = sum(quantities[:3]) / 3
+        prev = sum(quantities[3:6]) / 3
         # Avoid division by zero or explosive trends on small numbers
         if prev < 5:
             trend = 0 # Ignore trend if base is too small
@@ -58,17 +97,146 @@ def _calculate_statistical_forecast(sales_list: List[Dict[str, Any]]) -> Dict[st
     forecast_val = max(0, int(forecast_val))
     
     # Calculate volatility (std dev / mean)
-    if len(quantities) > 1:
-        volatility = statistics.stdev(quantities) / max(1, avg)
+    if n > 1:
+        volatility = math.sqrt(sq_diff / (n - 1)) / max(1, avg)
     else:
         volatility = 0
         
     return {
         "forecast": [forecast_val] * 7,
         "confidence": max(0.1, 1.0 - volatility), # High volatility = low confidence
-        "explanation": f"Statistical Forecast (SMA: {avg:.1f}, Trend: {trend:.1%})"
+        "explanation": f"Statistical Forecast (SMA: {avg:.1f}, Trend: {trend:.1%})",
+        "_total_demand": forecast_val * 7  # Read (and stripped) by the spike emit check
     }
 
+def _vectorized_statistical_forecasts(sales_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Same math as _calculate_statistical_forecast, computed for many SKUs at once.
+    Sales history is packed into a padded (n_skus, max_len) matrix, quantized to
+    int16 when values fit, and reduced with NumPy instead of per-SKU Python loops.
+    """
+    n_skus = len(sales_lists)
+    if n_skus == 0:
+        return []
+    
+    rows = []
+    for sales_list in sales_lists:
+        if not sales_list or len(sales_list) < 3:
+            rows.append(None)
+            continue
+        try:
+            sales_list.sort(key=_sale_date, reverse=True)
+        except Exception:
+            pass  # Fallback to existing order
+        rows.append([int(s.get("sold_quantity", 0)) for s in sales_list])
+    
+    width = max((len(r) for r in rows if r), default=0)
+    if width == 0:
+        return [None] * n_skus
+    
+    flat = [q for r in rows if r for q in r]
+    dtype = np.int16 if -32768 <= min(flat) and max(flat) <= 32767 else np.int32
+    
+    Q = np.zeros((n_skus, width), dtype=dtype)
+    counts = np.zeros(n_skus, dtype=np.int32)
+    for i, r in enumerate(rows):
+        if r:
+            Q[i, :len(r)] = r
+            counts[i] = len(r)
+    
+    # Padding is zero, so plain row sums only cover real observations
+    mask = np.arange(width) < counts[:, None]
+    safe_counts = np.maximum(counts, 1)
+    avg = Q.sum(axis=1, dtype=np.int64) / safe_counts
+    
+    # Trend: mean of 3 most recent vs previous 3 (quantities are newest first)
+    trend = np.zeros(n_skus)
+    if width >= 6:
+        recent = Q[:, :3].sum(axis=1, dtype=np.int64) / 3
+        prev = Q[:, 3:6].sum(axis=1, dtype=np.int64) / 3
+        has_trend = (counts >= 6) & (prev >= 5)
+        raw_trend = (recent - prev) / np.where(has_trend, prev, 1)
+        trend = np.where(has_trend, np.clip(raw_trend, -0.5, 0.5), 0.0)
+    
+    forecast_vals = np.maximum(0, np.trunc(avg * (1 + trend * 0.5))).astype(np.int64)
+    
+    # Sample std dev (two-pass) normalized by mean
+    dev = np.where(mask, Q - avg[:, None], 0.0)
+    var = (dev * dev).sum(axis=1) / np.maximum(counts - 1, 1)
+    volatility = np.where(counts > 1, np.sqrt(var) / np.maximum(1, avg), 0.0)
+    confidence = np.maximum(0.1, 1.0 - volatility)
+    
+    results = []
+    for i, r in enumerate(rows):
+        if not r:
+            results.append(None)
+            continue
+        forecast_val = int(forecast_vals[i])
+        results.append({
+            "forecast": [forecast_val] * 7,
+            "confidence": float(confidence[i]),  # High volatility = low confidence
+            "explanation": f"Statistical Forecast (SMA: {avg[i]:.1f}, Trend: {trend[i]:.1%})",
+            "_total_demand": forecast_val * 7  # Read (and stripped) by the spike emit check
+        })
+    return results
+
+def _batch_statistical_forecasts(sales_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Statistical forecasts for many SKUs via the vectorized kernel.
+    Large catalogs are split into chunks and fanned out over _STATS_POOL;
+    small ones stay in-process since the IPC round trip outweighs the work.
+    """
+    if len(sales_lists) < LLMConfig.FORECAST_PROCESS_POOL_MIN_SKUS:
+        return _vectorized_statistical_forecasts(sales_lists)
+    
+    chunk_size = LLMConfig.FORECAST_PROCESS_POOL_MIN_SKUS
+    chunks = [sales_lists[i:i + chunk_size] for i in range(0, len(sales_lists), chunk_size)]
+    try:
+        return [fc for chunk in _STATS_POOL.map(_vectorized_statistical_forecasts, chunks) for fc in chunk]
+    except Exception as e:
+        logger.warning("Process pool forecast failed (%s). Falling back to sequential stats.", e)
+        return _vectorized_statistical_forecasts(sales_lists)
+
+def _llm_forecast_once(prompt: str, sku: str, max_retries: int = 2) -> Optional[Dict[str, Any]]:
+    """
+    Query the forecast LLM and parse its JSON answer.
+    Retries with exponential backoff on errors; returns None when the LLM is
+    unavailable or never produces a valid object so the caller can fall back.
+    """
+    for attempt in range(max_retries):
+        try:
+            raw = query_groq(
+                LLMConfig.FORECAST_MODEL,  # llama-3.3-70b-versatile
+                prompt,
+                timeout=LLMConfig.FORECAST_TIMEOUT,
+                max_tokens=LLMConfig.get_forecast_max_tokens()
+            )
+            
+            if raw is None:
+                logger.warning("LLM unavailable for %s. Using statistical fallback.", sku)
+                return None
+                
+            parsed = try_parse_json_from_text(raw)
+            
+            if parsed and isinstance(parsed, dict):
+                if parsed.get("confidence", 0) < 0.4:
+                    parsed["confidence"] = 0.45
+                forecast_list = parsed.get("forecast")
+                if isinstance(forecast_list, list):
+                    try:
+                        parsed["_total_demand"] = sum(forecast_list)
+                    except TypeError:
+                        pass
+                return parsed
+            
+            logger.warning("LLM returned invalid format for %s: %s. Using fallback.", sku, type(parsed))
+        except Exception as e:
+            logger.warning("LLM forecast attempt %s failed for %s: %s", attempt+1, sku, e)
+            if attempt + 1 < max_retries:
+                time.sleep(LLMConfig.BASE_RETRY_DELAY * (2 ** attempt))
+    
+    return None
+
 def forecast_node(state: CycleState) -> CycleState:
     """
     LangGraph node: Generate 7-day demand forecasts.
@@ -76,21 +244,60 @@ def forecast_node(state: CycleState) -> CycleState:
     """
     
     if state.skip_forecast:
-        logger.info(f"[{state.cycle_id}] Skipping forecast (disabled)")
+        logger.info("[%s] Skipping forecast (disabled)", state.cycle_id)
         return state
     
     try:
-        logger.info(f"[{state.cycle_id}] Generating forecasts for {len(state.inventory_data)} SKUs...")
+        logger.info("[%s] Generating forecasts for %s SKUs...", state.cycle_id, len(state.inventory_data))
         
         forecasts = []
         llm_calls_made = 0
         MAX_LLM_CALLS = LLMConfig.MAX_FORECAST_LLM_CALLS
         
+        # Statistical pass for every SKU (parallelized for large catalogs)
+        skus = list(state.inventory_data.keys())
+        stat_forecasts = _batch_statistical_forecasts([state.sales_by_sku.get(sku, []) for sku in skus])
+        
+        from app.agents.streaming import get_event_writer
+        emit_event = get_event_writer(state.cycle_id)
+        
+        def emit_forecast_event(result):
+            """Emit event immediately for high-demand items"""
+            forecast_dict = result.get('forecast', {})
+            if isinstance(forecast_dict, dict):
+                # Precomputed where the forecast was produced; pop so it doesn't leak downstream
+                total_demand = forecast_dict.pop('_total_demand', None)
+                if total_demand is None:
+                    forecast_list = forecast_dict.get('forecast', [])
+                    total_demand = sum(forecast_list) if isinstance(forecast_list, list) else 0
+                if total_demand > 100:
+                    emit_event(
+                        "forecast", 
+                        f"📈 @InventoryManager, I'm seeing a spike in {result['product_name']}. Predicted sales: {int(total_demand)} units (Confidence: {int(forecast_dict.get('confidence', 0)*100)}%).",
+                        {"sku": result['sku'], "confidence": forecast_dict.get('confidence')}
+                    )
+        
         # Evaluate all items first to prioritize high-value items for LLM
         items_to_forecast = []
-        for sku, item in state.inventory_data.items():
-            recent_sales = state.sales_by_sku.get(sku, [])
-            stat_forecast = _calculate_statistical_forecast(recent_sales)
+        auto_forecasts = 0
+        for sku, stat_forecast in zip(skus, stat_forecasts):
+            item = state.inventory_data[sku]
+            
+            # Fast path: stable, well-observed items use the stat forecast directly
+            if (
+                stat_forecast
+                and stat_forecast['confidence'] > AUTO_FORECAST_MIN_CONFIDENCE
+                and len(state.sales_by_sku.get(sku, [])) >= AUTO_FORECAST_MIN_HISTORY
+            ):
+                result = {
+                    "sku": sku,
+                    "product_name": item.get("product_name"),
+                    "forecast": stat_forecast
+                }
+                forecasts.append(result)
+                emit_forecast_event(result)
+                auto_forecasts += 1
+                continue
             
             # Determine if LLM would be beneficial
             needs_llm = False
@@ -117,7 +324,7 @@ def forecast_node(state: CycleState) -> CycleState:
             })
         
         # Sort by priority (high to low)
-        items_to_forecast.sort(key=lambda x: x["priority"], reverse=True)
+        items_to_forecast.sort(key=itemgetter("priority"), reverse=True)
         
         def process_sku_forecast(forecast_data):
             nonlocal llm_calls_made
@@ -140,7 +347,7 @@ def forecast_node(state: CycleState) -> CycleState:
                 
                 # Check if we're under LLM call limit
                 if needs_llm and llm_calls_made >= MAX_LLM_CALLS:
-                    logger.info(f"LLM call limit reached ({MAX_LLM_CALLS}). Using statistical fallback for {sku}")
+                    logger.info("LLM call limit reached (%s). Using statistical fallback for %s", MAX_LLM_CALLS, sku)
                     return {
                         "sku": sku,
                         "product_name": item.get("product_name"),
@@ -155,44 +362,21 @@ def forecast_node(state: CycleState) -> CycleState:
                 sku_summary = compress_inventory_item(item)
                 sales_summary = compress_sales_data(recent_sales, max_records=30)
                 
-                prompt = FORECAST_PROMPT.format(
+                prompt = _FORECAST_TEMPLATE.substitute(
                     sku_summary=json.dumps(sku_summary, separators=(',', ':')),
                     recent_sales=json.dumps(sales_summary, separators=(',', ':'))
                 )
                 
-                # Call LLM with retry logic
-                for attempt in range(2):
-                    try:
-                        raw = query_groq(
-                            LLMConfig.FORECAST_MODEL,  # llama-3.3-70b-versatile
-                            prompt,
-                            timeout=LLMConfig.FORECAST_TIMEOUT,
-                            max_tokens=500
-                        )
-                        
-                        if raw is None:
-                            logger.warning(f"LLM unavailable for {sku}. Using statistical fallback.")
-                            break
-                            
-                        parsed = try_parse_json_from_text(raw)
-                        
-                        if parsed and isinstance(parsed, dict):
-                            if parsed.get("confidence", 0) < 0.4:
-                                parsed["confidence"] = 0.45
-                            
-                            llm_calls_made += 1
-                            logger.info(f"LLM forecast for {sku} (call {llm_calls_made}/{MAX_LLM_CALLS})")
-                            
-                            return {
-                                "sku": sku,
-                                "product_name": item.get("product_name"),
-                                "forecast": parsed
-                            }
-                        else:
-                            logger.warning(f"LLM returned invalid format for {sku}: {type(parsed)}. Using fallback.")
-                    except Exception as e:
-                        logger.warning(f"LLM forecast attempt {attempt+1} failed for {sku}: {e}")
-                        time.sleep(1)
+                parsed = _llm_forecast_once(prompt, sku)
+                if parsed:
+                    llm_calls_made += 1
+                    logger.info("LLM forecast for %s (call %s/%s)", sku, llm_calls_made, MAX_LLM_CALLS)
+                    
+                    return {
+                        "sku": sku,
+                        "product_name": item.get("product_name"),
+                        "forecast": parsed
+                    }
                 
                 # Fallback to stats
                 return {
@@ -206,13 +390,11 @@ def forecast_node(state: CycleState) -> CycleState:
                 }
                 
             except Exception as e:
-                logger.error(f"Forecast error for {sku}: {e}")
+                logger.error("Forecast error for %s: %s", sku, e)
                 return {"error": str(e), "sku": sku}
 
-        from app.agents.streaming import stream_manager
-        
         # Process items sequentially (parallel processing causes issues with rate limits)
-        logger.info(f"[{state.cycle_id}] Processing {len(items_to_forecast)} items (max {MAX_LLM_CALLS} LLM calls)")
+        logger.info("[%s] Processing %s items (max %s LLM calls), %s auto-forecasted", state.cycle_id, len(items_to_forecast), MAX_LLM_CALLS, auto_forecasts)
         
         for forecast_data in items_to_forecast:
             result = process_sku_forecast(forecast_data)
@@ -220,27 +402,17 @@ def forecast_node(state: CycleState) -> CycleState:
                 state.add_error(result["sku"], f"Forecast failed: {result['error']}")
             else:
                 forecasts.append(result)
-                # Emit event immediately for high-demand items
-                forecast_dict = result.get('forecast', {})
-                if isinstance(forecast_dict, dict):
-                    forecast_list = forecast_dict.get('forecast', [])
-                    total_demand = sum(forecast_list) if isinstance(forecast_list, list) else 0
-                    if total_demand > 100:
-                        stream_manager.emit(
-                            state.cycle_id, 
-                            "forecast", 
-                            f"📈 @InventoryManager, I'm seeing a spike in {result['product_name']}. Predicted sales: {int(total_demand)} units (Confidence: {int(forecast_dict.get('confidence', 0)*100)}%).",
-                            {"sku": result['sku'], "confidence": forecast_dict.get('confidence')}
-                        )
+                emit_forecast_event(result)
         
         state.forecast_results = forecasts
         
-        logger.info(f"[{state.cycle_id}] Generated {len(state.forecast_results)} forecasts ({llm_calls_made} used LLM)")
-        logger.info(f"[{state.cycle_id}] Forecast SKUs: {[f['sku'] for f in forecasts[:10]]}...")  # Show first 10
+        logger.info("[%s] Generated %s forecasts (%s used LLM)", state.cycle_id, len(state.forecast_results), llm_calls_made)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Forecast SKUs: %s...", state.cycle_id, [f['sku'] for f in forecasts[:10]])  # Show first 10
         
         return state
         
     except Exception as e:
-        logger.error(f"[{state.cycle_id}] Fatal forecast error: {str(e)}")
+        logger.error("[%s] Fatal forecast error: %s", state.cycle_id, str(e))
         state.add_error("FORECAST_NODE", str(e))
         return state
@@ -15,8 +15,21 @@ Features:
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from enum import Enum
-import statistics
+from bisect import bisect_right
+from functools import lru_cache
 import logging
+import math
+
+import numpy as np
+
+# Numba is optional: compile the scalar kernels when available, else run them as plain Python.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +44,110 @@ class UrgencyLevel(str, Enum):
     OBSOLETE = "obsolete"      # Product inactive
 
 
-@dataclass
+# Service level → z-score table (sorted by service level) for np.interp.
+# Values between points are interpolated; values outside clamp to the ends.
+_SL_X = np.array([0.80, 0.90, 0.95, 0.99, 0.999])
+_SL_Z = np.array([0.84, 1.28, 1.65, 2.33, 3.09])
+
+
+def _compute_z(service_level: float) -> float:
+    """Service level multiplier (0.95 → ~1.65 sigma, 0.99 → ~2.33 sigma)"""
+    return float(np.interp(service_level, _SL_X, _SL_Z))
+
+# Integer codes produced by the vectorized urgency classifier in decide_batch
+_URGENCY_BY_CODE = (
+    UrgencyLevel.CRITICAL,
+    UrgencyLevel.HIGH,
+    UrgencyLevel.MEDIUM,
+    UrgencyLevel.LOW,
+    UrgencyLevel.OBSOLETE,
+)
+
+# Urgency codes per threshold bucket (bisect_right / searchsorted side='right').
+# Depletion buckets: <0, <0.5*LT, <LT, <2*LT, beyond (-1 = fall through to ROP check).
+_DEPLETION_CODES = (0, 0, 1, 2, -1)
+# ROP buckets: <0.5*ROP, <ROP, <1.5*ROP, beyond.
+_ROP_CODES = (0, 1, 2, 3)
+_ROP_MULTIPLIERS = np.array([0.5, 1.0, 1.5])
+_DEPLETION_CODE_ARRAY = np.array(_DEPLETION_CODES)
+_ROP_CODE_ARRAY = np.array(_ROP_CODES)
+
+# Supply-chain parameters read from each inventory item, with their defaults.
+# The numeric ones come first so decide_batch can slice them into one matrix.
+_SKU_FIELDS = (
+    ("quantity", 0),
+    ("lead_time_days", 7),
+    ("unit_price", 10.0),
+    ("holding_cost_percent", 0.15),
+    ("reorder_cost", 25.0),
+    ("safety_stock", 10),
+    ("min_order_qty", 1),
+    ("max_order_qty", None),
+)
+_NUMERIC_SKU_FIELDS = _SKU_FIELDS[:-1]
+
+
+# --- Scalar numeric kernels (floats in, numbers out; no attribute access so Numba stays in nopython mode) ---
+
+@njit(cache=True)
+def _eoq(daily_avg, reorder_cost, unit_cost, hc_pct, min_q, max_q):
+    """EOQ clamped to [min_q, max_q]; max_q <= 0 means no upper bound."""
+    annual_demand = daily_avg * 365
+    
+    if annual_demand < 1 or reorder_cost < 0.01:
+        return int(min_q)
+    
+    holding_cost_per_unit = unit_cost * hc_pct
+    
+    if holding_cost_per_unit < 0.01:
+        return int(min_q)
+    
+    eoq = int(math.sqrt(2 * annual_demand * reorder_cost / holding_cost_per_unit))
+    
+    # Respect min/max order quantities
+    eoq = max(eoq, int(min_q))
+    if max_q > 0:
+        eoq = min(eoq, int(max_q))
+    
+    return eoq
+
+
+@njit(cache=True)
+def _rop(daily_avg, lead_time, volatility, z_score):
+    """Lead-time demand plus volatility/service-level safety buffer."""
+    lead_time_demand = daily_avg * lead_time
+    volatility_factor = max(0.5, min(2.0, volatility))
+    dynamic_safety = z_score * daily_avg * volatility_factor
+    return int(lead_time_demand + dynamic_safety)
+
+
+@njit(cache=True)
+def _utility(daily_avg, unit_cost, days_coverage, lead_time):
+    """Stockout penalty of not ordering until the next cycle (assumed 7 days)."""
+    daily_revenue = daily_avg * unit_cost
+    days_out_of_stock = max(0.0, 7 + lead_time - days_coverage)
+    
+    # Base penalty: Lost Revenue
+    lost_revenue = days_out_of_stock * daily_revenue
+    
+    # Criticality Multiplier (Non-linear penalty for stockouts)
+    penalty_factor = 1.0
+    if days_coverage < lead_time:
+        penalty_factor = 2.0  # Immediate risk
+    if days_coverage <= 0:
+        penalty_factor = 5.0  # Already stocked out
+    
+    return lost_revenue * penalty_factor
+
+
+# EOQ/ROP are pure functions of a SKU's supply-chain parameters, which rarely
+# change between agent runs; memoize them on the exact inputs so unchanged SKUs
+# skip the kernels without altering any decision.
+_cached_eoq = lru_cache(maxsize=4096)(_eoq)
+_cached_rop = lru_cache(maxsize=4096)(_rop)
+
+
+@dataclass(slots=True)
 class InventoryMetrics:
     """Calculated inventory metrics for a SKU"""
     current_stock: int
@@ -53,7 +169,7 @@ class InventoryMetrics:
         return qty * self.unit_cost * self.holding_cost_percent
 
 
-@dataclass
+@dataclass(slots=True)
 class DecisionResult:
     """Structured decision output"""
     reorder_required: bool
@@ -65,6 +181,24 @@ class DecisionResult:
     utility_score: float = 0.0  # New: Stockout Penalty / Value of Action
 
 
+@dataclass(slots=True)
+class InventoryBatch:
+    """Columnar InventoryMetrics for many SKUs (one float64 array per field)"""
+    current_stock: np.ndarray
+    pending_orders: np.ndarray
+    forecast_7day: np.ndarray
+    daily_avg_demand: np.ndarray
+    demand_volatility: np.ndarray
+    lead_time_days: np.ndarray
+    unit_cost: np.ndarray
+    holding_cost_percent: np.ndarray
+    reorder_cost: np.ndarray
+    safety_stock: np.ndarray
+    min_order_qty: np.ndarray
+    max_order_qty: np.ndarray  # NaN = no cap
+    forecast_confidence: np.ndarray
+
+
 class IntelligentDecisionNode:
     """
     Advanced decision engine using supply chain optimization techniques.
@@ -83,6 +217,7 @@ class IntelligentDecisionNode:
             cost_multiplier: 1.0 = balanced, >1.0 = conservative, <1.0 = aggressive.
         """
         self.service_level = service_level
+        self._z_score = _compute_z(service_level)  # Only depends on service_level
         self.min_confidence_to_order = min_confidence_to_order
         self.cost_multiplier = cost_multiplier
 
@@ -95,8 +230,10 @@ class IntelligentDecisionNode:
     ) -> InventoryMetrics:
         """Extract and calculate inventory metrics from raw data"""
 
-        # Extract current state
-        current_stock = sku_item.get("quantity", 0)
+        # Extract current state and supply chain parameters (with defaults)
+        get = sku_item.get
+        (current_stock, lead_time, unit_price, holding_cost_pct,
+         reorder_cost, safety_stock, min_order_qty, max_order_qty) = [get(k, d) for k, d in _SKU_FIELDS]
         forecast_confidence = forecast.get("confidence", 0.8)
 
         # Extract forecast
@@ -104,25 +241,21 @@ class IntelligentDecisionNode:
         forecast_7day = sum(forecast_list[:7]) if forecast_list else 0
 
         # Calculate demand statistics from recent sales
-        daily_demands = [s.get("sold_quantity", 0) for s in recent_sales]
-        daily_avg = statistics.mean(daily_demands) if daily_demands else forecast_7day / 7
+        daily_demands = np.fromiter(
+            (s.get("sold_quantity", 0) for s in recent_sales),
+            dtype=np.float64,
+            count=len(recent_sales)
+        )
+        n = daily_demands.size
+        daily_avg = float(daily_demands.mean()) if n else forecast_7day / 7
         
         # Volatility: standard deviation of demand (normalized by mean)
-        if len(daily_demands) > 1:
-            std_dev = statistics.stdev(daily_demands) if len(daily_demands) > 1 else 0
+        if n > 1:
+            std_dev = float(daily_demands.std(ddof=1))
             volatility = std_dev / max(0.1, daily_avg)
         else:
             volatility = 0.3  # Default moderate volatility
 
-        # Extract supply chain parameters (with defaults)
-        lead_time = sku_item.get("lead_time_days", 7)
-        unit_price = sku_item.get("unit_price", 10.0)
-        holding_cost_pct = sku_item.get("holding_cost_percent", 0.15)
-        reorder_cost = sku_item.get("reorder_cost", 25.0)
-        safety_stock = sku_item.get("safety_stock", 10)
-        min_order_qty = sku_item.get("min_order_qty", 1)
-        max_order_qty = sku_item.get("max_order_qty")
-
         return InventoryMetrics(
             current_stock=current_stock,
             pending_orders=pending_orders,
@@ -139,34 +272,25 @@ class IntelligentDecisionNode:
             forecast_confidence=forecast_confidence
         )
     
-    def calculate_utility_score(self, metrics: InventoryMetrics) -> float:
+    def calculate_utility_score(self, metrics: InventoryMetrics, days_coverage: Optional[float] = None) -> float:
         """
         Calculate the Utility Score (Stockout Penalty) of NOT ordering.
         Higher score = Higher penalty for stockout = Higher urgency.
         
         Formula: 
           Daily Revenue * Days Out of Stock (if no order) * Criticality Factor
-        """
-        daily_revenue = metrics.daily_avg_demand * metrics.unit_cost
-        
-        # Estimate days out of stock if we don't order until next cycle (assume 7 days)
-        # Effective stock covers how many days?
-        effective_stock = metrics.current_stock + metrics.pending_orders
-        days_coverage = effective_stock / max(0.1, metrics.daily_avg_demand)
-        
-        days_out_of_stock = max(0, 7 + metrics.lead_time_days - days_coverage)
         
-        # Base penalty: Lost Revenue
-        lost_revenue = days_out_of_stock * daily_revenue
-        
-        # Criticality Multiplier (Non-linear penalty for stockouts)
-        penalty_factor = 1.0
-        if days_coverage < metrics.lead_time_days:
-            penalty_factor = 2.0  # Immediate risk
-        if days_coverage <= 0:
-            penalty_factor = 5.0  # Already stocked out
-            
-        return lost_revenue * penalty_factor
+        days_coverage (effective stock / max(0.1, daily demand)) can be passed
+        in when the caller has already computed it.
+        """
+        if days_coverage is None:
+            days_coverage = (metrics.current_stock + metrics.pending_orders) / max(0.1, metrics.daily_avg_demand)
+        return _utility(
+            metrics.daily_avg_demand,
+            metrics.unit_cost,
+            days_coverage,
+            metrics.lead_time_days
+        )
 
     def calculate_eoq(self, metrics: InventoryMetrics) -> int:
         """
@@ -179,25 +303,14 @@ class IntelligentDecisionNode:
           S = reorder cost per order
           H = holding cost per unit per year
         """
-        annual_demand = metrics.daily_avg_demand * 365
-        
-        if annual_demand < 1 or metrics.reorder_cost < 0.01:
-            return metrics.min_order_qty
-        
-        holding_cost_per_unit = metrics.unit_cost * metrics.holding_cost_percent
-        
-        if holding_cost_per_unit < 0.01:
-            return metrics.min_order_qty
-        
-        eoq = (2 * annual_demand * metrics.reorder_cost / holding_cost_per_unit) ** 0.5
-        eoq = int(eoq)
-        
-        # Respect min/max order quantities
-        eoq = max(eoq, metrics.min_order_qty)
-        if metrics.max_order_qty:
-            eoq = min(eoq, metrics.max_order_qty)
-        
-        return eoq
+        return _cached_eoq(
+            metrics.daily_avg_demand,
+            metrics.reorder_cost,
+            metrics.unit_cost,
+            metrics.holding_cost_percent,
+            metrics.min_order_qty,
+            metrics.max_order_qty or -1
+        )
 
     def calculate_dynamic_reorder_point(self, metrics: InventoryMetrics) -> int:
         """
@@ -206,28 +319,13 @@ class IntelligentDecisionNode:
         Formula: ROP = (Daily Demand * Lead Time) + Safety Stock Adjustment
         where Safety Stock varies by volatility and service level.
         """
-        # Base: expected demand during lead time
-        lead_time_demand = metrics.daily_avg_demand * metrics.lead_time_days
-        
-        # Safety stock adjustment based on volatility and service level
         # Higher volatility and service level → more safety stock
-        volatility_factor = max(0.5, min(2.0, metrics.demand_volatility))
-        
-        # Service level multiplier (0.95 → ~1.65 sigma, 0.99 → ~2.33 sigma)
-        service_level_z_score = {
-            0.90: 1.28,
-            0.95: 1.65,
-            0.99: 2.33,
-            0.999: 3.09
-        }
-        z_score = service_level_z_score.get(
-            self.service_level,
-            1.65 + (self.service_level - 0.95) * 10  # Linear interpolation
+        return _cached_rop(
+            metrics.daily_avg_demand,
+            metrics.lead_time_days,
+            metrics.demand_volatility,
+            self._z_score
         )
-        
-        dynamic_safety = z_score * metrics.daily_avg_demand * volatility_factor
-        
-        return int(lead_time_demand + dynamic_safety)
 
     def calculate_urgency(
         self,
@@ -243,31 +341,21 @@ class IntelligentDecisionNode:
         if not metrics.current_stock or not eoq:
             return UrgencyLevel.OBSOLETE
 
-        # Factor 1: Stock depletion time
+        # Factor 1: Stock depletion time (bucketed against [0, 0.5, 1, 2] x lead time)
         if days_until_stockout is not None:
-            if days_until_stockout < 0:
-                return UrgencyLevel.CRITICAL
-            elif days_until_stockout < metrics.lead_time_days * 0.5:
-                return UrgencyLevel.CRITICAL
-            elif days_until_stockout < metrics.lead_time_days:
-                return UrgencyLevel.HIGH
-            elif days_until_stockout < metrics.lead_time_days * 2:
-                return UrgencyLevel.MEDIUM
-
-        # Factor 2: Distance from reorder point
+            lead_time = metrics.lead_time_days
+            bucket = bisect_right((0, lead_time * 0.5, lead_time, lead_time * 2), days_until_stockout)
+            code = _DEPLETION_CODES[bucket]
+            if code >= 0:
+                return _URGENCY_BY_CODE[code]
+
+        # Factor 2: Distance from reorder point (bucketed against [0.5, 1, 1.5] x ROP)
+        # Factor 3 (forecast confidence) also resolves to LOW, so it folds into the last bucket
         effective_stock = metrics.current_stock + metrics.pending_orders
-        if effective_stock < reorder_point * 0.5:
-            return UrgencyLevel.CRITICAL
-        elif effective_stock < reorder_point:
-            return UrgencyLevel.HIGH
-        elif effective_stock < reorder_point * 1.5:
-            return UrgencyLevel.MEDIUM
-
-        # Factor 3: Forecast confidence
-        if metrics.forecast_confidence < 0.4:
-            return UrgencyLevel.LOW  # Uncertain demand → defer if safe
-
-        return UrgencyLevel.LOW
+        bucket = bisect_right(
+            (reorder_point * 0.5, reorder_point, reorder_point * 1.5), effective_stock
+        )
+        return _URGENCY_BY_CODE[_ROP_CODES[bucket]]
 
     def calculate_cost_analysis(
         self,
@@ -299,6 +387,45 @@ class IntelligentDecisionNode:
             "cost_per_unit": total_cost / max(annual_demand, 1)
         }
 
+    def _low_confidence_decision(self, sku_item: Dict[str, Any], forecast_confidence: float) -> DecisionResult:
+        """
+        Low confidence: trust static threshold over dynamic forecast.
+        Reads only stock, threshold and min order qty, so callers can skip extract_metrics.
+        """
+        current_stock = sku_item.get("quantity", 0)
+        threshold = sku_item.get("threshold", 10)
+        
+        # Only order if we are actually below the safety threshold
+        if current_stock < threshold:
+            # Order enough to get to 2x threshold (safe buffer)
+            target_stock = int(threshold * 2)
+            order_qty = max(sku_item.get("min_order_qty", 1), target_stock - current_stock)
+            
+            return DecisionResult(
+                reorder_required=True,
+                order_quantity=order_qty,
+                urgency_level=UrgencyLevel.HIGH,
+                reason=f"Low confidence fallback: Stock {current_stock} < Threshold {threshold}",
+                details={
+                    "forecast_confidence": forecast_confidence,
+                    "type": "threshold_fallback"
+                },
+                cost_analysis={}
+            )
+
+        # Above threshold + low confidence = Wait and see
+        return DecisionResult(
+            reorder_required=False,
+            order_quantity=0,
+            urgency_level=UrgencyLevel.DEFERRED,
+            reason=f"Low forecast confidence & Stock {current_stock} > Threshold {threshold}",
+            details={
+                "forecast_confidence": forecast_confidence,
+                "type": "threshold_hold"
+            },
+            cost_analysis={}
+        )
+
     def decide(
         self,
         sku_item: Dict[str, Any],
@@ -334,63 +461,39 @@ class IntelligentDecisionNode:
                     cost_analysis={}
                 )
 
+            # Check forecast confidence before computing demand statistics:
+            # the low-confidence fallback only needs stock and threshold
+            forecast_confidence = forecast.get("confidence", 0.8)
+            if forecast_confidence < self.min_confidence_to_order:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(
+                        "%s: Low forecast confidence (%.2f), using conservative approach",
+                        sku, forecast_confidence
+                    )
+                return self._low_confidence_decision(sku_item, forecast_confidence)
+
             # Extract metrics from data
             metrics = self.extract_metrics(sku_item, forecast, recent_sales, pending_orders)
             
             # DEBUG LOG
-            if metrics.unit_cost > 50:
-                logger.info(f"💰 DecisionNode: {sku} unit_cost={metrics.unit_cost}")
+            if metrics.unit_cost > 50 and logger.isEnabledFor(logging.INFO):
+                logger.info("💰 DecisionNode: %s unit_cost=%s", sku, metrics.unit_cost)
 
-            # Calculate effective stock (current + pending)
+            # Calculate effective stock (current + pending) and its coverage once;
+            # days_coverage uses the 0.1/day demand floor, days_until_stockout doesn't
             effective_stock = metrics.current_stock + metrics.pending_orders
-
-            # Check forecast confidence
-            if metrics.forecast_confidence < self.min_confidence_to_order:
-                logger.warning(
-                    f"{sku}: Low forecast confidence ({metrics.forecast_confidence:.2f}), "
-                    f"using conservative approach"
-                )
-                # Low confidence: Trust static threshold over dynamic forecast
-                threshold = sku_item.get("threshold", 10)
-                
-                # Only order if we are actually below the safety threshold
-                if metrics.current_stock < threshold:
-                    # Order enough to get to 2x threshold (safe buffer)
-                    target_stock = int(threshold * 2)
-                    order_qty = max(metrics.min_order_qty, target_stock - metrics.current_stock)
-                    
-                    return DecisionResult(
-                        reorder_required=True,
-                        order_quantity=order_qty,
-                        urgency_level=UrgencyLevel.HIGH,
-                        reason=f"Low confidence fallback: Stock {metrics.current_stock} < Threshold {threshold}",
-                        details={
-                            "forecast_confidence": metrics.forecast_confidence,
-                            "type": "threshold_fallback"
-                        },
-                        cost_analysis={}
-                    )
-                else:
-                    # Above threshold + low confidence = Wait and see
-                    return DecisionResult(
-                        reorder_required=False,
-                        order_quantity=0,
-                        urgency_level=UrgencyLevel.DEFERRED,
-                        reason=f"Low forecast confidence & Stock {metrics.current_stock} > Threshold {threshold}",
-                        details={
-                            "forecast_confidence": metrics.forecast_confidence,
-                            "type": "threshold_hold"
-                        },
-                        cost_analysis={}
-                    )
+            daily_avg = metrics.daily_avg_demand
+            days_coverage = effective_stock / max(0.1, daily_avg)
 
             # Calculate key metrics
             eoq = self.calculate_eoq(metrics)
             reorder_point = self.calculate_dynamic_reorder_point(metrics)
 
             # Calculate days until stockout (using effective stock)
-            if metrics.daily_avg_demand > 0:
-                days_until_stockout = effective_stock / metrics.daily_avg_demand
+            if daily_avg >= 0.1:
+                days_until_stockout = days_coverage
+            elif daily_avg > 0:
+                days_until_stockout = effective_stock / daily_avg
             else:
                 days_until_stockout = None
 
@@ -460,7 +563,7 @@ class IntelligentDecisionNode:
                 )
 
             # Calculate Utility Score (Stockout Penalty)
-            utility_score = self.calculate_utility_score(metrics)
+            utility_score = self.calculate_utility_score(metrics, days_coverage)
 
             return DecisionResult(
                 reorder_required=reorder_required,
@@ -473,7 +576,7 @@ class IntelligentDecisionNode:
             )
 
         except Exception as e:
-            logger.error(f"Decision error for {sku_item.get('sku', 'UNKNOWN')}: {str(e)}")
+            logger.error("Decision error for %s: %s", sku_item.get('sku', 'UNKNOWN'), str(e))
             # Fallback: conservative reorder
             current = sku_item.get("quantity", 0)
             threshold = sku_item.get("threshold", 10)
@@ -491,3 +594,279 @@ class IntelligentDecisionNode:
                 cost_analysis={},
                 utility_score=100.0 # Default fallback utility
             )
+
+    def extract_metrics_batch(
+        self,
+        sku_items: List[Dict[str, Any]],
+        forecasts: List[Dict[str, Any]],
+        recent_sales_list: List[List[Dict[str, Any]]],
+        pending_orders: List[int]
+    ) -> InventoryBatch:
+        """Columnar extract_metrics: one InventoryBatch instead of N InventoryMetrics"""
+        n = len(sku_items)
+
+        # Supply chain parameters (missing keys use the same defaults as extract_metrics),
+        # gathered row-wise in one pass and split into columns
+        params = np.array(
+            [[item.get(k, d) for k, d in _NUMERIC_SKU_FIELDS] for item in sku_items],
+            dtype=np.float64
+        ).reshape(n, len(_NUMERIC_SKU_FIELDS))
+        current_stock, lead_time, unit_cost, hc_pct, reorder_cost, safety_stock, min_q = params.T
+        max_q = np.array([item.get("max_order_qty") or np.nan for item in sku_items], dtype=np.float64)
+
+        # Forecast inputs
+        forecast_7day = np.array(
+            [sum(f.get("forecast", [])[:7]) if f.get("forecast") else 0 for f in forecasts],
+            dtype=np.float64
+        )
+        confidence = np.array([f.get("confidence", 0.8) for f in forecasts], dtype=np.float64)
+
+        # Recent sales packed into a NaN-padded (n, max_len) matrix
+        counts = np.array([len(sales) for sales in recent_sales_list], dtype=np.int64)
+        width = int(counts.max()) if n else 0
+        sales = np.full((n, max(width, 1)), np.nan, dtype=np.float64)
+        for i, rows in enumerate(recent_sales_list):
+            if rows:
+                sales[i, :len(rows)] = [s.get("sold_quantity", 0) for s in rows]
+
+        safe_counts = np.maximum(counts, 1)
+        sales_sum = np.nansum(sales, axis=1)
+        daily_avg = np.where(counts > 0, sales_sum / safe_counts, forecast_7day / 7)
+        sq_dev = np.nansum((sales - daily_avg[:, None]) ** 2, axis=1)
+        std_dev = np.sqrt(sq_dev / np.maximum(counts - 1, 1))
+        volatility = np.where(counts > 1, std_dev / np.maximum(0.1, daily_avg), 0.3)
+
+        return InventoryBatch(
+            current_stock=current_stock,
+            pending_orders=np.array(pending_orders, dtype=np.float64),
+            forecast_7day=forecast_7day,
+            daily_avg_demand=daily_avg,
+            demand_volatility=volatility,
+            lead_time_days=lead_time,
+            unit_cost=unit_cost,
+            holding_cost_percent=hc_pct,
+            reorder_cost=reorder_cost,
+            safety_stock=safety_stock,
+            min_order_qty=min_q,
+            max_order_qty=max_q,
+            forecast_confidence=confidence
+        )
+
+    def metrics_at(
+        self,
+        batch: InventoryBatch,
+        i: int,
+        sku_item: Dict[str, Any],
+        forecast: Dict[str, Any]
+    ) -> InventoryMetrics:
+        """
+        Row i of an extract_metrics_batch result as InventoryMetrics.
+        Demand statistics come from the batch; raw supply-chain fields are
+        re-read from sku_item so they keep their stored types.
+        """
+        get = sku_item.get
+        (current_stock, lead_time, unit_price, holding_cost_pct,
+         reorder_cost, safety_stock, min_order_qty, max_order_qty) = [get(k, d) for k, d in _SKU_FIELDS]
+        forecast_list = forecast.get("forecast", [])
+
+        return InventoryMetrics(
+            current_stock=current_stock,
+            pending_orders=int(batch.pending_orders[i]),
+            forecast_7day=sum(forecast_list[:7]) if forecast_list else 0,
+            daily_avg_demand=float(batch.daily_avg_demand[i]),
+            demand_volatility=float(batch.demand_volatility[i]),
+            lead_time_days=lead_time,
+            unit_cost=unit_price,
+            holding_cost_percent=holding_cost_pct,
+            reorder_cost=reorder_cost,
+            safety_stock=safety_stock,
+            min_order_qty=min_order_qty,
+            max_order_qty=max_order_qty,
+            forecast_confidence=forecast.get("confidence", 0.8)
+        )
+
+    def calculate_eoq_batch(self, metrics: InventoryBatch) -> np.ndarray:
+        """calculate_eoq over an InventoryBatch; returns truncated float64 quantities"""
+        # EOQ = sqrt(2 * D * S / H), clamped to min/max order quantities
+        min_q = metrics.min_order_qty
+        max_q = metrics.max_order_qty
+        annual_demand = metrics.daily_avg_demand * 365
+        holding_per_unit = metrics.unit_cost * metrics.holding_cost_percent
+        use_min = (annual_demand < 1) | (metrics.reorder_cost < 0.01) | (holding_per_unit < 0.01)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_eoq = np.trunc(np.sqrt(2 * annual_demand * metrics.reorder_cost / holding_per_unit))
+        eoq = np.maximum(np.where(use_min, min_q, raw_eoq), min_q)
+        eoq = np.where(use_min, min_q, np.where(np.isnan(max_q), eoq, np.minimum(eoq, max_q)))
+        return np.nan_to_num(eoq)
+
+    def calculate_dynamic_reorder_point_batch(self, metrics: InventoryBatch) -> np.ndarray:
+        """calculate_dynamic_reorder_point over an InventoryBatch"""
+        # ROP = lead-time demand + z * demand * volatility factor
+        daily_avg = metrics.daily_avg_demand
+        return np.trunc(
+            daily_avg * metrics.lead_time_days
+            + self._z_score * daily_avg * np.clip(metrics.demand_volatility, 0.5, 2.0)
+        )
+
+    def decide_batch(
+        self,
+        sku_items: List[Dict[str, Any]],
+        forecasts: List[Dict[str, Any]],
+        recent_sales_list: List[List[Dict[str, Any]]],
+        pending_orders: Optional[List[int]] = None
+    ) -> List[DecisionResult]:
+        """
+        Vectorized equivalent of calling decide() for each SKU.
+        
+        Inputs are packed into per-field NumPy arrays (structure of arrays) so
+        EOQ, ROP, stockout horizon, urgency and cost analysis are computed in a
+        handful of array ops instead of per-SKU Python calls. DecisionResult
+        objects are only materialized at the end.
+        
+        Inactive SKUs and rows with missing/invalid numeric inputs are routed
+        through decide() so their results (including error fallbacks) match.
+        """
+        n = len(sku_items)
+        if n == 0:
+            return []
+        if pending_orders is None:
+            pending_orders = [0] * n
+
+        metrics = self.extract_metrics_batch(sku_items, forecasts, recent_sales_list, pending_orders)
+        current_stock = metrics.current_stock
+        pending = metrics.pending_orders
+        forecast_7day = metrics.forecast_7day
+        daily_avg = metrics.daily_avg_demand
+        volatility = metrics.demand_volatility
+        lead_time = metrics.lead_time_days
+        unit_cost = metrics.unit_cost
+        hc_pct = metrics.holding_cost_percent
+        reorder_cost = metrics.reorder_cost
+        safety_stock = metrics.safety_stock
+        confidence = metrics.forecast_confidence
+        active = np.array([bool(item.get("is_active", True)) for item in sku_items])
+
+        # Rows that can't be computed numerically go through the scalar path
+        numeric = np.column_stack([
+            current_stock, lead_time, unit_cost, hc_pct, reorder_cost,
+            safety_stock, metrics.min_order_qty, pending, confidence, daily_avg
+        ])
+        scalar_path = ~active | ~np.isfinite(numeric).all(axis=1)
+
+        annual_demand = daily_avg * 365
+        eoq = self.calculate_eoq_batch(metrics)
+        reorder_point = self.calculate_dynamic_reorder_point_batch(metrics)
+
+        effective_stock = current_stock + pending
+        days_coverage = effective_stock / np.maximum(0.1, daily_avg)
+        has_demand = daily_avg > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days_until_stockout = np.where(
+                daily_avg >= 0.1,
+                days_coverage,
+                np.where(has_demand, effective_stock / np.where(has_demand, daily_avg, 1), np.nan)
+            )
+
+        reorder_required = (effective_stock < reorder_point) | (effective_stock == 0)
+        order_qty = np.where(reorder_required, np.maximum(0, reorder_point + eoq - effective_stock), 0)
+
+        # Urgency: row-wise searchsorted (side='right') into per-SKU bounds,
+        # then a table lookup, mirroring calculate_urgency without branches
+        depletion_bounds = np.stack([np.zeros(n), lead_time * 0.5, lead_time, lead_time * 2], axis=1)
+        depletion_code = _DEPLETION_CODE_ARRAY[(days_until_stockout[:, None] >= depletion_bounds).sum(axis=1)]
+        rop_bounds = reorder_point[:, None] * _ROP_MULTIPLIERS
+        rop_code = _ROP_CODE_ARRAY[(effective_stock[:, None] >= rop_bounds).sum(axis=1)]
+        urgency_code = np.where(
+            (current_stock == 0) | (eoq == 0),
+            4,
+            np.where(has_demand & (depletion_code >= 0), depletion_code, rop_code)
+        )
+
+        # Cost analysis at EOQ
+        orders_per_year = np.where(eoq > 0, annual_demand / np.where(eoq > 0, eoq, 1), 0)
+        annual_ordering_cost = orders_per_year * reorder_cost
+        avg_inventory = eoq / 2 + safety_stock
+        annual_holding_cost = avg_inventory * unit_cost * hc_pct
+        total_annual_cost = annual_ordering_cost + annual_holding_cost
+        cost_per_unit = total_annual_cost / np.maximum(annual_demand, 1)
+
+        # Utility score (stockout penalty of not ordering)
+        days_out_of_stock = np.maximum(0, 7 + lead_time - days_coverage)
+        penalty_factor = np.where(days_coverage <= 0, 5.0, np.where(days_coverage < lead_time, 2.0, 1.0))
+        utility_score = days_out_of_stock * daily_avg * unit_cost * penalty_factor
+
+        results: List[DecisionResult] = []
+        for i, sku_item in enumerate(sku_items):
+            if scalar_path[i]:
+                results.append(self.decide(sku_item, forecasts[i], recent_sales_list[i], pending_orders[i]))
+                continue
+
+            sku = sku_item.get("sku", "UNKNOWN")
+            stock = sku_item.get("quantity", 0)
+            conf = confidence[i]
+
+            # Low confidence: trust static threshold over dynamic forecast
+            if conf < self.min_confidence_to_order:
+                results.append(self._low_confidence_decision(sku_item, float(conf)))
+                continue
+
+            eff = int(effective_stock[i])
+            rop = int(reorder_point[i])
+            eoq_i = int(eoq[i])
+            qty = int(order_qty[i])
+            lt = sku_item.get("lead_time_days", 7)
+            avg_i = float(daily_avg[i])
+            days_i = float(days_until_stockout[i]) if has_demand[i] else None
+            urgency = _URGENCY_BY_CODE[urgency_code[i]]
+
+            details = {
+                "current_stock": stock,
+                "pending_orders": pending_orders[i],
+                "effective_stock": eff,
+                "reorder_point": rop,
+                "eoq": eoq_i,
+                "lead_time_days": lt,
+                "daily_avg_demand": f"{avg_i:.1f}",
+                "forecast_7day": int(forecast_7day[i]),
+                "demand_volatility": f"{volatility[i]:.2f}",
+                "forecast_confidence": float(conf),
+                "days_until_stockout": f"{days_i:.1f}" if days_i else "N/A",
+                "safety_stock": sku_item.get("safety_stock", 10),
+                "unit_price": sku_item.get("unit_price", 10.0)
+            }
+            cost_analysis = {
+                "annual_demand": float(annual_demand[i]),
+                "orders_per_year": float(orders_per_year[i]),
+                "annual_ordering_cost": float(annual_ordering_cost[i]),
+                "avg_inventory": float(avg_inventory[i]),
+                "annual_holding_cost": float(annual_holding_cost[i]),
+                "total_annual_cost": float(total_annual_cost[i]),
+                "cost_per_unit": float(cost_per_unit[i]),
+                "purchasing_cost_per_unit": sku_item.get("unit_price", 10.0)
+            }
+
+            if reorder_required[i]:
+                reason = (
+                    f"{sku}: Effective Stock {eff} (Cur: {stock} + Pend: {pending_orders[i]}) < ROP {rop}. "
+                    f"Order {qty} units (EOQ: {eoq_i}, Lead: {lt}d, "
+                    f"Demand: {avg_i:.1f}/day). "
+                    f"Urgency: {urgency.value}."
+                )
+            else:
+                reason = (
+                    f"{sku}: Effective Stock {eff} >= ROP {rop}. "
+                    f"No reorder needed (EOQ: {eoq_i}, Lead: {lt}d). "
+                    f"Next review in {max(1, int(eff / max(1, avg_i)))} days."
+                )
+
+            results.append(DecisionResult(
+                reorder_required=bool(reorder_required[i]),
+                order_quantity=qty,
+                urgency_level=urgency,
+                reason=reason,
+                details=details,
+                cost_analysis=cost_analysis,
+                utility_score=float(utility_score[i])
+            ))
+
+        return results
@@ -2,52 +2,65 @@
 from app.models import schemas
 from app.models.database import SessionLocal
 from sqlalchemy.orm import Session
-import json
+from concurrent.futures import Future, ThreadPoolExecutor
+import atexit
+import orjson
 import logging
 
 logger = logging.getLogger("memory_node")
 
+# Run summaries are a side-effect log, so they are written off the agent thread.
+# A single worker keeps writes in submission order.
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mem-writer")
+atexit.register(_WRITER.shutdown, wait=True)
+
+# Decision/forecast payloads may carry NumPy scalars or arrays from the batch paths
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
+
 def append_run_summary(session_factory, summary: dict):
     db: Session = session_factory()
     try:
-        msg = f"Agent run at {summary.get('run_at')}: processed {len(summary.get('summary', []))} items."
+        items = summary.get("summary", [])
+        item_count = len(items)
+        msg = f"Agent run at {summary.get('run_at')}: processed {item_count} items."
         alert = schemas.Alerts(message=msg, type="AgentRun")
-        db.add(alert)
         
         # Extract decision summaries from each item
-        decision_summary_list = []
-        for item in summary.get("summary", []):
-            decision = item.get("decision", {})
-            if decision:
-                decision_summary_list.append({
-                    "sku": item.get("sku"),
-                    "product_name": item.get("product_name"),
-                    "reorder_required": decision.get("reorder_required"),
-                    "order_quantity": decision.get("order_quantity"),
-                    "urgency_level": decision.get("urgency_level"),
-                    "reason": decision.get("reason"),
-                    "explanation": decision.get("explanation")
-                })
+        decision_summary_list = [
+            {
+                "sku": item.get("sku"),
+                "product_name": item.get("product_name"),
+                "reorder_required": decision.get("reorder_required"),
+                "order_quantity": decision.get("order_quantity"),
+                "urgency_level": decision.get("urgency_level"),
+                "reason": decision.get("reason"),
+                "explanation": decision.get("explanation")
+            }
+            for item in items
+            if (decision := item.get("decision"))
+        ]
         
         # Store full context and create a summary for the decision field
-        decision_summary = json.dumps(decision_summary_list)
-        reasoning_summary = f"Processed {len(summary.get('summary', []))} SKUs. Reorders triggered: {sum(1 for item in summary.get('summary', []) if item.get('decision', {}).get('reorder_required', False))}"
+        decision_summary = orjson.dumps(decision_summary_list, option=_ORJSON_OPTS).decode()
+        reasoning_summary = f"Processed {item_count} SKUs. Reorders triggered: {sum(1 for item in items if item.get('decision', {}).get('reorder_required', False))}"
         
         mem = schemas.AgentMemory(
-            context=json.dumps(summary.get("summary", [])),  # Full data (will be stored in TEXT column in DB)
+            context=orjson.dumps(items, option=_ORJSON_OPTS).decode(),  # Full data (will be stored in TEXT column in DB)
             decision=decision_summary,  # Decision summaries
             reasoning=reasoning_summary  # Summary text
         )
-        db.add(mem)
+        # Plain rows with no ORM events: skip per-instance unit-of-work bookkeeping
+        db.bulk_save_objects([alert, mem], return_defaults=True)
         db.commit()
-        logger.info(f"Memory saved: {len(summary.get('summary', []))} items processed")
+        logger.info("Memory saved: %s items processed", item_count)
         return {"alert_id": alert.id, "memory_id": mem.id}
     except Exception as e:
-        logger.error(f"Error saving memory: {e}", exc_info=True)
+        logger.error("Error saving memory: %s", e, exc_info=True)
         return {"error": str(e)}
     finally:
         db.close()
 
 class MemoryNode:
-    def append_run_summary(self, session_factory, summary: dict):
-        return append_run_summary(session_factory, summary)
+    def append_run_summary(self, session_factory, summary: dict) -> Future:
+        """Queue the summary write on the background writer; returns its Future."""
+        return _WRITER.submit(append_run_summary, session_factory, summary)
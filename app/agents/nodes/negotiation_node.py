@@ -1,12 +1,24 @@
 # app/agents/nodes/negotiation_node.py
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
+
+import numpy as np
+import orjson
+
 from app.agents.state import CycleState
+from app.agents.reasoning_prompts import NEGOTIATION_BATCH_PROMPT
 from app.config import LLMConfig
-from app.utils.groq_utils import query_groq
+from app.utils.groq_utils import query_groq, try_parse_json_from_text
 
 logger = logging.getLogger("negotiation_node")
 
+# Days-until-stockout bucket bounds -> share of the requested quantity to keep.
+# More urgent items get higher factors (buy more of what we need):
+# <3d 60% (critical), <7d 50% (moderate), <14d 40% (low), else 30% (very low)
+_REDUCTION_BOUNDS = np.array([3.0, 7.0, 14.0])
+_REDUCTION_FACTORS = np.array([0.6, 0.5, 0.4, 0.3])
+
 class NegotiationNode:
     """
     Negotiation Agent: Proposes QUANTITY REDUCTIONS for rejected orders.
@@ -18,14 +30,70 @@ class NegotiationNode:
         Calculate how much to reduce order quantity based on urgency.
         More urgent items get higher reduction factors (buy more of what we need).
         """
-        if days_until_stockout < 3:
-            return 0.6  # Buy 60% of requested (critical urgency)
-        elif days_until_stockout < 7:
-            return 0.5  # Buy 50% (moderate urgency)
-        elif days_until_stockout < 14:
-            return 0.4  # Buy 40% (low urgency)
-        else:
-            return 0.3  # Buy 30% (very low urgency)
+        return float(_REDUCTION_FACTORS[np.searchsorted(_REDUCTION_BOUNDS, days_until_stockout, side="right")])
+    
+    def calculate_reduction_factors(self, days_until_stockout: np.ndarray) -> np.ndarray:
+        """Vectorized calculate_reduction_factor over an array of days-until-stockout."""
+        return _REDUCTION_FACTORS[np.searchsorted(_REDUCTION_BOUNDS, days_until_stockout, side="right")]
+    
+    def _call_llm(self, batch: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Request justifications for one batch of candidates; returns {sku: justification}."""
+        items_json = orjson.dumps([
+            {
+                "sku": c["sku"],
+                "product_name": c["product_name"],
+                "original_qty": c["original_qty"],
+                "original_cost": round(c["original_cost"], 2),
+                "stock": c["current_stock"],
+                "days_until_stockout": round(c["days_until_stockout"], 1),
+                "urgency": "CRITICAL" if c["days_until_stockout"] < 7 else "MODERATE",
+                "proposed_qty": c["new_qty"],
+                "proposed_cost": round(c["new_cost"], 2),
+                "reduction_pct": round(c["reduction_factor"] * 100)
+            }
+            for c in batch
+        ]).decode()
+        
+        justifications = {}
+        try:
+            response_text = query_groq(
+                model=LLMConfig.NEGOTIATION_MODEL,
+                prompt=NEGOTIATION_BATCH_PROMPT.format(items_json=items_json),
+                timeout=LLMConfig.NEGOTIATION_TIMEOUT,
+                max_tokens=LLMConfig.NEGOTIATION_TOKENS_PER_ITEM * len(batch)
+            )
+            parsed = try_parse_json_from_text(response_text)
+            if not isinstance(parsed, list):
+                raise ValueError(f"expected JSON array, got {type(parsed).__name__}")
+            
+            for entry in parsed:
+                if isinstance(entry, dict) and entry.get("sku") and entry.get("justification"):
+                    justifications[str(entry["sku"])] = str(entry["justification"]).strip()
+        except Exception as e:
+            logger.error("LLM negotiation failed for %s: %s", [c['sku'] for c in batch], e)
+        
+        return justifications
+    
+    def generate_justifications(self, candidates: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Ask the LLM for proposal justifications for many SKUs with one prompt per
+        batch (LLMConfig.NEGOTIATION_BATCH_SIZE items) instead of one call per SKU.
+        Batches are I/O-bound and independent, so they run concurrently.
+        
+        Returns {sku: justification}; SKUs missing from the response are omitted
+        so the caller can fall back to a templated justification.
+        """
+        batch_size = max(1, LLMConfig.NEGOTIATION_BATCH_SIZE)
+        batches = [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+        if not batches:
+            return {}
+        
+        justifications = {}
+        with ThreadPoolExecutor(max_workers=min(LLMConfig.NEGOTIATION_MAX_WORKERS, len(batches))) as executor:
+            for result in executor.map(self._call_llm, batches):
+                justifications.update(result)
+        
+        return justifications
     
     def generate_counter_arguments(
         self, 
@@ -39,7 +107,7 @@ class NegotiationNode:
         
         Returns proposals with reduced quantities that can be re-optimized by Finance.
         """
-        proposals = []
+        candidates = []
         
         for rejected in rejected_items:
             sku = rejected.get('sku')
@@ -61,57 +129,49 @@ class NegotiationNode:
             
             # Only negotiate for critical items (stock below threshold)
             if current_stock >= threshold:
-                logger.debug(f"Skipping {sku}: Not critical (stock {current_stock} >= threshold {threshold})")
+                logger.debug("Skipping %s: Not critical (stock %s >= threshold %s)", sku, current_stock, threshold)
                 continue
             
-            # Calculate proposed reduction
-            reduction_factor = self.calculate_reduction_factor(days_until_stockout, current_stock)
-            new_qty = int(original_qty * reduction_factor)
-            new_cost = new_qty * unit_cost
-            
-            # Ensure minimum order quantity
-            if new_qty < 10:
-                new_qty = max(10, int(original_qty * 0.3))  # At least 30% or 10 units
-                new_cost = new_qty * unit_cost
-            
-            # Generate LLM justification for the proposal
-            prompt = f"""Supply Chain Negotiation: Propose quantity reduction to fit budget.
-
-CONTEXT:
-- Product: {product_name} (SKU: {sku})
-- Original Request: {original_qty} units @ ${fin_metrics.get('total_cost', 0):.2f}
-- Current Stock: {current_stock} units
-- Days Until Stockout: {days_until_stockout:.1f} days
-- Urgency: {'CRITICAL' if days_until_stockout < 7 else 'MODERATE'}
-
-PROPOSAL:
-- Reduced Quantity: {new_qty} units ({reduction_factor*100:.0f}% of original)
-- Reduced Cost: ${new_cost:.2f}
-- Justification: Reduce quantity to fit within budget while addressing critical stock shortage
-
-Generate a concise 2-sentence justification explaining:
-1. Why this product is critical (stockout risk)
-2. Why the reduced quantity is acceptable (buys time until next cycle)
-
-Format: "JUSTIFICATION: [your text]"
-"""
+            candidates.append({
+                "sku": sku,
+                "product_name": product_name,
+                "original_qty": original_qty,
+                "original_cost": fin_metrics.get('total_cost', 0),
+                "unit_cost": unit_cost,
+                "current_stock": current_stock,
+                "days_until_stockout": days_until_stockout
+            })
+        
+        # Calculate proposed reductions for all critical items in one pass
+        if candidates:
+            factors = self.calculate_reduction_factors(
+                np.fromiter((c["days_until_stockout"] for c in candidates), dtype=np.float64, count=len(candidates))
+            ).tolist()
             
-            try:
-                response_text = query_groq(
-                    model=LLMConfig.NEGOTIATION_MODEL,
-                    prompt=prompt,
-                    timeout=LLMConfig.NEGOTIATION_TIMEOUT,
-                    max_tokens=200
-                )
+            for c, reduction_factor in zip(candidates, factors):
+                original_qty = c["original_qty"]
+                new_qty = int(original_qty * reduction_factor)
                 
-                # Extract justification
-                justification = response_text
-                if "JUSTIFICATION:" in response_text:
-                    justification = response_text.split("JUSTIFICATION:")[-1].strip()
-                    
-            except Exception as e:
-                logger.error(f"LLM negotiation failed for {sku}: {e}")
-                justification = f"Critical stock shortage. Reduced to {reduction_factor*100:.0f}% quantity to fit budget."
+                # Ensure minimum order quantity
+                if new_qty < 10:
+                    new_qty = max(10, int(original_qty * 0.3))  # At least 30% or 10 units
+                
+                c["reduction_factor"] = reduction_factor
+                c["new_qty"] = new_qty
+                c["new_cost"] = new_qty * c["unit_cost"]
+        
+        # Generate LLM justifications for all proposals in batched prompts
+        justifications = self.generate_justifications(candidates) if candidates else {}
+        
+        proposals = []
+        for c in candidates:
+            sku = c["sku"]
+            reduction_factor = c["reduction_factor"]
+            new_qty = c["new_qty"]
+            new_cost = c["new_cost"]
+            justification = justifications.get(str(sku)) or (
+                f"Critical stock shortage. Reduced to {reduction_factor*100:.0f}% quantity to fit budget."
+            )
             
             # Create FIPA PROPOSE message
             fipa_message = {
@@ -121,9 +181,9 @@ Format: "JUSTIFICATION: [your text]"
                 "content": {
                     "proposal": "Quantity Reduction",
                     "sku": sku,
-                    "original_quantity": original_qty,
+                    "original_quantity": c["original_qty"],
                     "proposed_quantity": new_qty,
-                    "cost_reduction": fin_metrics.get('total_cost', 0) - new_cost,
+                    "cost_reduction": c["original_cost"] - new_cost,
                     "justification": justification
                 },
                 "language": "JSON",
@@ -133,18 +193,18 @@ Format: "JUSTIFICATION: [your text]"
             
             proposals.append({
                 "sku": sku,
-                "product_name": product_name,
-                "original_quantity": original_qty,
+                "product_name": c["product_name"],
+                "original_quantity": c["original_qty"],
                 "new_quantity": new_qty,
                 "new_cost": new_cost,
                 "reduction_factor": reduction_factor,
-                "days_until_stockout": days_until_stockout,
+                "days_until_stockout": c["days_until_stockout"],
                 "counter_argument": justification,  # For backward compatibility with War Room
                 "fipa": fipa_message,
                 "timestamp": state.started_at.isoformat()
             })
             
-            logger.info(f"💬 Negotiation: Propose {sku} qty reduction {original_qty} → {new_qty} (${new_cost:.2f})")
+            logger.info("💬 Negotiation: Propose %s qty reduction %s → %s ($%.2f)", sku, c['original_qty'], new_qty, new_cost)
         
         return proposals
 
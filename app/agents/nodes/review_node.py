@@ -1,10 +1,26 @@
 # app/agents/nodes/review_node.py
 import logging
+from operator import itemgetter, methodcaller
+from types import MappingProxyType
 from typing import Dict, Any, List
+
+import numpy as np
+
 from app.agents.state import CycleState
 
 logger = logging.getLogger("review_node")
 
+_EMPTY = MappingProxyType({})
+_order_quantity = methodcaller("get", "order_quantity", 0)
+_requires_approval = itemgetter("requires_approval")
+
+def _unit_cost(decision: Dict[str, Any]) -> float:
+    """Unit cost from details, falling back to cost analysis if missing."""
+    return (
+        (decision.get("details") or _EMPTY).get("unit_cost", 0)
+        or (decision.get("cost_analysis") or _EMPTY).get("cost_per_unit", 0)
+    )
+
 class ReviewNode:
     """
     Review Node: Human-in-the-Loop Guardrail.
@@ -22,46 +38,42 @@ class ReviewNode:
         """
         Review decisions and flag those needing approval.
         """
-        logger.info(f"🛡️ Review Node: Checking {len(state.decisions)} decisions for risk...")
+        logger.info("🛡️ Review Node: Checking %s decisions for risk...", len(state.decisions))
         
-        reviewed_decisions = []
-        approval_queue = []
+        decisions = state.decisions
+        n = len(decisions)
         
-        for decision in state.decisions:
-            # Calculate estimated cost
-            qty = decision.get("order_quantity", 0)
-            # Try to get cost from details, or estimate
-            details = decision.get("details", {})
-            unit_cost = details.get("unit_cost", 0)
-            if not unit_cost:
-                 # Fallback to cost analysis if available
-                 cost_analysis = decision.get("cost_analysis", {})
-                 unit_cost = cost_analysis.get("cost_per_unit", 0)
-            
-            total_cost = qty * unit_cost
-            
-            # Check threshold
-            if total_cost > self.approval_threshold:
-                # Flag for approval
-                decision["requires_approval"] = True
-                decision["approval_reason"] = f"High value order (${total_cost:.2f} > ${self.approval_threshold})"
-                approval_queue.append(decision)
-                logger.warning(f"✋ Review Node: Flagged {decision['sku']} for approval (Cost: ${total_cost:.2f})")
-            else:
-                decision["requires_approval"] = False
-                reviewed_decisions.append(decision)
+        # Estimated cost per decision in one vectorized pass.
+        # Computed here rather than upstream: finance/negotiation can change
+        # order quantities after the DecisionNode runs.
+        qtys = np.fromiter(map(_order_quantity, decisions), dtype=np.float64, count=n)
+        unit_costs = np.fromiter(map(_unit_cost, decisions), dtype=np.float64, count=n)
+        total_costs = qtys * unit_costs
+        needs_approval = total_costs > self.approval_threshold
         
-        # Update state
-        # We keep ALL decisions in the list, but ActionNode will check the flag
-        state.decisions = reviewed_decisions + approval_queue
+        for decision, flagged in zip(decisions, needs_approval.tolist()):
+            decision["requires_approval"] = flagged
+        
+        # Only flagged items pay for reason formatting
+        approval_idx = np.flatnonzero(needs_approval).tolist()
+        approval_count = len(approval_idx)
+        for i in approval_idx:
+            decision = decisions[i]
+            total_cost = total_costs[i]
+            decision["approval_reason"] = f"High value order (${total_cost:.2f} > ${self.approval_threshold})"
+            logger.warning("✋ Review Node: Flagged %s for approval (Cost: $%.2f)", decision['sku'], total_cost)
         
-        if approval_queue:
-            from app.agents.streaming import stream_manager
-            stream_manager.emit(
-                state.cycle_id, 
+        # Move flagged decisions to the end in place; the sort is stable, so
+        # both groups keep their original order.
+        # We keep ALL decisions in the list, but ActionNode will check the flag
+        if approval_count:
+            decisions.sort(key=_requires_approval)
+            
+            from app.agents.streaming import get_event_writer
+            get_event_writer(state.cycle_id)(
                 "review_required", 
-                f"🛡️ Paused {len(approval_queue)} high-value orders for human review.",
-                {"count": len(approval_queue), "threshold": self.approval_threshold}
+                f"🛡️ Paused {approval_count} high-value orders for human review.",
+                {"count": approval_count, "threshold": self.approval_threshold}
             )
             
         return state
@@ -13,6 +13,16 @@ DECISION_PROMPT = (
     "Stock/forecast: {stock_forecast}\nReturn only JSON."
 )
 
+NEGOTIATION_BATCH_PROMPT = (
+    "Supply Chain Negotiation: each item below is critically low on stock and its order "
+    "quantity is being reduced to fit the budget.\n"
+    "For EACH item write a concise 2-sentence justification explaining:\n"
+    "1. Why this product is critical (stockout risk)\n"
+    "2. Why the reduced quantity is acceptable (buys time until next cycle)\n\n"
+    "Return a JSON array with one object per input item, keys: sku, justification.\n"
+    "Items: {items_json}\nReturn only JSON."
+)
+
 SALES_SUMMARY_PROMPT = (
     "You are a sales analytics assistant. Given these sales records (list of objects with 'sku','sold_quantity','date'), "
     "return JSON with keys: 'Top Products' (list), 'Declining Products' (list), 'Revenue Trend' (short string), 'Actionable Insights' (list).\n"
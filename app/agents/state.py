@@ -1,11 +1,12 @@
 # app/agents/state.py
 """LangGraph state definition for the supply chain agent cycle."""
 
-from typing import Dict, Any, List, Optional
+import operator
+from typing import Annotated, Dict, Any, List, Optional, TypedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class CycleState:
     """State shared across all nodes in the agent cycle."""
     
@@ -78,3 +79,49 @@ class CycleState:
     def get_urgent_actions(self) -> List[Dict[str, Any]]:
         """Get high-priority actions from this cycle"""
         return [a for a in self.actions if a.get("urgency") == "urgent"]
+
+
+# Fields that nodes only ever append to. In the graph they are reducer channels,
+# so each node emits just its new entries instead of the whole list.
+APPEND_ONLY_FIELDS = ("agent_dialogues", "errors", "failed_skus")
+
+
+class CycleGraphState(TypedDict, total=False):
+    """
+    LangGraph channel schema for CycleState.
+    
+    Append-only lists are merged with operator.add; every other key is
+    last-write-wins, so nodes only need to return the keys they changed.
+    """
+    cycle_id: str
+    cycle_number: int
+    started_at: datetime
+    inventory_data: Dict[str, Any]
+    sales_data: List[Dict[str, Any]]
+    sales_by_sku: Dict[str, List[Dict[str, Any]]]
+    orders_data: List[Dict[str, Any]]
+    pending_orders_by_sku: Dict[str, int]
+    overdue_orders: List[Dict[str, Any]]
+    alerts_data: List[Dict[str, Any]]
+    forecast_results: List[Dict[str, Any]]
+    analyzed_skus: List[Dict[str, Any]]
+    constrained_skus: List[Dict[str, Any]]
+    decisions: List[Dict[str, Any]]
+    actions: List[Dict[str, Any]]
+    agent_dialogues: Annotated[List[Dict[str, Any]], operator.add]
+    finance_rejections: List[Dict[str, Any]]
+    counter_arguments: List[Dict[str, Any]]
+    negotiation_rounds: int
+    max_negotiation_rounds: int
+    negotiation_proposals: List[Dict[str, Any]]
+    budget_remaining: float
+    streamed_dialogues_count: int
+    skip_forecast: bool
+    urgent_mode: bool
+    errors: Annotated[List[str], operator.add]
+    failed_skus: Annotated[List[str], operator.add]
+    summary: Dict[str, Any]
+    completed: bool
+    budget: float
+    recent_sales_revenue: float
+    finance_feedback: str
@@ -1,104 +1,150 @@
 # app/agents/streaming.py
-import queue
+import asyncio
+import itertools
 import logging
-from typing import Dict, Any, Generator
+import threading
+from collections import defaultdict, deque
+from functools import partial
+from typing import Dict, Any, Callable, DefaultDict, Deque, Iterable, List, Optional
 from datetime import datetime
 
-logger = logging.getLogger("stream_manager")
+from langgraph.config import get_stream_writer
 
-class StreamManager:
-    """
-    Singleton manager for handling real-time agent event streaming.
-    Allows deep nodes to emit events that are captured by the API stream.
-    """
-    _instance = None
-    _streams: Dict[str, queue.Queue] = {}
+logger = logging.getLogger("stream_manager")
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(StreamManager, cls).__new__(cls)
-        return cls._instance
+# Events that end a cycle stream
+TERMINAL_EVENT_TYPES = frozenset({"complete", "error", "cycle_complete"})
 
-    def create_stream(self, cycle_id: str) -> queue.Queue:
-        """Create a new event queue for a cycle."""
-        q = queue.Queue()
-        self._streams[cycle_id] = q
-        return q
+# Most recent events kept per job for the SSE route to replay
+JOB_EVENT_BUFFER_SIZE = 1000
 
-    def emit(self, cycle_id: str, event_type: str, message: str, details: Any = None):
-        """
-        Emit an event to the stream.
-        Safe to call from any thread.
-        """
-        if cycle_id in self._streams:
-            event = {
-                "type": event_type,
-                "message": message,
-                "details": details,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            self._streams[cycle_id].put(event)
+# Per-reader predicate over (event_type, details); False skips the event for that reader
+EventFilter = Callable[[str, Any], bool]
 
-    def get_events(self, cycle_id: str) -> Generator[Dict[str, Any], None, None]:
-        """
-        Yield events from the queue until a 'complete' or 'error' event is seen.
-        """
-        if cycle_id not in self._streams:
-            return
+def event_type_filter(event_types: Iterable[str]) -> EventFilter:
+    """Build a filter that only passes the given event types (terminal events always pass)."""
+    allowed = frozenset(event_types) | TERMINAL_EVENT_TYPES
+    return lambda event_type, details: event_type in allowed
 
-        q = self._streams[cycle_id]
-        
-        while True:
-            try:
-                # Block for a short time to allow yielding control
-                event = q.get(timeout=1.0)
-                yield event
-                
-                if event["type"] in ["complete", "error", "cycle_complete"]:
-                    break
-            except queue.Empty:
-                # Keep yielding to keep connection alive if needed, or just loop
-                continue
-            except Exception as e:
-                logger.error(f"Stream error: {e}")
-                break
-        
-        # Cleanup
-        if cycle_id in self._streams:
-            del self._streams[cycle_id]
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
-stream_manager = StreamManager()
+def _wake(loop: asyncio.AbstractEventLoop, waiter: asyncio.Event):
+    """Set an asyncio.Event owned by loop from any thread."""
+    if _running_loop() is loop:
+        waiter.set()
+        return
+    try:
+        loop.call_soon_threadsafe(waiter.set)
+    except RuntimeError:
+        # Reader's loop already shut down
+        pass
 
 class JobStreamManager:
     """
     Centralized event store for agent jobs.
     Replaces the local _job_progress in agent.py to allow cross-module logging.
+    Use the module-level job_stream_manager instance.
+    
+    Events are buffered per job (so late readers can replay them) and carry
+    an increasing "seq"; readers subscribe() for a wakeup on each new event
+    and fetch what they haven't seen with events_since().
     """
-    _instance = None
-    _job_events: Dict[str, Any] = {}  # job_id -> deque
+    __slots__ = ("_job_events", "_waiters", "_lock", "_seq")
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(JobStreamManager, cls).__new__(cls)
-        return cls._instance
+    def __init__(self):
+        self._job_events: DefaultDict[str, Deque[Dict[str, Any]]] = defaultdict(partial(deque, maxlen=JOB_EVENT_BUFFER_SIZE))
+        self._waiters: Dict[str, Dict[asyncio.Event, asyncio.AbstractEventLoop]] = {}
+        # Guards buffer creation, seq assignment + append, and waiter registration
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
     
-    def get_queue(self, job_id: str):
-        from collections import deque
-        if job_id not in self._job_events:
-            self._job_events[job_id] = deque(maxlen=1000)
-        return self._job_events[job_id]
+    def get_queue(self, job_id: str) -> Deque[Dict[str, Any]]:
+        events = self._job_events.get(job_id)
+        if events is None:
+            with self._lock:
+                events = self._job_events[job_id]
+        return events
+    
+    def snapshot(self, job_id: str) -> List[Dict[str, Any]]:
+        """
+        Copy of the job's buffered events, oldest first.
+        Doesn't create a buffer for unknown jobs; list(deque) is a single C-level
+        copy under the GIL, so it is safe against concurrent log_event appends.
+        """
+        events = self._job_events.get(job_id)
+        return list(events) if events is not None else []
+    
+    def events_since(self, job_id: str, seq: int) -> List[Dict[str, Any]]:
+        """Buffered events newer than seq, oldest first (scans back only over the new ones)."""
+        events = self.snapshot(job_id)
+        start = len(events)
+        while start and events[start - 1]["seq"] > seq:
+            start -= 1
+        return events[start:]
+    
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """
+        Register the calling event loop for wakeups on job_id's events.
+        The returned Event is set whenever an event is logged; clear it before
+        reading with events_since(), and unsubscribe() when done.
+        """
+        waiter = asyncio.Event()
+        with self._lock:
+            self._waiters.setdefault(job_id, {})[waiter] = asyncio.get_running_loop()
+        return waiter
+    
+    def unsubscribe(self, job_id: str, waiter: asyncio.Event):
+        with self._lock:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                waiters.pop(waiter, None)
+                if not waiters:
+                    del self._waiters[job_id]
     
     def log_event(self, job_id: str, event_type: str, message: str, details: Any = None, stage: str = None):
         """Log an event to the job's queue."""
-        queue = self.get_queue(job_id)
+        stage = stage or event_type.upper()
         event = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcnow(),
             "type": event_type,
-            "stage": stage or event_type.upper(),
+            "stage": stage,
             "message": message,
             "details": details or {}
         }
-        queue.append(event)
-        logger.info(f"Job {job_id} [{event['stage']}]: {message}")
+        # seq and append under one lock so a job's buffer is always in seq
+        # order (events_since stops at the first seq it has already sent)
+        with self._lock:
+            event["seq"] = next(self._seq)
+            self._job_events[job_id].append(event)
+            waiters = self._waiters.get(job_id)
+            waiters = list(waiters.items()) if waiters else ()
+        for waiter, loop in waiters:
+            _wake(loop, waiter)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Job %s [%s]: %s", job_id, stage, message)
 
 job_stream_manager = JobStreamManager()
+
+EventWriter = Callable[..., None]
+
+def get_event_writer(cycle_id: str) -> EventWriter:
+    """
+    Return write(event_type, message, details=None) for a node's events.
+    
+    Inside a LangGraph run the events go out on the graph's "custom" stream
+    (run_cycle forwards them to the job stream); outside one they are logged
+    straight to job_stream_manager. Resolve it in the node's own thread: the
+    graph context lives in contextvars, which plain worker threads don't inherit.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return partial(job_stream_manager.log_event, cycle_id)
+    
+    def write(event_type: str, message: str, details: Any = None):
+        writer({"type": event_type, "message": message, "details": details})
+    return write
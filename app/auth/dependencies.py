@@ -1,8 +1,15 @@
 """Auth utilities for routes"""
+import threading
+import time
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+import jwt
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
 from app.auth.security import TokenData, SECRET_KEY, ALGORITHM
+from app.models.database import get_db
+from app.models.schemas import User
 import os
 from dotenv import load_dotenv
 
@@ -10,31 +17,53 @@ load_dotenv()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Verified tokens -> (username, cache expiry). A token's signature and claims
+# never change, so repeat requests skip the HMAC check until the token's own
+# exp (capped at TOKEN_CACHE_TTL seconds).
+TOKEN_CACHE_MAXSIZE = 10000
+TOKEN_CACHE_TTL = 60
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = threading.Lock()
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Validate JWT token and return current user from DB"""
-    from app.models.database import SessionLocal
-    from app.models.schemas import User
+# Built once; SQLAlchemy caches its compiled form across requests
+_user_by_username = select(User).where(User.username == bindparam("username"))
+
+
+def _decode_username(token: str) -> str:
+    """Return the token's subject, verifying the JWT only on cache miss. Raises jwt.InvalidTokenError."""
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            if cached[1] > now:
+                _token_cache.move_to_end(token)
+                return cached[0]
+            del _token_cache[token]
     
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"require": ["exp", "sub"]})
+    username = payload["sub"]
+    
+    expires_at = min(now + TOKEN_CACHE_TTL, float(payload["exp"]))
+    with _token_cache_lock:
+        _token_cache[token] = (username, expires_at)
+        if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+            _token_cache.popitem(last=False)
+    return username
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Validate JWT token and return current user from DB (request-scoped session)"""
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credential_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        token_data = TokenData(username=_decode_username(token))
+    except jwt.InvalidTokenError:
         raise credential_exception
-        
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.username == token_data.username).first()
-        if user is None:
-            raise credential_exception
-        return user
-    finally:
-        db.close()
+
+    user = db.execute(_user_by_username, {"username": token_data.username}).scalars().first()
+    if user is None:
+        raise credential_exception
+    return user
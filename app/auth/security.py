@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import threading
+import time
+from collections import OrderedDict
+import jwt
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
@@ -16,8 +18,8 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing - direct bcrypt to avoid passlib issues
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing uses bcrypt directly (no passlib indirection); bcrypt>=4
+# ships the Rust backend, which is noticeably faster than the old cffi one.
 
 
 class Token(BaseModel):
@@ -53,6 +55,52 @@ ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "secret").strip()
 
 # Users database removed - using DB instead
 
+# username -> (UserInDB, cache expiry). Repeat logins for the same user skip
+# the DB lookup; the bcrypt check itself still runs on every attempt.
+USER_CACHE_MAXSIZE = 1024
+USER_CACHE_TTL = 30
+_user_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def _load_user(db, username: str) -> Optional[UserInDB]:
+    """Return the user's credentials, reading the DB only on cache miss."""
+    now = time.time()
+    with _user_cache_lock:
+        cached = _user_cache.get(username)
+        if cached is not None:
+            if cached[1] > now:
+                _user_cache.move_to_end(username)
+                return cached[0]
+            del _user_cache[username]
+    
+    from app.models.schemas import User as UserRow
+    row = db.query(UserRow).filter(UserRow.username == username).first()
+    if row is None:
+        return None
+    
+    user = UserInDB(
+        username=row.username,
+        email=row.email,
+        full_name=row.full_name,
+        disabled=row.is_active is False,
+        hashed_password=row.hashed_password,
+    )
+    with _user_cache_lock:
+        _user_cache[username] = (user, now + USER_CACHE_TTL)
+        if len(_user_cache) > USER_CACHE_MAXSIZE:
+            _user_cache.popitem(last=False)
+    return user
+
+
+def invalidate_user_cache(username: Optional[str] = None):
+    """Drop cached credentials for one user (e.g. after a password change), or all users."""
+    with _user_cache_lock:
+        if username is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(username, None)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash using bcrypt directly"""
@@ -69,13 +117,11 @@ def get_password_hash(password: str) -> str:
 
 
 def authenticate_user(db, username: str, password: str):
-    """Authenticate user with username and password against DB"""
-    from app.models.schemas import User
-    
+    """Authenticate user with username and password against DB. Returns a UserInDB or False."""
     # DEBUG LOGGING
     logger.info(f"Attempting login for user: '{username}'")
     
-    user = db.query(User).filter(User.username == username).first()
+    user = _load_user(db, username)
     
     if not user:
         logger.warning(f"User '{username}' not found in db.")
@@ -5,6 +5,7 @@ Manages rate limits, model selection, and token budgets.
 """
 
 import os
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,11 +32,24 @@ class LLMConfig:
     MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", "2000"))
     MAX_COMPLETION_TOKENS = int(os.getenv("MAX_COMPLETION_TOKENS", "500"))
     
+    # Forecast output is a single small JSON object (~120-180 tokens), so cap
+    # decode length instead of reserving the generic completion budget.
+    FORECAST_MAX_TOKENS = int(os.getenv("FORECAST_MAX_TOKENS", "200"))
+    FORECAST_TOKENS_PER_ITEM = 60  # Per-SKU output size when batching forecasts
+    
     # Call Limits Per Cycle
     MAX_FORECAST_LLM_CALLS = int(os.getenv("MAX_FORECAST_LLM_CALLS", "10"))
     MAX_NEGOTIATION_LLM_CALLS = int(os.getenv("MAX_NEGOTIATION_LLM_CALLS", "5"))
     MAX_DIALOGUE_LLM_CALLS = int(os.getenv("MAX_DIALOGUE_LLM_CALLS", "5"))
     
+    # Negotiation justifications are requested for up to this many SKUs per prompt
+    NEGOTIATION_BATCH_SIZE = int(os.getenv("NEGOTIATION_BATCH_SIZE", "10"))
+    NEGOTIATION_TOKENS_PER_ITEM = 200
+    NEGOTIATION_MAX_WORKERS = int(os.getenv("NEGOTIATION_MAX_WORKERS", "8"))
+    
+    # Statistical forecasts move to a process pool above this catalog size
+    FORECAST_PROCESS_POOL_MIN_SKUS = int(os.getenv("FORECAST_PROCESS_POOL_MIN_SKUS", "500"))
+    
     # Retry Settings
     MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
     BASE_RETRY_DELAY = float(os.getenv("LLM_RETRY_DELAY", "1.0"))
@@ -44,27 +58,39 @@ class LLMConfig:
     ENABLE_CIRCUIT_BREAKER = os.getenv("ENABLE_CIRCUIT_BREAKER", "true").lower() == "true"
     CIRCUIT_BREAKER_THRESHOLD = float(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "0.9"))
     
+    # Lookup tables built once at import (settings above are fixed for the process)
+    _TIMEOUTS = MappingProxyType({
+        "forecast": FORECAST_TIMEOUT,
+        "negotiation": NEGOTIATION_TIMEOUT,
+        "dialogue": DIALOGUE_TIMEOUT,
+        "summary": SUMMARY_TIMEOUT
+    })
+    _CONFIG_ITEMS = (
+        ("forecast_model", FORECAST_MODEL),
+        ("negotiation_model", NEGOTIATION_MODEL),
+        ("dialogue_model", DIALOGUE_MODEL),
+        ("summary_model", SUMMARY_MODEL),
+        ("max_forecast_calls", MAX_FORECAST_LLM_CALLS),
+        ("forecast_max_tokens", FORECAST_MAX_TOKENS),
+        ("max_negotiation_calls", MAX_NEGOTIATION_LLM_CALLS),
+        ("token_tracking_enabled", ENABLE_TOKEN_TRACKING),
+        ("circuit_breaker_enabled", ENABLE_CIRCUIT_BREAKER),
+    )
+    
     @classmethod
     def get_timeout_for_task(cls, task: str) -> int:
-        """Get appropriate timeout for specific task."""
-        timeouts = {
-            "forecast": cls.FORECAST_TIMEOUT,
-            "negotiation": cls.NEGOTIATION_TIMEOUT,
-            "dialogue": cls.DIALOGUE_TIMEOUT,
-            "summary": cls.SUMMARY_TIMEOUT
-        }
-        return timeouts.get(task.lower(), 30)
+        """Get appropriate timeout for specific task (call sites pass lowercase names)."""
+        timeout = cls._TIMEOUTS.get(task)
+        if timeout is None:
+            timeout = cls._TIMEOUTS.get(task.lower(), 30)
+        return timeout
+    
+    @classmethod
+    def get_forecast_max_tokens(cls, batch_size: int = 1) -> int:
+        """Get max_tokens for a forecast call covering `batch_size` SKUs."""
+        return max(cls.FORECAST_MAX_TOKENS, 80 + cls.FORECAST_TOKENS_PER_ITEM * batch_size)
     
     @classmethod
     def to_dict(cls) -> dict:
         """Export configuration as dictionary for logging/debugging."""
-        return {
-            "forecast_model": cls.FORECAST_MODEL,
-            "negotiation_model": cls.NEGOTIATION_MODEL,
-            "dialogue_model": cls.DIALOGUE_MODEL,
-            "summary_model": cls.SUMMARY_MODEL,
-            "max_forecast_calls": cls.MAX_FORECAST_LLM_CALLS,
-            "max_negotiation_calls": cls.MAX_NEGOTIATION_LLM_CALLS,
-            "token_tracking_enabled": cls.ENABLE_TOKEN_TRACKING,
-            "circuit_breaker_enabled": cls.ENABLE_CIRCUIT_BREAKER
-        }
+        return dict(cls._CONFIG_ITEMS)
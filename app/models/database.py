@@ -1,8 +1,8 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool  # <--- Crucial for Transaction Pooling
 import os
+import orjson
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 
@@ -10,12 +10,40 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# JSON/JSONB columns are encoded with orjson rather than the stdlib json module.
+# Checkpoint and memory payloads may carry datetimes, int keys or NumPy values.
+_JSON_OPTS = (
+    orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+    | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+)
+
+def _json_serializer(obj) -> str:
+    return orjson.dumps(obj, option=_JSON_OPTS).decode()
+
 # For Supabase Transaction Pooler (Port 6543):
-# 1. Use NullPool to let Supavisor handle the pooling.
-# 2. Add connect_args to ensure SSL is used.
+# 1. Keep a small client-side QueuePool so requests reuse warm TCP+TLS
+#    connections instead of handshaking per session. Size it well under the
+#    Supavisor per-client connection cap.
+# 2. pre_ping drops connections the pooler closed; recycle rotates them before
+#    its idle timeout; LIFO keeps the hottest connections in use. Against a
+#    direct, reliable connection DB_POOL_PRE_PING=false saves the extra
+#    round-trip on every checkout.
+# 3. Add connect_args to ensure SSL is used.
+# 4. A larger compiled-statement cache so the persistence managers' hot
+#    SELECTs are compiled once per process (SQLAlchemy's default is 500).
+# 5. orjson for JSON column (de)serialization.
+# 6. Bulk INSERTs batch up to 1000 rows per statement.
 engine = create_engine(
     DATABASE_URL, 
-    poolclass=NullPool,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() != "false",
+    pool_use_lifo=True,
+    query_cache_size=int(os.getenv("DB_QUERY_CACHE_SIZE", "1200")),
+    insertmanyvalues_page_size=1000,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
     connect_args={"sslmode": "require"}
 )
 
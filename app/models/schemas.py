@@ -1,6 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, func, Text
+import logging
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index, JSON, event, func, text, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import deferred
 from app.models.database import Base
 
+logger = logging.getLogger("schemas")
+
+# JSON documents: binary JSONB on Postgres, plain JSON elsewhere (e.g. SQLite in tests)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+def _partial(predicate: str) -> dict:
+    """Index kwargs restricting an index to rows matching predicate (Postgres and SQLite)."""
+    return {"postgresql_where": text(predicate), "sqlite_where": text(predicate)}
+
 class Inventory(Base):
     __tablename__ = "inventory"
     id = Column(Integer, primary_key=True, index=True)
@@ -35,7 +49,7 @@ class Sales(Base):
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String)
     sold_quantity = Column(Integer)
-    date = Column(DateTime(timezone=True), server_default=func.now())
+    date = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
 
 class Orders(Base):
     __tablename__ = "orders"
@@ -53,7 +67,7 @@ class Alerts(Base):
     type = Column(String)
     sku = Column(String, nullable=True)  # SKU related to alert
     priority = Column(String, nullable=True)  # Priority level (low, medium, high, critical)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
 
 class AgentMemory(Base):
     __tablename__ = "agent_memory"
@@ -89,34 +103,53 @@ class PersistentMemory(Base):
     """
     Unified table for all memory types (episodic, semantic, procedural).
     Stores agent's accumulated knowledge and experiences.
+    
+    Kept as one table on purpose: the per-type id columns are NULL on rows of
+    other types, which Postgres stores in the null bitmap at no width cost,
+    and the composite indexes lead with memory_type (or category/sku), so
+    type-scoped lookups never touch other types' rows.
     """
     __tablename__ = "persistent_memory"
+    # Composite indexes match the manager's lookups (type + SKU or type alone,
+    # newest first; category/key facts; best-by-confidence per category) so
+    # single-column indexes aren't merged. They are
+    # partial on is_active: every such lookup skips soft-deleted rows, so
+    # those rows are kept out of the hot indexes entirely.
+    __table_args__ = (
+        Index("ix_pmem_type_sku_ts", "memory_type", "sku", "timestamp", **_partial("is_active")),
+        Index("ix_pmem_cat_key", "category", "key", **_partial("is_active")),
+        Index("ix_pmem_active_sku_ts", "sku", "timestamp", **_partial("is_active")),
+        Index("ix_pmem_type_ts", "memory_type", "timestamp", **_partial("is_active")),
+        Index("ix_pmem_type_cat_conf", "memory_type", "category", "confidence", **_partial("is_active")),
+    )
     id = Column(Integer, primary_key=True, index=True)
     
     # Memory classification
-    memory_type = Column(String, index=True)  # "episodic", "semantic", "procedural"
+    memory_type = Column(String(16))  # "episodic", "semantic", "procedural"
     
     # Identifiers and timestamps
     event_id = Column(String, nullable=True, index=True)      # For episodic
     fact_id = Column(String, nullable=True, index=True)       # For semantic
     procedure_id = Column(String, nullable=True, index=True)  # For procedural
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Write-heavy tables stamp rows client-side (UTC) so batched INSERTs carry
+    # the value; server_default still covers rows inserted outside the ORM.
+    timestamp = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now(), index=True)
     
     # Content fields
     event_type = Column(String, nullable=True)    # Type of event (e.g., "decision_made")
-    category = Column(String, nullable=True, index=True)  # Category (e.g., "sku_profile")
-    key = Column(String, nullable=True, index=True)       # Key for semantic/procedural
+    category = Column(String, nullable=True)  # Category (e.g., "sku_profile")
+    key = Column(String, nullable=True, index=True)       # Key for semantic/procedural (MemoryManager looks up by key alone)
     description = Column(Text, nullable=True)
-    content = Column(Text)  # Full JSON content
+    content = Column(JSONType)  # Full JSON content
     source = Column(String, nullable=True)  # Where this memory came from
     
     # Metadata
-    sku = Column(String, nullable=True, index=True)
+    sku = Column(String, nullable=True)
     confidence = Column(Float, default=0.5)  # 0-1, how confident are we
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
     
     # For querying and retrieval
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
 
 
 class AgentCheckpoint(Base):
@@ -125,6 +158,10 @@ class AgentCheckpoint(Base):
     Allows agent to save progress and resume from exact point.
     """
     __tablename__ = "agent_checkpoints"
+    # Latest stable checkpoint lookups, newest first, over resumable rows only
+    __table_args__ = (
+        Index("ix_ckpt_stable_ts", "timestamp", **_partial("is_active AND is_stable")),
+    )
     id = Column(Integer, primary_key=True, index=True)
     
     # Checkpoint metadata
@@ -134,11 +171,13 @@ class AgentCheckpoint(Base):
     goal = Column(String, nullable=True, index=True)  # Goal being pursued
     
     # State information
-    state = Column(Text)  # Full state JSON (agent_state, progress, decisions, history, errors)
+    # Deferred: metadata queries (flags, cycle, goal) don't drag the blob in;
+    # readers that need it undefer() it in the same SELECT.
+    state = deferred(Column(JSONType))  # Full state JSON (agent_state, progress, decisions, history, errors)
     
     # Stability and recoverability
-    is_stable = Column(Boolean, default=True, index=True)  # Safe to resume from here
-    is_active = Column(Boolean, default=True, index=True)
+    is_stable = Column(Boolean, default=True)  # Safe to resume from here
+    is_active = Column(Boolean, default=True)
     
     # Tracking
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -150,25 +189,29 @@ class PersistentGoal(Base):
     Enables the agent to maintain objectives and track progress.
     """
     __tablename__ = "persistent_goals"
+    # Active goals by priority
+    __table_args__ = (
+        Index("ix_goal_active_priority", "priority", **_partial("status = 'active' AND is_active")),
+    )
     id = Column(Integer, primary_key=True, index=True)
     
     # Goal definition
     goal_id = Column(String, unique=True, index=True)
     objective = Column(Text)  # What we're trying to achieve
-    status = Column(String, default="active", index=True)  # active, paused, completed, failed
+    status = Column(String(16), default="active", index=True)  # active, paused, completed, failed
     priority = Column(Integer, default=5)  # 1-10, higher = more important
     
     # Context and metrics
-    context = Column(Text)  # Business context
-    target_metrics = Column(Text)  # How we measure success
-    current_progress = Column(Text)  # Current progress JSON
+    context = Column(JSONType)  # Business context
+    target_metrics = Column(JSONType)  # How we measure success
+    current_progress = Column(JSONType)  # Current progress JSON
     
     # Timeline
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     deadline = Column(DateTime(timezone=True), nullable=True)
     
     # Management
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
 
 
 class Job(Base):
@@ -178,8 +221,8 @@ class Job(Base):
     """
     __tablename__ = "jobs"
     id = Column(String, primary_key=True, index=True)
-    status = Column(String, default="queued", index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    status = Column(String(16), default="queued", index=True)  # queued, running, completed, failed
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     result = Column(Text, nullable=True)  # JSON result
@@ -202,5 +245,30 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+# ============ STORAGE TUNING ============
+
+# Large JSON/text bodies. Postgres TOAST already compresses values past ~2KB;
+# lz4 (PG 14+) decompresses several times faster than the default pglz and,
+# unlike client-side compressed blobs, keeps the columns queryable as JSONB.
+LZ4_COMPRESSED_COLUMNS = {
+    "persistent_memory": ("content",),
+    "agent_checkpoints": ("state",),
+    "agent_memory": ("context", "decision", "reasoning"),
+}
 
 
+@event.listens_for(Base.metadata, "after_create")
+def _use_lz4_compression(target, connection, tables=(), **kw):
+    """Switch newly created tables' large columns to lz4 TOAST compression."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table in tables:
+        for column in LZ4_COMPRESSED_COLUMNS.get(table.name, ()):
+            try:
+                with connection.begin_nested():
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {table.name} ALTER COLUMN {column} SET COMPRESSION lz4"
+                    )
+            except DBAPIError as e:
+                # Server built without lz4: keep the default pglz
+                logger.warning("lz4 compression unavailable for %s.%s: %s", table.name, column, e)
@@ -10,6 +10,7 @@ from app.persistence.memory_types import (
     SemanticMemory,
     ProceduralMemory,
     Checkpoint,
+    Message,
     Goal
 )
 from app.persistence.persistent_memory import PersistentMemoryManager
@@ -21,6 +22,7 @@ __all__ = [
     "SemanticMemory",
     "ProceduralMemory",
     "Checkpoint",
+    "Message",
     "Goal",
     "PersistentMemoryManager",
     "RecoveryManager"
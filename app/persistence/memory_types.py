@@ -5,10 +5,15 @@ Implements Episodic, Semantic, and Procedural memory types.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, NamedTuple, Optional
 from datetime import datetime
 from enum import Enum
 
+# ISO timestamp parser shared by the __post_init__ hooks. datetimes are
+# immutable, so repeated strings (e.g. a batch from one export) parse once.
+_parse_ts = lru_cache(maxsize=4096)(datetime.fromisoformat)
+
 class MemoryType(str, Enum):
     """Different types of memory in the agent"""
     EPISODIC = "episodic"      # Specific past events and experiences
@@ -17,7 +22,14 @@ class MemoryType(str, Enum):
     GOAL = "goal"              # Long-term objectives and goals
 
 
-@dataclass
+# Plain-string aliases for per-row code paths and query predicates; these
+# skip the Enum member lookup and compare equal to the stored column values.
+M_EPISODIC = MemoryType.EPISODIC.value
+M_SEMANTIC = MemoryType.SEMANTIC.value
+M_PROCEDURAL = MemoryType.PROCEDURAL.value
+
+
+@dataclass(slots=True)
 class EpisodicMemory:
     """Records of specific past interactions, actions, and experiences"""
     event_id: str
@@ -30,11 +42,11 @@ class EpisodicMemory:
     learning: Optional[str]  # What we learned from this
     
     def __post_init__(self):
-        if isinstance(self.timestamp, str):
-            self.timestamp = datetime.fromisoformat(self.timestamp)
+        if self.timestamp.__class__ is str:
+            self.timestamp = _parse_ts(self.timestamp)
 
 
-@dataclass
+@dataclass(slots=True)
 class SemanticMemory:
     """General facts, learned preferences, and extracted insights"""
     fact_id: str
@@ -46,11 +58,11 @@ class SemanticMemory:
     source: str    # Where this fact came from (e.g., "forecast_accuracy", "user_feedback")
     
     def __post_init__(self):
-        if isinstance(self.timestamp, str):
-            self.timestamp = datetime.fromisoformat(self.timestamp)
+        if self.timestamp.__class__ is str:
+            self.timestamp = _parse_ts(self.timestamp)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProceduralMemory:
     """How-to knowledge and successful strategies"""
     procedure_id: str
@@ -65,13 +77,20 @@ class ProceduralMemory:
     usage_count: int = 0
     
     def __post_init__(self):
-        if isinstance(self.timestamp, str):
-            self.timestamp = datetime.fromisoformat(self.timestamp)
-        if isinstance(self.last_used, str):
-            self.last_used = datetime.fromisoformat(self.last_used)
+        if self.timestamp.__class__ is str:
+            self.timestamp = _parse_ts(self.timestamp)
+        if self.last_used.__class__ is str:
+            self.last_used = _parse_ts(self.last_used)
+
+
+class Message(NamedTuple):
+    """One entry of a checkpoint's message history"""
+    stage: str
+    message: str
+    timestamp: Optional[Any] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Checkpoint:
     """State checkpoint for resumption and rollback"""
     checkpoint_id: str
@@ -81,17 +100,17 @@ class Checkpoint:
     goal: str                        # Current goal
     progress: Dict[str, Any]        # Progress on goal (e.g., {"tasks_completed": 5, "total_tasks": 10})
     decisions_made: List[Dict]      # List of decisions in this session
-    message_history: List[Dict]     # Conversation history
+    message_history: List[Message]  # Conversation history
     resources_used: Dict[str, Any]  # Database queries, API calls, etc.
     errors_encountered: List[str]   # Any errors that occurred
     is_stable: bool = True          # Can we safely resume from this point?
     
     def __post_init__(self):
-        if isinstance(self.timestamp, str):
-            self.timestamp = datetime.fromisoformat(self.timestamp)
+        if self.timestamp.__class__ is str:
+            self.timestamp = _parse_ts(self.timestamp)
 
 
-@dataclass
+@dataclass(slots=True)
 class Goal:
     """Long-term persistent goal"""
     goal_id: str
@@ -106,7 +125,7 @@ class Goal:
     related_memories: List[str] = field(default_factory=list)  # IDs of related memories
     
     def __post_init__(self):
-        if isinstance(self.created_at, str):
-            self.created_at = datetime.fromisoformat(self.created_at)
-        if isinstance(self.deadline, str):
-            self.deadline = datetime.fromisoformat(self.deadline)
+        if self.created_at.__class__ is str:
+            self.created_at = _parse_ts(self.created_at)
+        if self.deadline.__class__ is str:
+            self.deadline = _parse_ts(self.deadline)
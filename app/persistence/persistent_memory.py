@@ -4,19 +4,475 @@ Persistent memory system for agentic AI.
 Stores and retrieves episodic, semantic, and procedural memories.
 """
 
-import json
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+import orjson
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Any, Hashable, Iterable, List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import JSON, bindparam, case, cast, func, insert, select, text, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, undefer
 from app.models import schemas
 from app.persistence.memory_types import (
     EpisodicMemory, SemanticMemory, ProceduralMemory, 
-    Checkpoint, Goal, MemoryType
+    Checkpoint, Goal, Message,
+    M_EPISODIC, M_SEMANTIC, M_PROCEDURAL
 )
 
 logger = logging.getLogger("persistent_memory")
 
+# Rows per multi-row INSERT in bulk_record(); bounds memory for long iterators
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Natural key (goal_id, checkpoint_id, fact (category, key), procedure
+# (procedure_type, name)) -> (object, cache expiry). Repeat natural-key reads
+# within a cycle skip the DB; writes through this manager invalidate, and the
+# TTL bounds staleness from writes in other processes. Cached objects are
+# shared between callers, so treat them as read-only.
+NATURAL_KEY_CACHE_MAXSIZE = 256
+NATURAL_KEY_CACHE_TTL = 60
+_goal_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_checkpoint_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_fact_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_procedure_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_natural_key_cache_lock = threading.Lock()
+
+
+def _cache_get(cache: OrderedDict, key: Hashable):
+    with _natural_key_cache_lock:
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        if cached[1] > time.time():
+            cache.move_to_end(key)
+            return cached[0]
+        del cache[key]
+        return None
+
+
+def _cache_put(cache: OrderedDict, key: Hashable, value) -> None:
+    with _natural_key_cache_lock:
+        cache[key] = (value, time.time() + NATURAL_KEY_CACHE_TTL)
+        if len(cache) > NATURAL_KEY_CACHE_MAXSIZE:
+            cache.popitem(last=False)
+
+
+def _cache_drop(cache: OrderedDict, key: Hashable) -> None:
+    with _natural_key_cache_lock:
+        cache.pop(key, None)
+
+
+def _drop_memory_row(row: Dict[str, Any]) -> None:
+    """Invalidate the fact/procedure cache entry a PersistentMemory row shadows."""
+    memory_type = row.get("memory_type")
+    if memory_type == M_SEMANTIC:
+        _cache_drop(_fact_cache, (row.get("category"), row.get("key")))
+    elif memory_type == M_PROCEDURAL:
+        _cache_drop(_procedure_cache, (row.get("category"), row.get("key")))
+
+# Fixed-shape lookups, built once with bound parameters so SQLAlchemy's
+# compiled cache is hit on every call instead of rebuilding the statement.
+_PM = schemas.PersistentMemory
+_PG = schemas.PersistentGoal
+_PC = schemas.AgentCheckpoint
+
+# Single-row writes go straight to INSERT with the converter's dict as
+# parameters; the inserted row is never read back, so no ORM flush is needed.
+_insert_memory = insert(_PM)
+_insert_checkpoint = insert(_PC)
+_insert_goal = insert(_PG)
+
+# AgentCheckpoint.state is deferred; load it with the row when building Checkpoints
+_with_state = undefer(_PC.state)
+
+# Multi-row reads select only the columns the dataclass converters use and
+# stream them in batches of STREAM_BATCH_SIZE instead of hydrating ORM rows.
+STREAM_BATCH_SIZE = 200
+
+_EPISODE_COLUMNS = (
+    _PM.event_id, _PM.timestamp, _PM.event_type, _PM.sku, _PM.description, _PM.content
+)
+_FACT_COLUMNS = (
+    _PM.fact_id, _PM.timestamp, _PM.category, _PM.key, _PM.content, _PM.confidence, _PM.source
+)
+_PROCEDURE_COLUMNS = (
+    _PM.procedure_id, _PM.timestamp, _PM.category, _PM.key, _PM.content, _PM.confidence
+)
+_CHECKPOINT_COLUMNS = (
+    _PC.checkpoint_id, _PC.timestamp, _PC.cycle_number, _PC.goal, _PC.state, _PC.is_stable
+)
+
+# Optional filters select one of a fixed set of prebuilt variants rather
+# than growing a new statement per call: keyed by (filter on sku,
+# filter on event_type) and by whether a goal filter applies.
+def _episodes_variant(by_sku: bool, by_event_type: bool):
+    stmt = select(*_EPISODE_COLUMNS).where(
+        _PM.memory_type == M_EPISODIC,
+        _PM.timestamp >= bindparam("since"),
+        _PM.is_active == True
+    )
+    if by_sku:
+        stmt = stmt.where(_PM.sku == bindparam("sku"))
+    if by_event_type:
+        stmt = stmt.where(_PM.event_type == bindparam("event_type"))
+    return stmt.order_by(_PM.timestamp.desc()).limit(bindparam("limit")).execution_options(
+        yield_per=STREAM_BATCH_SIZE
+    )
+
+
+def _checkpoints_variant(by_goal: bool, stable_only: bool):
+    stmt = select(*_CHECKPOINT_COLUMNS).where(_PC.is_active == True)
+    if stable_only:
+        stmt = stmt.where(_PC.is_stable == True)
+    if by_goal:
+        stmt = stmt.where(_PC.goal == bindparam("goal"))
+    return stmt.order_by(_PC.timestamp.desc()).limit(bindparam("limit")).execution_options(
+        yield_per=STREAM_BATCH_SIZE
+    )
+
+
+_episodes = {
+    (by_sku, by_event_type): _episodes_variant(by_sku, by_event_type)
+    for by_sku in (False, True) for by_event_type in (False, True)
+}
+_checkpoint_history = {by_goal: _checkpoints_variant(by_goal, False) for by_goal in (False, True)}
+_latest_stable_checkpoint = {by_goal: _checkpoints_variant(by_goal, True) for by_goal in (False, True)}
+
+_fact_by_key = select(_PM).where(
+    _PM.memory_type == M_SEMANTIC,
+    _PM.category == bindparam("category"),
+    _PM.key == bindparam("key"),
+    _PM.is_active == True
+).order_by(_PM.timestamp.desc()).limit(1)
+
+_facts_by_category = select(*_FACT_COLUMNS).where(
+    _PM.memory_type == M_SEMANTIC,
+    _PM.category == bindparam("category"),
+    _PM.confidence >= bindparam("min_confidence"),
+    _PM.is_active == True
+).order_by(_PM.confidence.desc()).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+_procedure_by_name = select(_PM).where(
+    _PM.memory_type == M_PROCEDURAL,
+    _PM.category == bindparam("procedure_type"),
+    _PM.key == bindparam("name"),
+    _PM.is_active == True
+).limit(1)
+
+_best_procedures = select(*_PROCEDURE_COLUMNS).where(
+    _PM.memory_type == M_PROCEDURAL,
+    _PM.category == bindparam("procedure_type"),
+    _PM.confidence >= bindparam("min_success_rate"),
+    _PM.is_active == True
+).order_by(_PM.confidence.desc()).limit(bindparam("limit")).execution_options(
+    yield_per=STREAM_BATCH_SIZE
+)
+
+_active_goals = select(_PG).where(
+    _PG.status == "active",
+    _PG.is_active == True
+).order_by(_PG.priority.desc())
+
+_goal_by_id = select(_PG).where(_PG.goal_id == bindparam("goal_id")).limit(1)
+
+_checkpoint_by_id = select(_PC).options(_with_state).where(
+    _PC.checkpoint_id == bindparam("checkpoint_id"),
+    _PC.is_active == True
+).limit(1)
+
+# Episode/checkpoint writers take durable=False for records a later cycle
+# regenerates anyway (the scheduler's end-of-cycle snapshot): their commit
+# doesn't wait for the WAL flush, so a crash can lose the last few hundred ms
+# of them but never leaves them inconsistent. SET LOCAL scopes this to the
+# current transaction - with commit=False that is the caller's whole
+# transaction - which keeps it correct behind the transaction pooler.
+_ASYNC_COMMIT = text("SET LOCAL synchronous_commit TO OFF")
+
+
+def _async_commit(db: Session) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(_ASYNC_COMMIT)
+
+
+# Checkpoint listings read progress and two array lengths out of state in
+# SQL, so message history and decision payloads are never transferred.
+def _pg_summary_columns():
+    state = cast(_PC.state, postgresql.JSONB)
+
+    def length(key):
+        items = state[key]
+        return func.coalesce(
+            func.jsonb_array_length(case((func.jsonb_typeof(items) == "array", items))), 0
+        )
+
+    return (
+        state["progress"].label("progress"),
+        length("errors_encountered").label("errors_count"),
+        length("decisions_made").label("decisions_count")
+    )
+
+
+def _sqlite_summary_columns():
+    def length(key):
+        return func.coalesce(func.json_array_length(_PC.state, f"$.{key}"), 0)
+
+    return (
+        type_coerce(func.json_extract(_PC.state, "$.progress"), JSON).label("progress"),
+        length("errors_encountered").label("errors_count"),
+        length("decisions_made").label("decisions_count")
+    )
+
+
+_CHECKPOINT_SUMMARY_COLUMNS = {
+    "postgresql": _pg_summary_columns(),
+    "sqlite": _sqlite_summary_columns()
+}
+
+
+# Failure statistics over the newest checkpoints, aggregated in the database
+# so checkpoint state never leaves it. (totals, error histogram) per dialect;
+# state is cast because pre-JSONB tables still hold it as TEXT. Non-array
+# errors_encountered/decisions_made values are skipped on both dialects.
+_RECENT_CHECKPOINTS = """
+WITH recent AS (
+    SELECT {state} AS state FROM agent_checkpoints
+    WHERE is_active AND (CAST(:goal AS VARCHAR) IS NULL OR goal = :goal)
+    ORDER BY timestamp DESC
+    LIMIT :limit
+)
+"""
+_PG_RECENT = _RECENT_CHECKPOINTS.format(state="CAST(state AS JSONB)")
+_SQLITE_RECENT = _RECENT_CHECKPOINTS.format(state="state")
+
+_FAILURE_STATS = {
+    "postgresql": (
+        text(_PG_RECENT + """
+SELECT
+    (SELECT count(*) FROM recent) AS checkpoints,
+    (SELECT count(*) FROM recent CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(recent.state -> 'decisions_made') = 'array'
+             THEN recent.state -> 'decisions_made' END
+     ) AS d
+     WHERE d ->> 'status' = 'failed') AS failed_decisions
+"""),
+        text(_PG_RECENT + """
+SELECT e.error, count(*) AS frequency
+FROM recent CROSS JOIN LATERAL jsonb_array_elements_text(
+    CASE WHEN jsonb_typeof(recent.state -> 'errors_encountered') = 'array'
+         THEN recent.state -> 'errors_encountered' END
+) AS e(error)
+GROUP BY e.error
+ORDER BY frequency DESC, e.error
+"""),
+    ),
+    "sqlite": (
+        text(_SQLITE_RECENT + """
+SELECT
+    (SELECT count(*) FROM recent) AS checkpoints,
+    (SELECT count(*) FROM recent, json_each(recent.state, '$.decisions_made') AS d
+     WHERE json_type(recent.state, '$.decisions_made') = 'array'
+       AND d.type = 'object'
+       AND json_extract(d.value, '$.status') = 'failed') AS failed_decisions
+"""),
+        text(_SQLITE_RECENT + """
+SELECT e.value AS error, count(*) AS frequency
+FROM recent, json_each(recent.state, '$.errors_encountered') AS e
+WHERE json_type(recent.state, '$.errors_encountered') = 'array'
+GROUP BY e.value
+ORDER BY frequency DESC, e.value
+"""),
+    ),
+}
+
+
+# ============ ROW CONVERTERS ============
+# One fixed mapping per memory type, shared by the single-row and list paths.
+
+def _load_json(value):
+    """Decode a JSON column; rows written before the JSON column type hold strings."""
+    return orjson.loads(value) if isinstance(value, str) else value
+
+
+def _episode_row(episode: EpisodicMemory) -> Dict[str, Any]:
+    return {
+        "memory_type": M_EPISODIC,
+        "event_id": episode.event_id,
+        "timestamp": episode.timestamp,
+        "event_type": episode.event_type,
+        "sku": episode.sku,
+        "description": episode.description,
+        "content": {
+            "context": episode.context,
+            "outcome": episode.outcome,
+            "learning": episode.learning
+        },
+        "confidence": 1.0,
+        "is_active": True
+    }
+
+
+def _fact_row(fact: SemanticMemory) -> Dict[str, Any]:
+    return {
+        "memory_type": M_SEMANTIC,
+        "fact_id": fact.fact_id,
+        "timestamp": fact.timestamp,
+        "category": fact.category,
+        "key": fact.key,
+        "content": {"value": fact.value},
+        "confidence": fact.confidence,
+        "source": fact.source,
+        "is_active": True
+    }
+
+
+def _procedure_row(procedure: ProceduralMemory) -> Dict[str, Any]:
+    return {
+        "memory_type": M_PROCEDURAL,
+        "procedure_id": procedure.procedure_id,
+        "timestamp": procedure.timestamp,
+        "category": procedure.procedure_type,
+        "key": procedure.name,
+        "content": {
+            "description": procedure.description,
+            "steps": procedure.steps,
+            "conditions": procedure.conditions,
+            "success_rate": procedure.success_rate,
+            "usage_count": procedure.usage_count
+        },
+        "confidence": procedure.success_rate,
+        "is_active": True
+    }
+
+
+def _checkpoint_row(checkpoint: Checkpoint) -> Dict[str, Any]:
+    return {
+        "checkpoint_id": checkpoint.checkpoint_id,
+        "timestamp": checkpoint.timestamp,
+        "cycle_number": checkpoint.cycle_number,
+        "goal": checkpoint.goal,
+        "state": {
+            "agent_state": checkpoint.agent_state,
+            "progress": checkpoint.progress,
+            "decisions_made": checkpoint.decisions_made,
+            "message_history": [m._asdict() for m in checkpoint.message_history],
+            "resources_used": checkpoint.resources_used,
+            "errors_encountered": checkpoint.errors_encountered
+        },
+        "is_stable": checkpoint.is_stable,
+        "is_active": True
+    }
+
+
+def _goal_row(goal: Goal) -> Dict[str, Any]:
+    return {
+        "goal_id": goal.goal_id,
+        "created_at": goal.created_at,
+        "objective": goal.objective,
+        "status": goal.status,
+        "priority": goal.priority,
+        "context": goal.context,
+        "target_metrics": goal.target_metrics,
+        "current_progress": goal.current_progress,
+        "deadline": goal.deadline,
+        "is_active": True
+    }
+
+
+# Columns an upsert overwrites on an existing goal (created_at is kept)
+_GOAL_UPSERT_COLUMNS = (
+    "objective", "status", "priority", "context",
+    "target_metrics", "current_progress", "deadline", "is_active"
+)
+
+# Dialect-specific INSERT constructs that support ON CONFLICT
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _episode_from_row(r) -> EpisodicMemory:
+    content = _load_json(r.content)
+    return EpisodicMemory(
+        event_id=r.event_id,
+        timestamp=r.timestamp,
+        event_type=r.event_type,
+        sku=r.sku,
+        description=r.description,
+        context=content.get("context", {}),
+        outcome=content.get("outcome"),
+        learning=content.get("learning")
+    )
+
+
+def _fact_from_row(r) -> SemanticMemory:
+    content = _load_json(r.content)
+    return SemanticMemory(
+        fact_id=r.fact_id,
+        timestamp=r.timestamp,
+        category=r.category,
+        key=r.key,
+        value=content.get("value"),
+        confidence=r.confidence,
+        source=r.source
+    )
+
+
+def _procedure_from_row(r) -> ProceduralMemory:
+    content = _load_json(r.content)
+    return ProceduralMemory(
+        procedure_id=r.procedure_id,
+        timestamp=r.timestamp,
+        procedure_type=r.category,
+        name=r.key,
+        description=content.get("description", ""),
+        steps=content.get("steps", []),
+        conditions=content.get("conditions", {}),
+        success_rate=r.confidence,
+        usage_count=content.get("usage_count", 0)
+    )
+
+
+def _array_length(value) -> int:
+    # Matches the SQL summaries: non-array payloads count as empty
+    return len(value) if isinstance(value, list) else 0
+
+
+def _message_from_dict(m: Dict[str, Any]) -> Message:
+    # Stored histories may predate Message or carry extra keys; read the known fields only
+    return Message(m.get("stage", ""), m.get("message", ""), m.get("timestamp"))
+
+
+def _checkpoint_from_row(r) -> Checkpoint:
+    state = _load_json(r.state)
+    return Checkpoint(
+        checkpoint_id=r.checkpoint_id,
+        timestamp=r.timestamp,
+        cycle_number=r.cycle_number,
+        goal=r.goal,
+        agent_state=state.get("agent_state", {}),
+        progress=state.get("progress", {}),
+        decisions_made=state.get("decisions_made", []),
+        message_history=[_message_from_dict(m) for m in state.get("message_history", ())],
+        resources_used=state.get("resources_used", {}),
+        errors_encountered=state.get("errors_encountered", []),
+        is_stable=r.is_stable
+    )
+
+
+def _goal_from_row(r) -> Goal:
+    return Goal(
+        goal_id=r.goal_id,
+        created_at=r.created_at,
+        objective=r.objective,
+        status=r.status,
+        priority=r.priority,
+        context=_load_json(r.context),
+        target_metrics=_load_json(r.target_metrics),
+        current_progress=_load_json(r.current_progress),
+        deadline=r.deadline
+    )
+
 
 class PersistentMemoryManager:
     """
@@ -26,38 +482,86 @@ class PersistentMemoryManager:
     - Procedural memory (strategies)
     - Checkpoints (state snapshots)
     - Goals (long-term objectives)
+    
+    Single-row writers commit by default; pass commit=False to leave the
+    write in the caller's transaction and commit several writes together.
     """
     
     def __init__(self, session_factory):
         self.session_factory = session_factory
     
+    # ============ BULK WRITES ============
+    
+    def _bulk_insert(self, db: Session, model, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert many rows (column-name dicts) of model in one transaction.
+        Rows go out in chunks of BULK_INSERT_CHUNK_SIZE as batched multi-row
+        INSERTs instead of one round-trip per row. Returns the number inserted.
+        """
+        rows = iter(records)
+        total = 0
+        try:
+            while True:
+                chunk = list(islice(rows, BULK_INSERT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                db.execute(insert(model), chunk)
+                if model is _PM:
+                    for row in chunk:
+                        _drop_memory_row(row)
+                total += len(chunk)
+            db.commit()
+            logger.info(f"Bulk stored {total} {model.__tablename__} rows")
+            return total
+        except Exception as e:
+            logger.error(f"Error bulk storing {model.__tablename__}: {e}")
+            db.rollback()
+            raise
+    
+    def bulk_record(self, db: Session, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert many PersistentMemory rows (column-name dicts) in one transaction"""
+        return self._bulk_insert(db, _PM, records)
+    
+    def store_episodes_bulk(self, db: Session, episodes: Iterable[EpisodicMemory], durable: bool = True) -> int:
+        """Store many events in one transaction"""
+        if not durable:
+            _async_commit(db)
+        return self.bulk_record(db, map(_episode_row, episodes))
+    
+    def store_facts_bulk(self, db: Session, facts: Iterable[SemanticMemory]) -> int:
+        """Store many learned facts in one transaction"""
+        return self.bulk_record(db, map(_fact_row, facts))
+    
+    def store_procedures_bulk(self, db: Session, procedures: Iterable[ProceduralMemory]) -> int:
+        """Store many procedures in one transaction"""
+        return self.bulk_record(db, map(_procedure_row, procedures))
+    
+    def save_checkpoints_bulk(self, db: Session, checkpoints: Iterable[Checkpoint], durable: bool = True) -> int:
+        """Save many state snapshots in one transaction"""
+        checkpoints = list(checkpoints)
+        if not durable:
+            _async_commit(db)
+        total = self._bulk_insert(db, _PC, map(_checkpoint_row, checkpoints))
+        for checkpoint in checkpoints:
+            _cache_drop(_checkpoint_cache, checkpoint.checkpoint_id)
+        return total
+    
     # ============ EPISODIC MEMORY ============
     
-    def store_episode(self, db: Session, episode: EpisodicMemory) -> str:
+    def store_episode(self, db: Session, episode: EpisodicMemory, commit: bool = True, durable: bool = True) -> str:
         """Store a specific event/experience"""
         try:
-            memory = schemas.PersistentMemory(
-                memory_type=MemoryType.EPISODIC,
-                event_id=episode.event_id,
-                timestamp=episode.timestamp,
-                event_type=episode.event_type,
-                sku=episode.sku,
-                description=episode.description,
-                content=json.dumps({
-                    "context": episode.context,
-                    "outcome": episode.outcome,
-                    "learning": episode.learning
-                }),
-                confidence=1.0,
-                is_active=True
-            )
-            db.add(memory)
-            db.commit()
+            if not durable:
+                _async_commit(db)
+            db.execute(_insert_memory, _episode_row(episode))
+            if commit:
+                db.commit()
             logger.info(f"Stored episodic memory: {episode.event_type} for {episode.sku}")
             return episode.event_id
         except Exception as e:
             logger.error(f"Error storing episodic memory: {e}")
-            db.rollback()
+            if commit:
+                db.rollback()
             raise
     
     def retrieve_episodes(
@@ -70,61 +574,33 @@ class PersistentMemoryManager:
     ) -> List[EpisodicMemory]:
         """Retrieve past events (episodic memory)"""
         try:
-            query = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == MemoryType.EPISODIC,
-                schemas.PersistentMemory.timestamp >= datetime.utcnow() - timedelta(days=days_back),
-                schemas.PersistentMemory.is_active == True
-            )
-            
-            if sku:
-                query = query.filter(schemas.PersistentMemory.sku == sku)
-            if event_type:
-                query = query.filter(schemas.PersistentMemory.event_type == event_type)
-            
-            results = query.order_by(schemas.PersistentMemory.timestamp.desc()).limit(limit).all()
+            rows = db.execute(_episodes[bool(sku), bool(event_type)], {
+                "since": datetime.utcnow() - timedelta(days=days_back),
+                "sku": sku,
+                "event_type": event_type,
+                "limit": limit
+            })
             
-            episodes = []
-            for r in results:
-                content = json.loads(r.content) if isinstance(r.content, str) else r.content
-                episodes.append(EpisodicMemory(
-                    event_id=r.event_id,
-                    timestamp=r.timestamp,
-                    event_type=r.event_type,
-                    sku=r.sku,
-                    description=r.description,
-                    context=content.get("context", {}),
-                    outcome=content.get("outcome"),
-                    learning=content.get("learning")
-                ))
-            
-            return episodes
+            return [_episode_from_row(r) for r in rows]
         except Exception as e:
             logger.error(f"Error retrieving episodic memories: {e}")
             return []
     
     # ============ SEMANTIC MEMORY ============
     
-    def store_fact(self, db: Session, fact: SemanticMemory) -> str:
+    def store_fact(self, db: Session, fact: SemanticMemory, commit: bool = True) -> str:
         """Store a learned fact or insight"""
         try:
-            memory = schemas.PersistentMemory(
-                memory_type=MemoryType.SEMANTIC,
-                fact_id=fact.fact_id,
-                timestamp=fact.timestamp,
-                category=fact.category,
-                key=fact.key,
-                content=json.dumps({"value": fact.value}),
-                confidence=fact.confidence,
-                source=fact.source,
-                is_active=True
-            )
-            db.add(memory)
-            db.commit()
+            db.execute(_insert_memory, _fact_row(fact))
+            if commit:
+                db.commit()
+            _cache_drop(_fact_cache, (fact.category, fact.key))
             logger.info(f"Stored semantic memory: {fact.category}/{fact.key}")
             return fact.fact_id
         except Exception as e:
             logger.error(f"Error storing semantic memory: {e}")
-            db.rollback()
+            if commit:
+                db.rollback()
             raise
     
     def retrieve_fact(
@@ -133,28 +609,19 @@ class PersistentMemoryManager:
         category: str, 
         key: str
     ) -> Optional[SemanticMemory]:
-        """Retrieve a specific learned fact"""
+        """Retrieve a specific learned fact (cached for NATURAL_KEY_CACHE_TTL seconds)"""
+        fact = _cache_get(_fact_cache, (category, key))
+        if fact is not None:
+            return fact
         try:
-            result = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == MemoryType.SEMANTIC,
-                schemas.PersistentMemory.category == category,
-                schemas.PersistentMemory.key == key,
-                schemas.PersistentMemory.is_active == True
-            ).order_by(schemas.PersistentMemory.timestamp.desc()).first()
+            result = db.execute(_fact_by_key, {"category": category, "key": key}).scalars().first()
             
             if not result:
                 return None
             
-            content = json.loads(result.content) if isinstance(result.content, str) else result.content
-            return SemanticMemory(
-                fact_id=result.fact_id,
-                timestamp=result.timestamp,
-                category=result.category,
-                key=result.key,
-                value=content.get("value"),
-                confidence=result.confidence,
-                source=result.source
-            )
+            fact = _fact_from_row(result)
+            _cache_put(_fact_cache, (category, key), fact)
+            return fact
         except Exception as e:
             logger.error(f"Error retrieving semantic memory: {e}")
             return None
@@ -167,59 +634,30 @@ class PersistentMemoryManager:
     ) -> List[SemanticMemory]:
         """Retrieve all facts in a category"""
         try:
-            results = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == MemoryType.SEMANTIC,
-                schemas.PersistentMemory.category == category,
-                schemas.PersistentMemory.confidence >= min_confidence,
-                schemas.PersistentMemory.is_active == True
-            ).all()
-            
-            facts = []
-            for r in results:
-                content = json.loads(r.content) if isinstance(r.content, str) else r.content
-                facts.append(SemanticMemory(
-                    fact_id=r.fact_id,
-                    timestamp=r.timestamp,
-                    category=r.category,
-                    key=r.key,
-                    value=content.get("value"),
-                    confidence=r.confidence,
-                    source=r.source
-                ))
+            rows = db.execute(
+                _facts_by_category, {"category": category, "min_confidence": min_confidence}
+            )
             
-            return sorted(facts, key=lambda x: x.confidence, reverse=True)
+            return [_fact_from_row(r) for r in rows]
         except Exception as e:
             logger.error(f"Error retrieving semantic facts: {e}")
             return []
     
     # ============ PROCEDURAL MEMORY ============
     
-    def store_procedure(self, db: Session, procedure: ProceduralMemory) -> str:
+    def store_procedure(self, db: Session, procedure: ProceduralMemory, commit: bool = True) -> str:
         """Store a successful procedure/strategy"""
         try:
-            memory = schemas.PersistentMemory(
-                memory_type=MemoryType.PROCEDURAL,
-                procedure_id=procedure.procedure_id,
-                timestamp=procedure.timestamp,
-                category=procedure.procedure_type,
-                key=procedure.name,
-                content=json.dumps({
-                    "description": procedure.description,
-                    "steps": procedure.steps,
-                    "conditions": procedure.conditions,
-                    "success_rate": procedure.success_rate,
-                    "usage_count": procedure.usage_count
-                }),
-                confidence=procedure.success_rate,
-                is_active=True
-            )
-            db.add(memory)
-            db.commit()
+            db.execute(_insert_memory, _procedure_row(procedure))
+            if commit:
+                db.commit()
+            _cache_drop(_procedure_cache, (procedure.procedure_type, procedure.name))
             logger.info(f"Stored procedural memory: {procedure.name}")
             return procedure.procedure_id
         except Exception as e:
             logger.error(f"Error storing procedural memory: {e}")
-            db.rollback()
+            if commit:
+                db.rollback()
             raise
     
     def retrieve_procedure(
@@ -228,30 +666,21 @@ class PersistentMemoryManager:
         procedure_type: str,
         name: str
     ) -> Optional[ProceduralMemory]:
-        """Retrieve a specific procedure"""
+        """Retrieve a specific procedure (cached for NATURAL_KEY_CACHE_TTL seconds)"""
+        procedure = _cache_get(_procedure_cache, (procedure_type, name))
+        if procedure is not None:
+            return procedure
         try:
-            result = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == MemoryType.PROCEDURAL,
-                schemas.PersistentMemory.category == procedure_type,
-                schemas.PersistentMemory.key == name,
-                schemas.PersistentMemory.is_active == True
-            ).first()
+            result = db.execute(
+                _procedure_by_name, {"procedure_type": procedure_type, "name": name}
+            ).scalars().first()
             
             if not result:
                 return None
             
-            content = json.loads(result.content) if isinstance(result.content, str) else result.content
-            return ProceduralMemory(
-                procedure_id=result.procedure_id,
-                timestamp=result.timestamp,
-                procedure_type=result.category,
-                name=result.key,
-                description=content.get("description", ""),
-                steps=content.get("steps", []),
-                conditions=content.get("conditions", {}),
-                success_rate=result.confidence,
-                usage_count=content.get("usage_count", 0)
-            )
+            procedure = _procedure_from_row(result)
+            _cache_put(_procedure_cache, (procedure_type, name), procedure)
+            return procedure
         except Exception as e:
             logger.error(f"Error retrieving procedural memory: {e}")
             return None
@@ -265,63 +694,33 @@ class PersistentMemoryManager:
     ) -> List[ProceduralMemory]:
         """Get most successful procedures of a type"""
         try:
-            results = db.query(schemas.PersistentMemory).filter(
-                schemas.PersistentMemory.memory_type == MemoryType.PROCEDURAL,
-                schemas.PersistentMemory.category == procedure_type,
-                schemas.PersistentMemory.confidence >= min_success_rate,
-                schemas.PersistentMemory.is_active == True
-            ).order_by(
-                schemas.PersistentMemory.confidence.desc()
-            ).limit(limit).all()
-            
-            procedures = []
-            for r in results:
-                content = json.loads(r.content) if isinstance(r.content, str) else r.content
-                procedures.append(ProceduralMemory(
-                    procedure_id=r.procedure_id,
-                    timestamp=r.timestamp,
-                    procedure_type=r.category,
-                    name=r.key,
-                    description=content.get("description", ""),
-                    steps=content.get("steps", []),
-                    conditions=content.get("conditions", {}),
-                    success_rate=r.confidence,
-                    usage_count=content.get("usage_count", 0)
-                ))
+            rows = db.execute(
+                _best_procedures,
+                {"procedure_type": procedure_type, "min_success_rate": min_success_rate, "limit": limit}
+            )
             
-            return procedures
+            return [_procedure_from_row(r) for r in rows]
         except Exception as e:
             logger.error(f"Error retrieving best procedures: {e}")
             return []
     
     # ============ CHECKPOINTS (State Management) ============
     
-    def save_checkpoint(self, db: Session, checkpoint: Checkpoint) -> str:
+    def save_checkpoint(self, db: Session, checkpoint: Checkpoint, commit: bool = True, durable: bool = True) -> str:
         """Save agent state snapshot"""
         try:
-            memory = schemas.AgentCheckpoint(
-                checkpoint_id=checkpoint.checkpoint_id,
-                timestamp=checkpoint.timestamp,
-                cycle_number=checkpoint.cycle_number,
-                goal=checkpoint.goal,
-                state=json.dumps({
-                    "agent_state": checkpoint.agent_state,
-                    "progress": checkpoint.progress,
-                    "decisions_made": checkpoint.decisions_made,
-                    "message_history": checkpoint.message_history,
-                    "resources_used": checkpoint.resources_used,
-                    "errors_encountered": checkpoint.errors_encountered
-                }),
-                is_stable=checkpoint.is_stable,
-                is_active=True
-            )
-            db.add(memory)
-            db.commit()
+            if not durable:
+                _async_commit(db)
+            db.execute(_insert_checkpoint, _checkpoint_row(checkpoint))
+            if commit:
+                db.commit()
+            _cache_drop(_checkpoint_cache, checkpoint.checkpoint_id)
             logger.info(f"Saved checkpoint: {checkpoint.checkpoint_id} for cycle {checkpoint.cycle_number}")
             return checkpoint.checkpoint_id
         except Exception as e:
             logger.error(f"Error saving checkpoint: {e}")
-            db.rollback()
+            if commit:
+                db.rollback()
             raise
     
     def get_latest_stable_checkpoint(
@@ -331,33 +730,14 @@ class PersistentMemoryManager:
     ) -> Optional[Checkpoint]:
         """Get latest stable checkpoint for resumption"""
         try:
-            query = db.query(schemas.AgentCheckpoint).filter(
-                schemas.AgentCheckpoint.is_stable == True,
-                schemas.AgentCheckpoint.is_active == True
-            )
-            
-            if goal:
-                query = query.filter(schemas.AgentCheckpoint.goal == goal)
-            
-            result = query.order_by(schemas.AgentCheckpoint.timestamp.desc()).first()
+            result = db.execute(
+                _latest_stable_checkpoint[bool(goal)], {"goal": goal, "limit": 1}
+            ).first()
             
             if not result:
                 return None
             
-            state = json.loads(result.state) if isinstance(result.state, str) else result.state
-            return Checkpoint(
-                checkpoint_id=result.checkpoint_id,
-                timestamp=result.timestamp,
-                cycle_number=result.cycle_number,
-                goal=result.goal,
-                agent_state=state.get("agent_state", {}),
-                progress=state.get("progress", {}),
-                decisions_made=state.get("decisions_made", []),
-                message_history=state.get("message_history", []),
-                resources_used=state.get("resources_used", {}),
-                errors_encountered=state.get("errors_encountered", []),
-                is_stable=result.is_stable
-            )
+            return _checkpoint_from_row(result)
         except Exception as e:
             logger.error(f"Error retrieving latest checkpoint: {e}")
             return None
@@ -370,58 +750,130 @@ class PersistentMemoryManager:
     ) -> List[Checkpoint]:
         """Get checkpoint history for recovery"""
         try:
-            query = db.query(schemas.AgentCheckpoint).filter(
-                schemas.AgentCheckpoint.is_active == True
-            )
-            
-            if goal:
-                query = query.filter(schemas.AgentCheckpoint.goal == goal)
-            
-            results = query.order_by(
-                schemas.AgentCheckpoint.timestamp.desc()
-            ).limit(limit).all()
+            rows = db.execute(_checkpoint_history[bool(goal)], {"goal": goal, "limit": limit})
             
-            checkpoints = []
-            for r in results:
-                state = json.loads(r.state) if isinstance(r.state, str) else r.state
-                checkpoints.append(Checkpoint(
-                    checkpoint_id=r.checkpoint_id,
-                    timestamp=r.timestamp,
-                    cycle_number=r.cycle_number,
-                    goal=r.goal,
-                    agent_state=state.get("agent_state", {}),
-                    progress=state.get("progress", {}),
-                    decisions_made=state.get("decisions_made", []),
-                    message_history=state.get("message_history", []),
-                    resources_used=state.get("resources_used", {}),
-                    errors_encountered=state.get("errors_encountered", []),
-                    is_stable=r.is_stable
-                ))
-            
-            return checkpoints
+            return [_checkpoint_from_row(r) for r in rows]
         except Exception as e:
             logger.error(f"Error retrieving checkpoint history: {e}")
             return []
     
+    def get_failure_stats(
+        self,
+        db: Session,
+        goal: Optional[str] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Error frequencies and failed-decision count across the newest `limit`
+        active checkpoints, computed in SQL (only the counts are returned).
+        Other backends count over the loaded checkpoint history instead.
+        """
+        statements = _FAILURE_STATS.get(db.get_bind().dialect.name)
+        if statements is None:
+            return self._failure_stats_from_history(db, goal, limit)
+        totals_stmt, errors_stmt = statements
+        params = {"goal": goal, "limit": limit}
+        checkpoints, failed_decisions = db.execute(totals_stmt, params).one()
+        return {
+            "checkpoints": checkpoints,
+            "failed_decisions": failed_decisions,
+            "errors": [tuple(row) for row in db.execute(errors_stmt, params)]
+        }
+    
+    def _failure_stats_from_history(self, db: Session, goal: Optional[str], limit: int) -> Dict[str, Any]:
+        """get_failure_stats for dialects without a SQL aggregation (same skipping rules)"""
+        checkpoints = self.get_checkpoint_history(db, goal, limit)
+        error_patterns: Dict[Any, int] = {}
+        failed_decisions = 0
+        for cp in checkpoints:
+            if isinstance(cp.errors_encountered, list):
+                for error in cp.errors_encountered:
+                    error_patterns[error] = error_patterns.get(error, 0) + 1
+            if isinstance(cp.decisions_made, list):
+                failed_decisions += sum(
+                    1 for d in cp.decisions_made
+                    if isinstance(d, dict) and d.get("status") == "failed"
+                )
+        return {
+            "checkpoints": len(checkpoints),
+            "failed_decisions": failed_decisions,
+            "errors": sorted(error_patterns.items(), key=lambda e: (-e[1], str(e[0])))
+        }
+    
+    def get_checkpoint_summaries(
+        self,
+        db: Session,
+        goal: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest active checkpoints as listing rows (id, timestamp, cycle, goal,
+        progress, stability, error/decision counts) without loading state.
+        Other backends build the rows from the loaded checkpoint history instead.
+        """
+        summary_columns = _CHECKPOINT_SUMMARY_COLUMNS.get(db.get_bind().dialect.name)
+        if summary_columns is None:
+            return [
+                {
+                    "checkpoint_id": cp.checkpoint_id,
+                    "timestamp": cp.timestamp,
+                    "cycle_number": cp.cycle_number,
+                    "goal": cp.goal,
+                    "progress": cp.progress,
+                    "is_stable": cp.is_stable,
+                    "errors_count": _array_length(cp.errors_encountered),
+                    "decisions_made": _array_length(cp.decisions_made)
+                }
+                for cp in self.get_checkpoint_history(db, goal, limit)
+            ]
+        stmt = select(
+            _PC.checkpoint_id, _PC.timestamp, _PC.cycle_number, _PC.goal, _PC.is_stable,
+            *summary_columns
+        ).where(_PC.is_active == True)
+        
+        if goal:
+            stmt = stmt.where(_PC.goal == goal)
+        
+        rows = db.execute(stmt.order_by(_PC.timestamp.desc()).limit(limit))
+        return [
+            {
+                "checkpoint_id": r.checkpoint_id,
+                "timestamp": r.timestamp,
+                "cycle_number": r.cycle_number,
+                "goal": r.goal,
+                "progress": {} if r.progress is None else r.progress,
+                "is_stable": r.is_stable,
+                "errors_count": r.errors_count,
+                "decisions_made": r.decisions_count
+            }
+            for r in rows
+        ]
+    
+    def get_checkpoint_by_id(self, db: Session, checkpoint_id: str) -> Optional[Checkpoint]:
+        """Get an active checkpoint by its checkpoint_id (cached; treat as read-only)"""
+        checkpoint = _cache_get(_checkpoint_cache, checkpoint_id)
+        if checkpoint is not None:
+            return checkpoint
+        try:
+            result = db.execute(_checkpoint_by_id, {"checkpoint_id": checkpoint_id}).scalars().first()
+            if not result:
+                return None
+            
+            checkpoint = _checkpoint_from_row(result)
+            _cache_put(_checkpoint_cache, checkpoint_id, checkpoint)
+            return checkpoint
+        except Exception as e:
+            logger.error(f"Error retrieving checkpoint {checkpoint_id}: {e}")
+            return None
+    
     # ============ GOALS (Persistent Objectives) ============
     
     def create_goal(self, db: Session, goal: Goal) -> str:
         """Create a long-term goal"""
         try:
-            goal_record = schemas.PersistentGoal(
-                goal_id=goal.goal_id,
-                created_at=goal.created_at,
-                objective=goal.objective,
-                status=goal.status,
-                priority=goal.priority,
-                context=json.dumps(goal.context),
-                target_metrics=json.dumps(goal.target_metrics),
-                current_progress=json.dumps(goal.current_progress),
-                deadline=goal.deadline,
-                is_active=True
-            )
-            db.add(goal_record)
+            db.execute(_insert_goal, _goal_row(goal))
             db.commit()
+            _cache_drop(_goal_cache, goal.goal_id)
             logger.info(f"Created goal: {goal.objective}")
             return goal.goal_id
         except Exception as e:
@@ -429,35 +881,67 @@ class PersistentMemoryManager:
             db.rollback()
             raise
     
+    def upsert_goals(self, db: Session, goals: Iterable[Goal]) -> int:
+        """
+        Create or replace goals by goal_id in a single INSERT ... ON CONFLICT
+        DO UPDATE statement (atomic, one round-trip). Returns the number of goals.
+        """
+        rows = [_goal_row(goal) for goal in goals]
+        if not rows:
+            return 0
+        dialect = db.get_bind().dialect.name
+        dialect_insert = _UPSERT_INSERTS.get(dialect)
+        if dialect_insert is None:
+            raise NotImplementedError(f"Goal upsert is not supported on {dialect}")
+        try:
+            stmt = dialect_insert(_PG).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[_PG.goal_id],
+                set_={name: stmt.excluded[name] for name in _GOAL_UPSERT_COLUMNS}
+            )
+            db.execute(stmt)
+            db.commit()
+            for row in rows:
+                _cache_drop(_goal_cache, row["goal_id"])
+            logger.info(f"Upserted {len(rows)} goals")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error upserting goals: {e}")
+            db.rollback()
+            raise
+    
+    def upsert_goal(self, db: Session, goal: Goal) -> str:
+        """Create or replace a single goal by goal_id"""
+        self.upsert_goals(db, (goal,))
+        return goal.goal_id
+    
     def get_active_goals(self, db: Session) -> List[Goal]:
         """Get all active goals"""
         try:
-            results = db.query(schemas.PersistentGoal).filter(
-                schemas.PersistentGoal.status == "active",
-                schemas.PersistentGoal.is_active == True
-            ).order_by(
-                schemas.PersistentGoal.priority.desc()
-            ).all()
+            results = db.execute(_active_goals).scalars().all()
             
-            goals = []
-            for r in results:
-                goals.append(Goal(
-                    goal_id=r.goal_id,
-                    created_at=r.created_at,
-                    objective=r.objective,
-                    status=r.status,
-                    priority=r.priority,
-                    context=json.loads(r.context) if isinstance(r.context, str) else r.context,
-                    target_metrics=json.loads(r.target_metrics) if isinstance(r.target_metrics, str) else r.target_metrics,
-                    current_progress=json.loads(r.current_progress) if isinstance(r.current_progress, str) else r.current_progress,
-                    deadline=r.deadline
-                ))
-            
-            return goals
+            return [_goal_from_row(r) for r in results]
         except Exception as e:
             logger.error(f"Error retrieving active goals: {e}")
             return []
     
+    def get_goal(self, db: Session, goal_id: str) -> Optional[Goal]:
+        """Get a goal by its goal_id (cached; treat as read-only)"""
+        goal = _cache_get(_goal_cache, goal_id)
+        if goal is not None:
+            return goal
+        try:
+            result = db.execute(_goal_by_id, {"goal_id": goal_id}).scalars().first()
+            if not result:
+                return None
+            
+            goal = _goal_from_row(result)
+            _cache_put(_goal_cache, goal_id, goal)
+            return goal
+        except Exception as e:
+            logger.error(f"Error retrieving goal {goal_id}: {e}")
+            return None
+    
     def update_goal_progress(
         self, 
         db: Session, 
@@ -466,18 +950,17 @@ class PersistentMemoryManager:
     ) -> bool:
         """Update progress on a goal"""
         try:
-            goal = db.query(schemas.PersistentGoal).filter(
-                schemas.PersistentGoal.goal_id == goal_id
-            ).first()
+            goal = db.execute(_goal_by_id, {"goal_id": goal_id}).scalars().first()
             
             if not goal:
                 return False
             
-            current = json.loads(goal.current_progress) if isinstance(goal.current_progress, str) else goal.current_progress
-            current.update(progress_update)
-            goal.current_progress = json.dumps(current)
+            current = _load_json(goal.current_progress)
+            # Assign a new dict: in-place edits to a JSON column aren't change-tracked
+            goal.current_progress = {**(current or {}), **progress_update}
             
             db.commit()
+            _cache_drop(_goal_cache, goal_id)
             logger.info(f"Updated progress for goal {goal_id}")
             return True
         except Exception as e:
@@ -68,9 +68,7 @@ class RecoveryManager:
         Restores agent state and continues work.
         """
         try:
-            # Get checkpoint history to find the one we want
-            checkpoints = self.memory_manager.get_checkpoint_history(db, limit=100)
-            checkpoint = next((c for c in checkpoints if c.checkpoint_id == checkpoint_id), None)
+            checkpoint = self.memory_manager.get_checkpoint_by_id(db, checkpoint_id)
             
             if not checkpoint:
                 logger.error(f"Checkpoint {checkpoint_id} not found")
@@ -84,7 +82,7 @@ class RecoveryManager:
                 "agent_state": checkpoint.agent_state,
                 "goal": checkpoint.goal,
                 "progress": checkpoint.progress,
-                "message_history": checkpoint.message_history,
+                "message_history": [m._asdict() for m in checkpoint.message_history],
                 "next_cycle": checkpoint.cycle_number + 1,
                 "message": f"Resumed from cycle {checkpoint.cycle_number}"
             }
@@ -103,8 +101,7 @@ class RecoveryManager:
         Useful when a decision path leads to problems.
         """
         try:
-            checkpoints = self.memory_manager.get_checkpoint_history(db, limit=100)
-            checkpoint = next((c for c in checkpoints if c.checkpoint_id == checkpoint_id), None)
+            checkpoint = self.memory_manager.get_checkpoint_by_id(db, checkpoint_id)
             
             if not checkpoint:
                 logger.error(f"Checkpoint {checkpoint_id} not found for rollback")
@@ -152,20 +149,10 @@ class RecoveryManager:
     ) -> Dict[str, Any]:
         """List available checkpoints for recovery/rollback"""
         try:
-            checkpoints = self.memory_manager.get_checkpoint_history(db, goal, limit)
-            
-            checkpoint_list = []
-            for cp in checkpoints:
-                checkpoint_list.append({
-                    "checkpoint_id": cp.checkpoint_id,
-                    "timestamp": cp.timestamp.isoformat(),
-                    "cycle_number": cp.cycle_number,
-                    "goal": cp.goal,
-                    "progress": cp.progress,
-                    "is_stable": cp.is_stable,
-                    "errors_count": len(cp.errors_encountered),
-                    "decisions_made": len(cp.decisions_made)
-                })
+            # Summary rows only; checkpoint state is not loaded
+            checkpoint_list = self.memory_manager.get_checkpoint_summaries(db, goal, limit)
+            for cp in checkpoint_list:
+                cp["timestamp"] = cp["timestamp"].isoformat()
             
             return {
                 "status": "success",
@@ -187,36 +174,20 @@ class RecoveryManager:
         Learn from errors to avoid repeating them.
         """
         try:
-            checkpoints = self.memory_manager.get_checkpoint_history(db, goal, lookback_cycles)
-            
-            error_patterns = {}
-            total_errors = 0
-            failed_decisions = 0
-            
-            for cp in checkpoints:
-                # Analyze errors in this checkpoint
-                for error in cp.errors_encountered:
-                    if error not in error_patterns:
-                        error_patterns[error] = 0
-                    error_patterns[error] += 1
-                    total_errors += 1
-                
-                # Analyze failed decisions
-                for decision in cp.decisions_made:
-                    if decision.get("status") == "failed":
-                        failed_decisions += 1
-            
-            # Sort by frequency
-            common_errors = sorted(error_patterns.items(), key=lambda x: x[1], reverse=True)
+            # Counted in the database, most frequent errors first
+            stats = self.memory_manager.get_failure_stats(db, goal, lookback_cycles)
+            checkpoints = stats["checkpoints"]
+            common_errors = stats["errors"]
+            total_errors = sum(count for _, count in common_errors)
             
             analysis = {
                 "status": "success",
                 "lookback_cycles": lookback_cycles,
-                "total_checkpoints_analyzed": len(checkpoints),
+                "total_checkpoints_analyzed": checkpoints,
                 "total_errors": total_errors,
-                "failed_decisions": failed_decisions,
+                "failed_decisions": stats["failed_decisions"],
                 "common_errors": [{"error": err, "frequency": count} for err, count in common_errors[:10]],
-                "error_rate": total_errors / len(checkpoints) if checkpoints else 0
+                "error_rate": total_errors / checkpoints if checkpoints else 0
             }
             
             logger.info(f"Failure analysis: {analysis}")
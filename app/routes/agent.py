@@ -1,12 +1,15 @@
 # app/routes/agent.py
+import os
 import uuid
 import logging
 import json
 import time
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import orjson
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from collections import deque
 from sqlalchemy.orm import Session
@@ -15,11 +18,45 @@ from app.models import schemas
 from app.agents.langgraph_flow import agent_controller
 from app.agents.langgraph_workflow import run_cycle
 from app.auth.dependencies import get_current_user
-from app.agents.streaming import job_stream_manager
+from app.agents.streaming import job_stream_manager, event_type_filter
 
 logger = logging.getLogger("agent_routes")
 router = APIRouter(prefix="/agent", tags=["Agent"])
 
+# Agent cycles run here rather than on the anyio threadpool that serves sync
+# routes, so long cycles can't starve request handling. Shut down in main.py's lifespan.
+AGENT_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_WORKERS", "4")), thread_name_prefix="agent-cycle")
+
+# Event timestamps are naive UTC datetimes; orjson renders them as ISO-8601 with a Z suffix.
+_SSE_OPTS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+
+
+def _sse(msg: dict) -> bytes:
+    """Encode one server-sent event frame."""
+    return b"data: " + orjson.dumps(msg, default=str, option=_SSE_OPTS) + b"\n\n"
+
+# Job progress streams close after this long even if the job never finishes
+JOB_STREAM_TIMEOUT_SECONDS = 600
+
+# With no events arriving, re-check the job row this often (covers jobs run by another worker)
+JOB_STATUS_POLL_SECONDS = 2.0
+
+# Progress stages logged once the cycle has finished either way
+_TERMINAL_STAGES = frozenset({"COMPLETE", "ERROR"})
+
+# How long a finished job's stream waits for its COMPLETE/ERROR event to be logged
+TERMINAL_EVENT_GRACE_SECONDS = 0.5
+
+
+def _job_status(job_id: str):
+    """(status, result, error) for a job from a short-lived session, or None if missing."""
+    scope_db = SessionLocal()
+    try:
+        job = scope_db.query(schemas.Job).filter(schemas.Job.id == job_id).first()
+        return (job.status, job.result, job.error) if job else None
+    finally:
+        scope_db.close()
+
 
 
 def log_progress(job_id: str, stage: str, message: str, details: dict = None):
@@ -83,7 +120,7 @@ def _execute_agent_cycle(job_id: str):
         db.close()
 
 @router.post("/run_once")
-def run_once_async(background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+def run_once_async(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
     """
     Start agent in background - returns immediately.
     Persists initial job state to DB.
@@ -99,8 +136,8 @@ def run_once_async(background_tasks: BackgroundTasks, db: Session = Depends(get_
     db.add(new_job)
     db.commit()
     
-    # Start background task using FastAPI BackgroundTasks (ThreadPool)
-    background_tasks.add_task(_execute_agent_cycle, job_id)
+    # Run on the dedicated agent pool (queues behind AGENT_WORKERS running cycles)
+    AGENT_POOL.submit(_execute_agent_cycle, job_id)
     
     logger.info(f"Job {job_id}: Queued for execution")
     
@@ -112,7 +149,7 @@ def run_once_async(background_tasks: BackgroundTasks, db: Session = Depends(get_
     }
 
 @router.post("/run_once_test")
-def run_once_test(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def run_once_test(db: Session = Depends(get_db)):
     """
     Start agent in background (NO AUTH) - for testing only
     """
@@ -128,7 +165,7 @@ def run_once_test(background_tasks: BackgroundTasks, db: Session = Depends(get_d
     db.commit()
     
     # Start background task
-    background_tasks.add_task(_execute_agent_cycle, job_id)
+    AGENT_POOL.submit(_execute_agent_cycle, job_id)
     
     logger.info(f"Test Job {job_id}: Queued for execution")
     
@@ -193,14 +230,20 @@ def get_job_status_test(job_id: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/stream/{job_id}")
-async def stream_job_progress(job_id: str, token: str = None, current_user = None, db: Session = Depends(get_db)):
+async def stream_job_progress(job_id: str, token: str = None, events: str = None, current_user = None, db: Session = Depends(get_db)):
     """
     Stream job progress with detailed events.
-    Polling the stream manager (memory) and fallback to DB for status.
+    Events are pushed as the job logs them (no polling); job status is read
+    from the DB on connect, on terminal events and on a slow fallback poll.
+    
+    ?events=progress,agent_dialogue limits the stream to those event types
+    (status/connection messages are always sent).
     """
+    event_filter = event_type_filter(t.strip() for t in events.split(",") if t.strip()) if events else None
+
     # Validate authentication
     if token:
-        from jose import jwt
+        import jwt
         from app.auth.security import SECRET_KEY, ALGORITHM
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -216,88 +259,136 @@ async def stream_job_progress(job_id: str, token: str = None, current_user = Non
     # Using SessionLocal inside generator is safer for long-lived streams
     
     async def progress_generator():
-        sent_events = set()
+        waiter = job_stream_manager.subscribe(job_id)
+        last_seq = -1
         last_status = None
+        terminal_seen = False
+        check_status = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + JOB_STREAM_TIMEOUT_SECONDS
         
-        yield f"data: {json.dumps({'type': 'connection', 'job_id': job_id, 'message': '📡 Connected to agent stream...'})}\n\n"
+        def pending_frames():
+            nonlocal last_seq, terminal_seen, check_status
+            frames = []
+            for event in job_stream_manager.events_since(job_id, last_seq):
+                last_seq = event["seq"]
+                if event.get("stage") in _TERMINAL_STAGES:
+                    terminal_seen = check_status = True
+                if event_filter is not None and not event_filter(event.get("type"), event.get("details")):
+                    continue
+                
+                # Formatting
+                if event.get("type") == "progress":
+                    stage_emoji = {
+                        "INIT": "🚀", "FETCH": "📥", "FORECAST": "🔮",
+                        "DECISION": "🤔", "ACTION": "⚡", "COMPLETE": "✅", "ERROR": "❌",
+                        "FINANCE": "💰", "MEMORY": "💾"
+                    }.get(event.get("stage"), "ℹ️")
+                    
+                    msg = {
+                        "type": "progress", 
+                        "stage": event["stage"],
+                        "message": f"{stage_emoji} {event['message']}",
+                        "details": event.get("details"),
+                        "timestamp": event["timestamp"]
+                    }
+                else:
+                    msg = event
+                    
+                frames.append(_sse(msg))
+            return frames
         
-        # Poll for updates
-        for _ in range(600): # 10 minutes timeout
-            # 1. Get events from memory queue
-            queue = job_stream_manager.get_queue(job_id)
-            queue_snapshot = list(queue)
+        try:
+            yield _sse({'type': 'connection', 'job_id': job_id, 'message': '📡 Connected to agent stream...'})
             
-            for event in queue_snapshot:
-                event_key = (event["timestamp"], event["stage"], event["message"])
-                if event_key not in sent_events:
-                    sent_events.add(event_key)
+            while True:
+                waiter.clear()
+                
+                # 1. Send events logged since the last wakeup
+                for frame in pending_frames():
+                    yield frame
+
+                # 2. Check Job Status from DB: on connect, once the job starts
+                # logging, after a terminal event, and on the idle fallback poll
+                if check_status:
+                    check_status = False
+                    try:
+                        job = await asyncio.to_thread(_job_status, job_id)
+                    except Exception as e:
+                        logger.error(f"Stream DB Error: {e}")
+                        job = False
                     
-                    # Formatting
-                    if event.get("type") == "progress":
-                        stage_emoji = {
-                            "INIT": "🚀", "FETCH": "📥", "FORECAST": "🔮",
-                            "DECISION": "🤔", "ACTION": "⚡", "COMPLETE": "✅", "ERROR": "❌",
-                            "FINANCE": "💰", "MEMORY": "💾"
-                        }.get(event.get("stage"), "ℹ️")
-                        
-                        msg = {
-                            "type": "progress", 
-                            "stage": event["stage"],
-                            "message": f"{stage_emoji} {event['message']}",
-                            "details": event.get("details"),
-                            "timestamp": event["timestamp"]
-                        }
-                    else:
-                        msg = event
-                        
-                    yield f"data: {json.dumps(msg)}\n\n"
-
-            # 2. Check Job Status from DB (periodically or every loop)
-            # We open a short-lived session to check status
-            scope_db = SessionLocal()
-            try:
-                job = scope_db.query(schemas.Job).filter(schemas.Job.id == job_id).first()
-                if job:
-                    current_status = job.status
+                    if job is None:
+                        # Job not found in DB?
+                        yield _sse({'type': 'error', 'message': 'Job not found in DB'})
+                        break
                     
-                    if current_status != last_status:
-                        # Status changed
-                        status_msg = {"type": "status", "status": current_status, "timestamp": datetime.utcnow().isoformat()}
+                    if job:
+                        current_status, result, error = job
                         
-                        if current_status == "completed":
-                            status_msg["message"] = "🎉 Agent cycle completed!"
-                            # Include result in completion message if feasible
-                            if job.result:
+                        if current_status in ("completed", "failed") and not terminal_seen and last_seq >= 0:
+                            # The cycle commits its final status just before logging
+                            # COMPLETE; give a job running in this process a moment to log it
+                            grace_end = loop.time() + TERMINAL_EVENT_GRACE_SECONDS
+                            while True:
+                                waiter.clear()
+                                for frame in pending_frames():
+                                    yield frame
+                                remaining = grace_end - loop.time()
+                                if terminal_seen or remaining <= 0:
+                                    break
                                 try:
-                                    status_msg["result"] = json.loads(job.result)
-                                except:
-                                    pass
-                            yield f"data: {json.dumps(status_msg)}\n\n"
-                            break # Done
-                            
-                        elif current_status == "failed":
-                            status_msg["message"] = f"⚠️ Failed: {job.error}"
-                            status_msg["error"] = job.error
-                            yield f"data: {json.dumps(status_msg)}\n\n"
-                            break # Done
+                                    await asyncio.wait_for(waiter.wait(), remaining)
+                                except asyncio.TimeoutError:
+                                    break
                         
-                        else:
-                            yield f"data: {json.dumps(status_msg)}\n\n"
+                        if current_status != last_status:
+                            # Status changed
+                            status_msg = {"type": "status", "status": current_status, "timestamp": datetime.utcnow()}
                             
-                        last_status = current_status
-                else:
-                    # Job not found in DB?
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Job not found in DB'})}\n\n"
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Stream DB Error: {e}")
-            finally:
-                scope_db.close()
+                            if current_status == "completed":
+                                status_msg["message"] = "🎉 Agent cycle completed!"
+                                # Include result in completion message if feasible
+                                if result:
+                                    try:
+                                        status_msg["result"] = json.loads(result)
+                                    except:
+                                        pass
+                                # Events logged after the last wakeup go out first
+                                for frame in pending_frames():
+                                    yield frame
+                                yield _sse(status_msg)
+                                break # Done
+                                
+                            elif current_status == "failed":
+                                status_msg["message"] = f"⚠️ Failed: {error}"
+                                status_msg["error"] = error
+                                # Events logged after the last wakeup go out first
+                                for frame in pending_frames():
+                                    yield frame
+                                yield _sse(status_msg)
+                                break # Done
+                            
+                            else:
+                                yield _sse(status_msg)
+                                
+                            last_status = current_status
                 
-            await asyncio.sleep(0.5)
+                # 3. Sleep until the next event (or the fallback poll)
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # After ERROR the failed status is committed just behind the event
+                poll = 0.5 if terminal_seen else JOB_STATUS_POLL_SECONDS
+                try:
+                    await asyncio.wait_for(waiter.wait(), min(remaining, poll))
+                    check_status = check_status or last_status in (None, "queued")
+                except asyncio.TimeoutError:
+                    check_status = True
+        finally:
+            job_stream_manager.unsubscribe(job_id, waiter)
             
-        yield f"data: {json.dumps({'type': 'close', 'message': 'Stream closed'})}\n\n"
+        yield _sse({'type': 'close', 'message': 'Stream closed'})
 
     return StreamingResponse(progress_generator(), media_type="text/event-stream")
 
@@ -5,6 +5,7 @@ Handles memory, checkpoints, goals, and recovery.
 """
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional, Any
@@ -28,6 +29,29 @@ def get_db():
         db.close()
 
 
+def _auto_feedback_counts(db: Session, sku: Optional[str] = None) -> dict:
+    """
+    Per-SKU (total, approved) counts of auto-generated feedback,
+    aggregated in a single grouped query rather than one query per SKU.
+    """
+    from app.models import schemas
+    
+    F = schemas.Feedback
+    query = db.query(
+        F.sku,
+        func.count(F.id),
+        func.sum(case((F.approved == True, 1), else_=0))
+    ).filter(F.note.like('[AUTO]%'))
+    
+    if sku:
+        query = query.filter(F.sku == sku)
+    
+    return {
+        row_sku: (total, int(approved or 0))
+        for row_sku, total, approved in query.group_by(F.sku).order_by(F.sku)
+    }
+
+
 def get_memory_manager():
     return PersistentMemoryManager(SessionLocal)
 
@@ -368,7 +392,7 @@ def get_decision_history_analytics(
     """
     from app.models import schemas
     from datetime import timedelta
-    import json
+    import orjson
     
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
@@ -391,7 +415,7 @@ def get_decision_history_analytics(
     history = []
     for memory, approved, note in results:
         try:
-            decision_data = json.loads(memory.decision) if isinstance(memory.decision, str) else memory.decision
+            decision_data = orjson.loads(memory.decision) if isinstance(memory.decision, str) else memory.decision
             if isinstance(decision_data, list):
                 for item in decision_data:
                     if not sku or item.get("sku") == sku:
@@ -434,19 +458,14 @@ def get_learning_progress_analytics(
         query = query.filter(schemas.SKUParameters.sku == sku)
     
     params = query.all()
+    counts = _auto_feedback_counts(db, sku)
     
     learning_data = []
     for param in params:
-        feedback = db.query(schemas.Feedback).filter(
-            schemas.Feedback.sku == param.sku,
-            schemas.Feedback.note.like('[AUTO]%')
-        ).all()
-        
-        if not feedback:
+        if param.sku not in counts:
             continue
         
-        approved = sum(1 for f in feedback if f.approved)
-        total = len(feedback)
+        total, approved = counts[param.sku]
         accuracy = approved / total if total > 0 else 0
         
         learning_data.append({
@@ -478,24 +497,8 @@ def get_accuracy_by_sku(
     Analyze which SKUs have the most accurate decisions.
     Identifies best/worst performers for targeted improvement.
     """
-    from app.models import schemas
-    
-    skus = db.query(schemas.Feedback.sku).distinct().filter(
-        schemas.Feedback.note.like('[AUTO]%')
-    ).all()
-    
     accuracy_data = []
-    for (sku,) in skus:
-        feedback = db.query(schemas.Feedback).filter(
-            schemas.Feedback.sku == sku,
-            schemas.Feedback.note.like('[AUTO]%')
-        ).all()
-        
-        if not feedback:
-            continue
-        
-        approved = sum(1 for f in feedback if f.approved)
-        total = len(feedback)
+    for sku, (total, approved) in _auto_feedback_counts(db).items():
         accuracy = approved / total if total > 0 else 0
         
         accuracy_data.append({
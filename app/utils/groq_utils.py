@@ -3,6 +3,7 @@ import os
 import re
 import json
 import logging
+import threading
 import time
 from typing import Optional
 from dotenv import load_dotenv
@@ -24,6 +25,11 @@ except Exception:
 # ✅ Rate-limit tracking (prevent cascading failures)
 _last_groq_call_time = 0
 _rate_limit_delay = 0  # Dynamic delay based on 429 responses
+_rate_limit_set_at = 0  # When the current delay was set by a 429
+# Callers run on several threads (e.g. parallel negotiation batches); this
+# guards the state above. While a 429 delay is active, calls go out one at a
+# time spaced by the delay; a success that clears the delay wakes the waiters.
+_throttle = threading.Condition()
 
 def clean_llm_response(text: str) -> str:
     """
@@ -61,7 +67,7 @@ def query_groq(model: str, prompt: str, max_tokens: int = 2048, timeout: int = 3
     Raises:
         RuntimeError if Groq client not configured or critical error
     """
-    global _last_groq_call_time, _rate_limit_delay
+    global _last_groq_call_time, _rate_limit_delay, _rate_limit_set_at
     
     if GROQ_CLIENT is None:
         raise RuntimeError("groq client not installed or GROQ_API_KEY is not configured.")
@@ -73,13 +79,18 @@ def query_groq(model: str, prompt: str, max_tokens: int = 2048, timeout: int = 3
     while retry_count <= max_retries:
         try:
             # ✅ Throttle requests to avoid rate limits
-            elapsed = time.time() - _last_groq_call_time
-            if _rate_limit_delay > 0 and elapsed < _rate_limit_delay:
-                wait_time = _rate_limit_delay - elapsed
-                logger.info(f"Rate limit throttle: waiting {wait_time:.1f}s before next Groq call")
-                time.sleep(wait_time)
-            
-            _last_groq_call_time = time.time()
+            with _throttle:
+                logged = False
+                while _rate_limit_delay > 0:
+                    wait_time = _rate_limit_delay - (time.time() - _last_groq_call_time)
+                    if wait_time <= 0:
+                        break
+                    if not logged:
+                        logger.info(f"Rate limit throttle: waiting {wait_time:.1f}s before next Groq call")
+                        logged = True
+                    _throttle.wait(wait_time)
+                
+                _last_groq_call_time = call_started = time.time()
             
             resp = GROQ_CLIENT.chat.completions.create(
                 model=model,
@@ -88,8 +99,11 @@ def query_groq(model: str, prompt: str, max_tokens: int = 2048, timeout: int = 3
                 timeout=timeout
             )
             
-            # ✅ Reset rate limit delay on success
-            _rate_limit_delay = 0
+            # ✅ Reset rate limit delay on success (unless another call hit a 429 meanwhile)
+            with _throttle:
+                if _rate_limit_set_at <= call_started and _rate_limit_delay:
+                    _rate_limit_delay = 0
+                    _throttle.notify_all()
             
             # Try to extract content in standard shape
             try:
@@ -109,7 +123,9 @@ def query_groq(model: str, prompt: str, max_tokens: int = 2048, timeout: int = 3
                 if retry_count < max_retries:
                     # Exponential backoff: 2s, 4s, 8s
                     wait_time = retry_after if retry_after else (base_delay * (2 ** retry_count))
-                    _rate_limit_delay = wait_time
+                    with _throttle:
+                        _rate_limit_delay = wait_time
+                        _rate_limit_set_at = time.time()
                     
                     retry_count += 1
                     logger.warning(
@@ -16,6 +16,7 @@ from app.agents.langgraph_flow import start_agent_background_job, agent_controll
 from datetime import timedelta, datetime
 import logging
 import os
+import anyio.to_thread
 logger = logging.getLogger("main")
 logging.basicConfig(level=logging.INFO)
 
@@ -25,6 +26,9 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("FastAPI startup complete")
     
+    # Sync routes and to_thread calls share anyio's limiter (40 threads by default)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.getenv("THREADPOOL_SIZE", "100"))
+    
     # Create database tables if they don't exist
     from app.models.database import engine, Base
     from app.models import schemas  # Import schemas to register models
@@ -74,6 +78,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("FastAPI shutdown")
     agent_controller.stop_scheduler()
+    agent.AGENT_POOL.shutdown(wait=False)
 
 app = FastAPI(title="Smart Supply Chain AI Agent", lifespan=lifespan)
 
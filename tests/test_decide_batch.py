@@ -0,0 +1,142 @@
+"""decide_batch must give the same decisions as calling decide() per SKU"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.agents.nodes.intelligent_decision_node import IntelligentDecisionNode
+from app.agents.nodes.decision_node import DecisionNode
+
+
+def _make_skus(n, seed=7):
+    rng = random.Random(seed)
+    sku_items, forecasts, sales = [], [], []
+    for i in range(n):
+        item = {
+            "sku": f"SKU-{i}",
+            "product_name": f"Product {i}",
+            "quantity": rng.choice([0, 3, 15, 40, 120, 800]),
+            "threshold": rng.choice([5, 10, 20]),
+            "lead_time_days": rng.choice([1, 3, 7, 14]),
+            "unit_price": rng.choice([0.0, 2.5, 10.0, 75.0]),
+            "holding_cost_percent": rng.choice([0.0, 0.15, 0.3]),
+            "reorder_cost": rng.choice([0.0, 25.0, 60.0]),
+            "safety_stock": rng.choice([0, 10]),
+            "min_order_qty": rng.choice([1, 20]),
+            "max_order_qty": rng.choice([None, 50, 500]),
+        }
+        if i % 17 == 0:
+            item["is_active"] = False
+        if i % 23 == 0:
+            item["unit_price"] = None  # Invalid input -> scalar error fallback
+        sku_items.append(item)
+        forecasts.append({
+            "forecast": [rng.randint(0, 30) for _ in range(rng.choice([0, 7, 10]))],
+            "confidence": rng.choice([0.1, 0.5, 0.9]),
+        })
+        sales.append([{"sold_quantity": rng.randint(0, 40)} for _ in range(rng.choice([0, 1, 2, 14, 90]))])
+    pending = [rng.choice([0, 0, 25]) for _ in range(n)]
+    return sku_items, forecasts, sales, pending
+
+
+def _assert_same(batch, scalar):
+    assert batch.reorder_required == scalar.reorder_required
+    assert batch.order_quantity == scalar.order_quantity
+    assert batch.urgency_level == scalar.urgency_level
+    assert batch.reason == scalar.reason
+    assert batch.details == scalar.details
+    assert batch.cost_analysis.keys() == scalar.cost_analysis.keys()
+    for key, value in scalar.cost_analysis.items():
+        assert batch.cost_analysis[key] == pytest.approx(value)
+    assert batch.utility_score == pytest.approx(scalar.utility_score)
+
+
+def test_decide_batch_matches_decide():
+    engine = IntelligentDecisionNode()
+    sku_items, forecasts, sales, pending = _make_skus(500)
+
+    batch = engine.decide_batch(sku_items, forecasts, sales, pending)
+
+    assert len(batch) == len(sku_items)
+    for i, result in enumerate(batch):
+        _assert_same(result, engine.decide(sku_items[i], forecasts[i], sales[i], pending[i]))
+
+
+def test_decide_batch_empty():
+    assert IntelligentDecisionNode().decide_batch([], [], []) == []
+
+
+def test_decision_node_uses_batch_results():
+    node = DecisionNode()
+    sku_items, forecasts, sales, _ = _make_skus(50, seed=11)
+
+    batch = node.decide_batch(sku_items, forecasts, recent_sales_list=sales)
+
+    for i, decision in enumerate(batch):
+        expected = node.engine.decide(sku_items[i], forecasts[i], sales[i], 0)
+        assert decision["reorder_required"] == expected.reorder_required
+        assert decision["order_quantity"] == expected.order_quantity
+        assert decision["urgency_level"] == expected.urgency_level.value
+        assert decision["reason"] == expected.reason
+    assert node.decide(sku_items[1], forecasts[1], recent_sales=sales[1]) == batch[1]
+
+
+def test_batch_metrics_match_scalar():
+    engine = IntelligentDecisionNode()
+    sku_items, forecasts, sales, pending = _make_skus(200, seed=3)
+    rows = [i for i, item in enumerate(sku_items) if item["unit_price"] is not None]
+    sku_items = [sku_items[i] for i in rows]
+    forecasts = [forecasts[i] for i in rows]
+    sales = [sales[i] for i in rows]
+    pending = [pending[i] for i in rows]
+
+    batch = engine.extract_metrics_batch(sku_items, forecasts, sales, pending)
+    eoq = engine.calculate_eoq_batch(batch)
+    rop = engine.calculate_dynamic_reorder_point_batch(batch)
+
+    for i in range(len(sku_items)):
+        metrics = engine.extract_metrics(sku_items[i], forecasts[i], sales[i], pending[i])
+        assert batch.current_stock[i] == metrics.current_stock
+        assert batch.forecast_7day[i] == metrics.forecast_7day
+        assert batch.daily_avg_demand[i] == pytest.approx(metrics.daily_avg_demand)
+        assert batch.demand_volatility[i] == pytest.approx(metrics.demand_volatility)
+        assert batch.forecast_confidence[i] == metrics.forecast_confidence
+        assert int(eoq[i]) == engine.calculate_eoq(metrics)
+        assert int(rop[i]) == engine.calculate_dynamic_reorder_point(metrics)
+
+
+def test_decision_subgraph_metrics_match_scalar():
+    from datetime import datetime
+    from app.agents.state import CycleState
+    from app.agents.nodes import decision_subgraph
+
+    sku_items, forecasts, sales, _ = _make_skus(120, seed=5)
+    state = CycleState(
+        cycle_id="test",
+        cycle_number=1,
+        started_at=datetime.utcnow(),
+        inventory_data={item["sku"]: item for item in sku_items},
+        sales_by_sku={item["sku"]: sales[i] for i, item in enumerate(sku_items)},
+        forecast_results=[
+            {"sku": item["sku"], "product_name": item["product_name"], "forecast": forecasts[i]}
+            for i, item in enumerate(sku_items)
+        ],
+    )
+
+    analyzed = decision_subgraph.analyze_trends_node(state).analyzed_skus
+
+    expected = [
+        decision_subgraph._analyze_one(state, forecast_item, state.inventory_data[forecast_item["sku"]])
+        for forecast_item in state.forecast_results
+    ]
+    expected = [item for item in expected if item]
+    assert [item["sku"] for item in analyzed] == [item["sku"] for item in expected]
+    for got, want in zip(analyzed, expected):
+        assert got["metrics"].keys() == want["metrics"].keys()
+        for key, value in want["metrics"].items():
+            assert got["metrics"][key] == pytest.approx(value)
+        assert got["eoq"] == want["eoq"]
+        assert got["reorder_point"] == want["reorder_point"]
+        assert got["utility_score"] == pytest.approx(want["utility_score"])
@@ -0,0 +1,169 @@
+"""Job progress SSE stream: event order and termination"""
+import sys
+import os
+import json
+import asyncio
+import threading
+import uuid
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base
+from app.models import schemas
+from app.routes import agent as agent_routes
+from app.agents.streaming import job_stream_manager, get_event_writer
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(agent_routes, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def _new_job(session_factory) -> str:
+    job_id = uuid.uuid4().hex[:8]
+    db = session_factory()
+    db.add(schemas.Job(id=job_id, status="queued"))
+    db.commit()
+    db.close()
+    return job_id
+
+
+def _set_status(session_factory, job_id, status, **fields):
+    db = session_factory()
+    job = db.get(schemas.Job, job_id)
+    job.status = status
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.commit()
+    db.close()
+
+
+async def _collect(job_id, worker):
+    response = await agent_routes.stream_job_progress(job_id)
+    thread = threading.Thread(target=worker)
+    frames = []
+
+    async def read():
+        async for frame in response.body_iterator:
+            frames.append(json.loads(frame[len(b"data: "):]))
+            # Start the job once the stream has read its initial status
+            if frames[-1]["type"] in ("status", "error") and thread.ident is None:
+                thread.start()
+
+    await asyncio.wait_for(read(), timeout=10)
+    thread.join()
+    return frames
+
+
+def _progress_messages(frames):
+    return [f["message"].split(" ", 1)[1] for f in frames if f["type"] == "progress"]
+
+
+def test_concurrent_log_events_stay_in_seq_order():
+    job_id = uuid.uuid4().hex[:8]
+
+    def log(worker):
+        for i in range(200):
+            job_stream_manager.log_event(job_id, "progress", f"{worker}-{i}", stage="FETCH")
+
+    threads = [threading.Thread(target=log, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    seqs = [e["seq"] for e in job_stream_manager.snapshot(job_id)]
+    assert len(seqs) == 800
+    assert seqs == sorted(seqs)
+    assert job_stream_manager.events_since(job_id, seqs[-2]) == job_stream_manager.snapshot(job_id)[-1:]
+
+
+def test_stream_delivers_events_in_order_and_ends_on_complete(session_factory):
+    job_id = _new_job(session_factory)
+
+    def worker():
+        _set_status(session_factory, job_id, "running")
+        agent_routes.log_progress(job_id, "INIT", "start")
+        for i in range(5):
+            agent_routes.log_progress(job_id, "FETCH", f"step {i}")
+        _set_status(session_factory, job_id, "completed", result=json.dumps({"orders": 2}))
+        agent_routes.log_progress(job_id, "COMPLETE", "done")
+
+    frames = asyncio.run(_collect(job_id, worker))
+
+    assert frames[0]["type"] == "connection"
+    assert _progress_messages(frames) == ["start"] + [f"step {i}" for i in range(5)] + ["done"]
+    statuses = [f for f in frames if f["type"] == "status"]
+    # "running" is only reported if a status read lands while the job runs
+    assert statuses[0]["status"] == "queued"
+    assert statuses[-1]["status"] == "completed"
+    assert statuses[-1]["result"] == {"orders": 2}
+    assert frames[-2] is statuses[-1]
+    assert frames[-1]["type"] == "close"
+    assert job_id not in job_stream_manager._waiters
+
+
+def test_stream_ends_on_error(session_factory):
+    job_id = _new_job(session_factory)
+
+    def worker():
+        _set_status(session_factory, job_id, "running")
+        agent_routes.log_progress(job_id, "INIT", "start")
+        agent_routes.log_progress(job_id, "ERROR", "boom")
+        # The failed status is committed just after the ERROR event
+        _set_status(session_factory, job_id, "failed", error="boom")
+
+    frames = asyncio.run(_collect(job_id, worker))
+
+    assert _progress_messages(frames) == ["start", "boom"]
+    assert frames[-2]["type"] == "status"
+    assert frames[-2]["status"] == "failed"
+    assert frames[-2]["error"] == "boom"
+    assert frames[-1]["type"] == "close"
+    assert job_id not in job_stream_manager._waiters
+
+
+def test_stream_reports_missing_job(session_factory):
+    frames = asyncio.run(_collect("missing", lambda: None))
+
+    assert [f["type"] for f in frames] == ["connection", "error", "close"]
+
+
+def test_event_writer_outside_graph_logs_to_job_stream():
+    job_id = uuid.uuid4().hex[:8]
+
+    get_event_writer(job_id)("review_required", "Paused 2 orders", {"count": 2})
+
+    [event] = job_stream_manager.snapshot(job_id)
+    assert event["type"] == "review_required"
+    assert event["message"] == "Paused 2 orders"
+    assert event["details"] == {"count": 2}
+
+
+def test_failed_cycle_archive_is_reported():
+    from concurrent.futures import Future
+    from app.agents import langgraph_workflow
+
+    job_id = uuid.uuid4().hex[:8]
+    ok, failed = Future(), Future()
+    ok.add_done_callback(lambda f: langgraph_workflow._report_archive_result(job_id, f))
+    failed.add_done_callback(lambda f: langgraph_workflow._report_archive_result(job_id, f))
+
+    ok.set_result({"alert_id": 1, "memory_id": 2})
+    failed.set_result({"error": "database is locked"})
+
+    [event] = job_stream_manager.snapshot(job_id)
+    assert event["type"] == "error"
+    assert event["stage"] == "MEMORY"
+    assert "database is locked" in event["message"]
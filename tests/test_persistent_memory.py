@@ -0,0 +1,246 @@
+"""PersistentMemoryManager round trips on an in-memory SQLite database"""
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base
+from app.models import schemas  # Registers the models on Base
+from app.persistence import (
+    PersistentMemoryManager, EpisodicMemory, SemanticMemory, ProceduralMemory, Checkpoint, Message, Goal
+)
+from app.persistence import persistent_memory, RecoveryManager
+
+
+@pytest.fixture
+def memory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    for cache in (
+        persistent_memory._goal_cache, persistent_memory._checkpoint_cache,
+        persistent_memory._fact_cache, persistent_memory._procedure_cache
+    ):
+        cache.clear()
+    db = session_factory()
+    try:
+        yield PersistentMemoryManager(session_factory), db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+NOW = datetime.utcnow()
+
+
+def _fact(i, value, confidence=0.5, minutes_ago=0):
+    return SemanticMemory(
+        f"fact-{i}", NOW - timedelta(minutes=minutes_ago), "sku_profile", "SKU1_pattern",
+        value, confidence, "test"
+    )
+
+
+def _procedure(i, success_rate):
+    return ProceduralMemory(
+        f"proc-{i}", NOW, "ordering_strategy", "eoq", "desc", [{"step": i}], {}, success_rate
+    )
+
+
+def _checkpoint(i, goal="g", errors=None, decisions=None, minutes_ago=0):
+    return Checkpoint(
+        f"cp-{i}", NOW - timedelta(minutes=minutes_ago), i, {"i": i}, goal,
+        {"tasks_completed": i}, [] if decisions is None else decisions,
+        [Message("INIT", f"cycle {i}")], {}, [] if errors is None else errors
+    )
+
+
+def test_bulk_inserts_round_trip(memory):
+    manager, db = memory
+    episodes = [
+        EpisodicMemory(f"ev-{i}", NOW - timedelta(minutes=i), "decision_made", f"SKU{i % 2}",
+                       "d", {"i": i}, "success", None)
+        for i in range(5)
+    ]
+
+    assert manager.store_episodes_bulk(db, episodes) == 5
+    assert manager.store_facts_bulk(db, [_fact(i, {"v": i}, confidence=i / 10) for i in range(3)]) == 3
+    assert manager.store_procedures_bulk(db, [_procedure(1, 0.9)]) == 1
+    assert manager.save_checkpoints_bulk(db, [_checkpoint(i, minutes_ago=i) for i in range(3)]) == 3
+    assert manager.bulk_record(db, []) == 0
+
+    stored = manager.retrieve_episodes(db, sku="SKU0")
+    assert [e.event_id for e in stored] == ["ev-0", "ev-2", "ev-4"]
+    assert stored[0].context == {"i": 0}
+    facts = manager.retrieve_facts_by_category(db, "sku_profile")
+    assert [f.value for f in facts] == [{"v": 2}, {"v": 1}, {"v": 0}]
+    assert manager.retrieve_procedure(db, "ordering_strategy", "eoq").steps == [{"step": 1}]
+    history = manager.get_checkpoint_history(db, goal="g")
+    assert [c.checkpoint_id for c in history] == ["cp-0", "cp-1", "cp-2"]
+    assert history[0].message_history == [Message("INIT", "cycle 0")]
+
+
+def test_bulk_insert_invalidates_cached_facts_and_procedures(memory):
+    manager, db = memory
+    manager.store_fact(db, _fact(1, "old", minutes_ago=5))
+    manager.store_procedure(db, _procedure(1, 0.6))
+    assert manager.retrieve_fact(db, "sku_profile", "SKU1_pattern").value == "old"
+    assert manager.retrieve_procedure(db, "ordering_strategy", "eoq").success_rate == 0.6
+
+    manager.store_facts_bulk(db, [_fact(2, "new")])
+    manager.store_procedures_bulk(db, [_procedure(2, 0.95)])
+
+    assert manager.retrieve_fact(db, "sku_profile", "SKU1_pattern").value == "new"
+    assert ("ordering_strategy", "eoq") not in persistent_memory._procedure_cache
+
+
+
+def _goal(goal_id, objective, priority, created_at, status="active"):
+    return Goal(
+        goal_id, created_at, objective, status, priority,
+        {"owner": objective}, {"fill_rate": priority / 10}, {"done": 0}
+    )
+
+
+def test_upsert_goal_overwrites_columns_and_keeps_created_at(memory):
+    manager, db = memory
+    created = datetime(2024, 1, 1, 9, 30)
+    manager.create_goal(db, _goal("goal-1", "Keep stock", 5, created))
+    assert manager.get_goal(db, "goal-1").objective == "Keep stock"  # Now cached
+
+    deadline = datetime(2024, 6, 1)
+    replacement = _goal("goal-1", "Cut holding cost", 8, datetime(2030, 1, 1), status="paused")
+    replacement.deadline = deadline
+    assert manager.upsert_goal(db, replacement) == "goal-1"
+
+    assert "goal-1" not in persistent_memory._goal_cache
+    goal = manager.get_goal(db, "goal-1")
+    assert goal.objective == "Cut holding cost"
+    assert goal.status == "paused"
+    assert goal.priority == 8
+    assert goal.context == {"owner": "Cut holding cost"}
+    assert goal.target_metrics == {"fill_rate": 0.8}
+    assert goal.deadline == deadline
+    assert goal.created_at == created
+    assert db.query(schemas.PersistentGoal).count() == 1
+
+
+def test_upsert_goals_inserts_and_updates_in_one_call(memory):
+    manager, db = memory
+    created = datetime(2024, 1, 1)
+    manager.create_goal(db, _goal("goal-1", "Keep stock", 5, created))
+
+    count = manager.upsert_goals(db, [
+        _goal("goal-1", "Keep more stock", 6, created),
+        _goal("goal-2", "New goal", 3, created),
+    ])
+
+    assert count == 2
+    assert manager.upsert_goals(db, []) == 0
+    assert [g.goal_id for g in manager.get_active_goals(db)] == ["goal-1", "goal-2"]
+    assert manager.get_goal(db, "goal-1").objective == "Keep more stock"
+
+
+def _save_failure_history(manager, db):
+    manager.save_checkpoints_bulk(db, [
+        _checkpoint(0, errors=["timeout", "timeout", "db down"],
+                    decisions=[{"status": "failed"}, {"status": "ok"}]),
+        _checkpoint(1, errors=["timeout"], decisions=[{"status": "failed"}, "not-an-object"], minutes_ago=1),
+        # Non-array payloads are ignored rather than iterated
+        _checkpoint(2, errors="disk full", decisions={"status": "failed"}, minutes_ago=2),
+        _checkpoint(3, goal="other", errors=["other error"], decisions=[{"status": "failed"}], minutes_ago=3),
+        _checkpoint(4, errors=["old error"], minutes_ago=10),
+    ])
+
+
+def test_analyze_failure_pattern_counts_in_sql(memory):
+    manager, db = memory
+    _save_failure_history(manager, db)
+    recovery = RecoveryManager(manager)
+
+    analysis = recovery.analyze_failure_pattern(db, goal="g", lookback_cycles=3)
+
+    assert analysis["status"] == "success"
+    assert analysis["total_checkpoints_analyzed"] == 3
+    assert analysis["total_errors"] == 4
+    assert analysis["failed_decisions"] == 2
+    assert analysis["common_errors"] == [
+        {"error": "timeout", "frequency": 3},
+        {"error": "db down", "frequency": 1},
+    ]
+    assert analysis["error_rate"] == pytest.approx(4 / 3)
+
+    overall = recovery.analyze_failure_pattern(db, lookback_cycles=10)
+    assert overall["total_checkpoints_analyzed"] == 5
+    assert overall["total_errors"] == 6
+    assert overall["failed_decisions"] == 3
+    assert overall["common_errors"][0] == {"error": "timeout", "frequency": 3}
+    assert {e["error"] for e in overall["common_errors"]} == {"timeout", "db down", "other error", "old error"}
+
+    empty = recovery.analyze_failure_pattern(db, goal="missing")
+    assert (empty["total_checkpoints_analyzed"], empty["total_errors"], empty["error_rate"]) == (0, 0, 0)
+
+
+def test_list_available_checkpoints_summaries(memory):
+    manager, db = memory
+    _save_failure_history(manager, db)
+    recovery = RecoveryManager(manager)
+
+    listing = recovery.list_available_checkpoints(db, goal="g", limit=3)
+
+    assert listing["status"] == "success"
+    assert listing["total_checkpoints"] == 3
+    checkpoints = listing["checkpoints"]
+    assert [c["checkpoint_id"] for c in checkpoints] == ["cp-0", "cp-1", "cp-2"]
+    assert [c["errors_count"] for c in checkpoints] == [3, 1, 0]
+    assert [c["decisions_made"] for c in checkpoints] == [2, 2, 0]
+    assert checkpoints[1]["progress"] == {"tasks_completed": 1}
+    assert checkpoints[0]["goal"] == "g"
+    assert checkpoints[0]["cycle_number"] == 0
+    assert checkpoints[0]["is_stable"] is True
+    assert checkpoints[0]["timestamp"] == NOW.isoformat()
+
+    assert recovery.list_available_checkpoints(db)["total_checkpoints"] == 5
+    assert [c["checkpoint_id"] for c in recovery.list_available_checkpoints(db, limit=2)["checkpoints"]] == ["cp-0", "cp-1"]
+
+
+def test_checkpoint_loads_loose_message_history(memory):
+    manager, db = memory
+    manager.save_checkpoint(db, _checkpoint(7))
+    row = db.query(schemas.AgentCheckpoint).filter_by(checkpoint_id="cp-7").one()
+    row.state = {**row.state, "message_history": [
+        {"stage": "INIT", "message": "cycle 7", "timestamp": "t0", "source": "legacy"},
+        {"message": "no stage"},
+    ]}
+    db.commit()
+
+    checkpoint = manager.get_checkpoint_by_id(db, "cp-7")
+
+    assert checkpoint is not None
+    assert checkpoint.message_history == [Message("INIT", "cycle 7", "t0"), Message("", "no stage")]
+
+
+def test_failure_stats_and_summaries_fall_back_to_history(memory, monkeypatch):
+    manager, db = memory
+    _save_failure_history(manager, db)
+    in_sql = [
+        manager.get_failure_stats(db, goal="g", limit=3),
+        manager.get_failure_stats(db, limit=10),
+        manager.get_checkpoint_summaries(db, goal="g", limit=3),
+    ]
+
+    # Dialects without a SQL aggregation count over the loaded history instead
+    monkeypatch.setattr(persistent_memory, "_FAILURE_STATS", {})
+    monkeypatch.setattr(persistent_memory, "_CHECKPOINT_SUMMARY_COLUMNS", {})
+
+    assert [
+        manager.get_failure_stats(db, goal="g", limit=3),
+        manager.get_failure_stats(db, limit=10),
+        manager.get_checkpoint_summaries(db, goal="g", limit=3),
+    ] == in_sql
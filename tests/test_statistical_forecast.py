@@ -0,0 +1,74 @@
+"""Vectorized statistical forecasts must match the scalar reference"""
+import sys
+import os
+import copy
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.agents.nodes.forecast_node import (
+    _calculate_statistical_forecast,
+    _vectorized_statistical_forecasts,
+)
+
+
+def _sales(quantities, dated=True):
+    # Oldest first, as fetch_data_node returns them; both paths sort newest first
+    return [
+        {"date": f"2024-01-{day:02d}", "sold_quantity": q} if dated else {"sold_quantity": q}
+        for day, q in enumerate(quantities, 1)
+    ]
+
+
+def _assert_matches(sales_lists):
+    expected = [_calculate_statistical_forecast(copy.deepcopy(s)) for s in sales_lists]
+    actual = _vectorized_statistical_forecasts(copy.deepcopy(sales_lists))
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        if want is None:
+            assert got is None
+            continue
+        assert got["forecast"] == want["forecast"]
+        assert got["_total_demand"] == want["_total_demand"]
+        assert got["explanation"] == want["explanation"]
+        assert got["confidence"] == pytest.approx(want["confidence"])
+
+
+def test_edge_cases_match_reference():
+    _assert_matches([
+        [],                                   # No history
+        _sales([4, 5]),                       # Fewer than 3 rows
+        _sales([4, 5, 6]),                    # Below 6 rows: no trend
+        _sales([1, 2, 3, 4, 2, 9]),           # prev < 5: trend ignored
+        _sales([10, 10, 10, 30, 30, 30]),     # Rising trend, capped at +50%
+        _sales([90, 90, 90, 5, 5, 5, 5]),     # Falling trend, capped at -50%
+        _sales([7]),                          # Single row
+        _sales([0, 0, 0, 0, 0, 0]),           # All zero
+        _sales([3, 8, 1, 12, 6, 6], dated=False),
+    ])
+
+
+def test_rows_without_date_still_sorted():
+    sales = _sales([10, 10, 10, 30, 30, 30])
+    sales.append({"sold_quantity": 0})
+    _assert_matches([sales])
+    result = _vectorized_statistical_forecasts([sales])[0]
+    assert "Trend: 50.0%" in result["explanation"]
+
+
+def test_int32_quantities_match_reference():
+    # Values beyond int16 force the int32 matrix
+    _assert_matches([
+        _sales([40000, 41000, 39000, 20000, 21000, 19000]),
+        _sales([5, 6, 7, 8]),
+        _sales([-40000, 10, 20]),
+    ])
+
+
+def test_random_histories_match_reference():
+    rng = random.Random(5)
+    _assert_matches([
+        _sales([rng.randint(0, 60) for _ in range(rng.randint(0, 40))])
+        for _ in range(300)
+    ])